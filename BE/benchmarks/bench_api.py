@@ -0,0 +1,535 @@
+"""
+API 전 구간 부하 테스트 / 벤치마크 (재현 가능한 데이터 + 엔드포인트별 지연 시간)
+
+1. init_dummy_data()로 시연용 데이터를 만든 뒤, 같은 모양의 데이터를 지정한 개수만큼 늘려서 저장소에 직접 채운다
+   (사용자 / 주차장 / 충전소 / 게시글 / 댓글 / 예약). 난수 시드가 같으면 항상 같은 데이터.
+2. 모든 API 라우트를 엔드포인트별로 --requests번씩 호출해서 p50/p95/p99 지연 시간과 처리량(req/s)을 잰다.
+   - client: Flask 테스트 클라이언트 (같은 프로세스, 네트워크/WSGI 서버 비용 없음)
+   - gunicorn: 같은 SQLite 파일을 연 실제 gunicorn 프로세스에 HTTP로 요청
+   삭제/취소 라우트는 대상을 먼저 만들어 두고(측정 제외) 삭제 요청만 잰다.
+   실시간 스트림(/api/stream/...)은 연결을 계속 유지하는 응답이라 측정 대상에서 제외.
+3. 결과 표를 출력하고 --output이 있으면 JSON으로 저장.
+
+gunicorn 모드는 워커끼리 데이터를 공유해야 하므로 항상 임시 SQLite 저장소(PLINKU_STORAGE=sqlite)를 쓴다.
+
+사용법 (BE 디렉토리에서):
+    python benchmarks/bench_api.py --mode client --scale 10 --requests 500
+    python benchmarks/bench_api.py --mode both --workers 4 --concurrency 16 --output results.json
+"""
+import argparse
+import http.client
+import importlib
+import json
+import math
+import os
+import random
+import secrets
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import count
+
+BE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_workers import free_port, wait_ready  # noqa: E402
+
+# 기본 데이터 규모 (--scale로 한꺼번에 배수 조정)
+DEFAULT_SIZES = {
+    'users': 1000,
+    'spots': 2000,
+    'stations': 500,
+    'posts': 2000,
+    'comments': 5000,
+    'reservations': 3000,
+}
+BULK_ROWS = 100  # 대량 등록 요청 하나에 담는 행 수
+SEED_BATCH = 1000  # 저장소 트랜잭션 하나에 묶는 기록 수 (SQLite 커밋 횟수 절약)
+RESERVATION_BASE = datetime(2035, 1, 1)  # 측정 중 만드는 예약 시작 시각 (시드 데이터/현재 시각과 겹치지 않음)
+
+
+# ============================================================================
+# 데이터 채우기
+# ============================================================================
+
+def store(main, name: str, record: dict):
+    """컬렉션에 기록하고 파생 인덱스(공간/정렬/소유자/예약 타임라인)를 리스너로 갱신"""
+    collection = getattr(main, name)  # main 모듈의 전역 변수 이름 = 컬렉션 이름
+    collection[record['id']] = record
+    for listener in main.change_listeners.get(name, ()):
+        listener(record['id'], None, record)
+
+
+def batched(main, records):
+    """SEED_BATCH개씩 저장소 트랜잭션으로 묶어서 기록"""
+    records = iter(records)
+    while True:
+        with main.storage.transaction():
+            written = 0
+            for name, record in records:
+                store(main, name, record)
+                written += 1
+                if written == SEED_BATCH:
+                    break
+        if written < SEED_BATCH:
+            return
+
+
+def seed(main, sizes: dict, seed_value: int) -> dict:
+    """
+    시연용 더미 데이터 + 같은 모양의 생성 데이터로 저장소 채우기
+    측정 시나리오가 쓸 ID 목록(context) 반환
+    """
+    main.init_dummy_data()
+    rng = random.Random(seed_value)
+    admin_id = main.users_by_email['admin']
+    base_spots = list(main.parking_spots.values())
+    base_stations = list(main.ev_stations.values())
+    base_posts = list(main.posts.values())
+
+    user_ids = [main.get_next_id('user') for _ in range(sizes['users'])]
+    owners = user_ids + [admin_id]  # 관리자도 일부 장소/게시글을 소유 → my-* / 수정 / 삭제 시나리오 대상
+    password_hash = main.hash_password('pw')  # 해시 계산은 느리므로 한 번만 하고 모든 생성 사용자가 공유
+    batched(main, (('users', {'id': uid, 'email': f'bench{uid}@plinku', 'password': password_hash,
+                              'name': f'사용자{uid}', 'session_version': 0}) for uid in user_ids))
+
+    def place(template: dict, kind: str, n: int) -> dict:
+        rows, cols = rng.randint(2, 6), rng.randint(2, 6)
+        record = dict(template, rows=rows, cols=cols, total=rows * cols, available=rows * cols,
+                      name=f'{template["name"]} {n}', distance=round(rng.uniform(0.1, 15.0), 1),
+                      latitude=round(template['latitude'] + rng.uniform(-0.05, 0.05), 6),
+                      longitude=round(template['longitude'] + rng.uniform(-0.05, 0.05), 6),
+                      owner_id=rng.choice(owners))
+        if kind == 'parking':
+            record.update(price_per_hour=rng.randrange(500, 5001, 100), is_ev=rng.random() < 0.3)
+        else:
+            record['price_per_kwh'] = rng.randrange(150, 401, 10)
+        return record
+
+    spot_ids = [main.get_next_id('parking_spot') for _ in range(sizes['spots'])]
+    batched(main, (('parking_spots', dict(place(rng.choice(base_spots), 'parking', n), id=sid))
+                   for n, sid in enumerate(spot_ids)))
+    station_ids = [main.get_next_id('ev_station') for _ in range(sizes['stations'])]
+    batched(main, (('ev_stations', dict(place(rng.choice(base_stations), 'ev', n), id=sid))
+                   for n, sid in enumerate(station_ids)))
+
+    now = datetime.now()
+    post_ids = [main.get_next_id('post') for _ in range(sizes['posts'])]
+
+    def post(post_id: int) -> dict:
+        template = rng.choice(base_posts)
+        author_id = rng.choice(owners)
+        created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        return {'id': post_id, 'title': template['title'], 'content': template['content'],
+                'author': main.users[author_id]['name'], 'author_id': author_id,
+                'date': created_at.strftime('%m/%d'), 'views': rng.randint(0, 500),
+                'likes': 0, 'created_at': created_at}
+
+    batched(main, (('posts', post(pid)) for pid in post_ids))
+    likes = {}
+    for post_id in post_ids:
+        likers = set(rng.sample(user_ids, min(len(user_ids), int(rng.expovariate(0.3)))))
+        if likers:
+            likes[post_id] = likers
+    with main.storage.transaction():
+        for post_id, likers in likes.items():
+            main.post_likes[post_id] = likers
+            record = main.posts[post_id]
+            record['likes'] = len(likers)
+            main.posts[post_id] = record
+            main.index_post(record)
+
+    def comment(comment_id: int) -> dict:
+        post_id = rng.choice(post_ids)
+        author_id = rng.choice(owners)
+        created_at = main.posts[post_id]['created_at'] + timedelta(minutes=rng.randint(1, 600))
+        return {'id': comment_id, 'post_id': post_id, 'author': main.users[author_id]['name'],
+                'author_id': author_id, 'content': rng.choice(base_posts)['content'],
+                'date': created_at.strftime('%m/%d %H:%M'), 'created_at': created_at}
+
+    batched(main, (('comments', comment(main.get_next_id('comment'))) for _ in range(sizes['comments'])))
+
+    # 예약: 장소/슬롯마다 앞으로의 시간을 겹치지 않게 순서대로 배정
+    next_free = {}
+    places = [('parking', sid) for sid in spot_ids] + [('ev', sid) for sid in station_ids]
+
+    def reservation(reservation_id: int) -> dict:
+        place_type, place_id = rng.choice(places)
+        slot = rng.randrange(main.get_place_collection(place_type)[place_id]['total'])
+        start = next_free.get((place_type, place_id, slot), now + timedelta(hours=1))
+        start += timedelta(minutes=rng.choice((0, 30, 60)))
+        end = start + timedelta(hours=rng.randint(1, 3))
+        next_free[(place_type, place_id, slot)] = end
+        return {'id': reservation_id, 'user_id': rng.choice(owners), 'place_id': place_id,
+                'place_type': place_type, 'slot': slot, 'start_time': start.isoformat(),
+                'end_time': end.isoformat(), 'created_at': now.isoformat()}
+
+    batched(main, (('reservations', reservation(main.get_next_id('reservation')))
+                   for _ in range(sizes['reservations'])))
+    with main.storage.transaction():
+        for place_type, place_id in {(t, i) for t, i, _ in next_free}:
+            place_data = main.get_place_collection(place_type)[place_id]
+            main.refresh_available(place_type, place_data, main.get_place_schedule(place_type, place_id))
+
+    return {
+        'admin_id': admin_id,
+        'admin_token': main.issue_token(main.users[admin_id])[0],
+        'user_ids': user_ids,
+        'spot_ids': sorted(main.parking_spots),
+        'station_ids': sorted(main.ev_stations),
+        'post_ids': sorted(main.posts),
+        'admin_spot_ids': main.parking_spots_by_owner.ids(admin_id),
+        'admin_station_ids': main.ev_stations_by_owner.ids(admin_id),
+        'admin_post_ids': main.posts_by_author.ids(admin_id),
+        'admin_reservation_ids': main.reservations_by_user.ids(admin_id),
+    }
+
+
+# ============================================================================
+# 요청 전송 (테스트 클라이언트 / HTTP)
+# ============================================================================
+
+class TestClientTransport:
+    """Flask 테스트 클라이언트로 요청 - (status, body bytes) 반환"""
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def send(self, method: str, path: str, body=None, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token is not None else {}
+        if isinstance(body, bytes):  # 대량 등록 본문 (NDJSON)
+            response = self.client.open(path, method=method, data=body, headers=headers,
+                                        content_type='application/x-ndjson')
+        else:
+            response = self.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_data()
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    """
+    gunicorn에 keep-alive HTTP 연결로 요청
+    서버가 유휴 연결을 먼저 닫았으면(keep-alive 시간 초과) 새 연결로 한 번만 다시 보냄
+    """
+    def __init__(self, port: int):
+        self.port = port
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+
+    def send(self, method: str, path: str, body=None, token=None):
+        try:
+            return self._request(method, path, body, token)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+            return self._request(method, path, body, token)
+
+    def _request(self, method: str, path: str, body, token):
+        if isinstance(body, bytes):  # 대량 등록 본문 (NDJSON)
+            headers = {'Content-Type': 'application/x-ndjson'}
+        else:
+            headers = {'Content-Type': 'application/json'}
+            body = json.dumps(body) if body is not None else None
+        if token is not None:
+            headers['Authorization'] = f'Bearer {token}'
+        self.conn.request(method, path, body=body, headers=headers)
+        response = self.conn.getresponse()
+        return response.status, response.read()
+
+    def close(self):
+        self.conn.close()
+
+
+# ============================================================================
+# 엔드포인트별 시나리오
+# ============================================================================
+# (이름, 메서드, 경로 함수, 본문 함수, 인증 사용자 여부, 준비 함수)
+# 인증 사용자 여부: True면 관리자 토큰, 'prepared'면 준비 함수가 돌려준 토큰으로 요청
+# 경로/본문 함수는 (rng, n, target)을 받음 - n은 시나리오 안에서 몇 번째 요청인지, target은 준비 함수 결과
+# 준비 함수는 (send, rng, n) → target, 측정 시간에 포함되지 않음
+
+reservation_seq = count()  # 측정 중 만드는 예약마다 서로 다른 시간대 (모드가 바뀌어도 이어서 증가)
+
+
+def reservation_body(ctx: dict, rng: random.Random) -> dict:
+    """시드 예약/다른 측정 예약과 겹치지 않는 1시간짜리 예약 요청 본문"""
+    start = RESERVATION_BASE + timedelta(hours=next(reservation_seq))
+    return {'place_id': rng.choice(ctx['spot_ids']), 'place_type': 'parking', 'slot': 0,
+            'start_time': start.isoformat(), 'end_time': (start + timedelta(hours=1)).isoformat()}
+
+
+def created_id(response) -> int:
+    status, data = response
+    if status != 201:
+        raise RuntimeError(f'prepare failed: {status} {data[:200]!r}')
+    return json.loads(data)['id']
+
+
+def scenarios(ctx: dict) -> list:
+    pick = lambda key: lambda rng, n, target: rng.choice(ctx[key])  # noqa: E731
+    spot = {'name': '벤치 주차장', 'address': '대전광역시 유성구 대학로 201', 'rows': 3, 'cols': 4,
+            'latitude': 36.35, 'longitude': 127.38, 'price_per_hour': 1500}
+    station = {'name': '벤치 충전소', 'address': '대전광역시 유성구 대학로 201', 'rows': 2, 'cols': 2,
+               'latitude': 36.36, 'longitude': 127.36, 'price_per_kwh': 250}
+    article = {'title': '벤치 게시글', 'content': '부하 테스트용 게시글입니다.'}
+    spot_rows = ''.join(json.dumps(dict(spot, name=f'벤치 주차장 {i}')) + '\n' for i in range(BULK_ROWS)).encode()
+    station_rows = ''.join(json.dumps(dict(station, name=f'벤치 충전소 {i}')) + '\n'
+                           for i in range(BULK_ROWS)).encode()
+
+    def make(path: str, body: dict):
+        return lambda send, rng, n: created_id(send('POST', path, body, ctx['admin_token']))
+
+    def make_reservation(send, rng, n):
+        return created_id(send('POST', '/api/reservations', reservation_body(ctx, rng), ctx['admin_token']))
+
+    def make_favorite(send, rng, n):
+        spot_id = rng.choice(ctx['spot_ids'])
+        send('POST', f'/api/favorites/{spot_id}', {'place_type': 'parking'}, ctx['admin_token'])
+        return spot_id
+
+    def login(send, rng, n):
+        # 로그아웃하면 그 사용자의 토큰이 모두 무효화되므로 관리자 대신 생성 사용자로 로그인한 토큰을 씀
+        status, data = send('POST', '/api/login',
+                            {'email': f'bench{rng.choice(ctx["user_ids"])}@plinku', 'password': 'pw'})
+        if status != 200:
+            raise RuntimeError(f'login failed: {status}')
+        return json.loads(data)['token']
+
+    return [
+        ('health', 'GET', lambda rng, n, t: '/api/health', None, False, None),
+        ('signup', 'POST', lambda rng, n, t: '/api/signup',
+         lambda rng, n, t: {'email': f'signup-{time.time_ns()}-{n}@plinku', 'password': 'pw'}, False, None),
+        ('login', 'POST', lambda rng, n, t: '/api/login',
+         lambda rng, n, t: {'email': f'bench{rng.choice(ctx["user_ids"])}@plinku', 'password': 'pw'},
+         False, None),
+        ('logout', 'POST', lambda rng, n, t: '/api/logout', None, 'prepared', login),
+
+        ('parking_list', 'GET',
+         lambda rng, n, t: f'/api/parking-spots?page={rng.randint(1, 20)}&per_page=20', None, False, None),
+        ('parking_list_filtered', 'GET',
+         lambda rng, n, t: (f'/api/parking-spots?min_available=1&max_price={rng.randrange(1000, 5001, 500)}'
+                            f'&lat=36.35&lng=127.38&radius_km={rng.choice((1, 3, 5))}&per_page=20'),
+         None, False, None),
+        ('parking_list_cursor', 'GET', lambda rng, n, t: '/api/parking-spots?cursor=&per_page=20',
+         None, False, None),
+        ('parking_detail', 'GET', lambda rng, n, t: f'/api/parking-spots/{rng.choice(ctx["spot_ids"])}',
+         None, False, None),
+        ('parking_create', 'POST', lambda rng, n, t: '/api/parking-spots', lambda rng, n, t: spot, True, None),
+        ('parking_update', 'PUT', lambda rng, n, t: f'/api/parking-spots/{rng.choice(ctx["admin_spot_ids"])}',
+         lambda rng, n, t: {'price_per_hour': rng.randrange(500, 5001, 100)}, True, None),
+        ('parking_delete', 'DELETE', lambda rng, n, t: f'/api/parking-spots/{t}', None, True,
+         make('/api/parking-spots', spot)),
+        ('parking_bulk', 'POST', lambda rng, n, t: '/api/parking-spots/bulk', lambda rng, n, t: spot_rows,
+         True, None),
+        ('parking_export', 'GET', lambda rng, n, t: '/api/parking-spots/export', None, False, None),
+        ('my_parking_spots', 'GET', lambda rng, n, t: '/api/my-parking-spots', None, True, None),
+
+        ('favorites_list', 'GET', lambda rng, n, t: '/api/favorites', None, True, None),
+        ('favorite_add', 'POST', lambda rng, n, t: f'/api/favorites/{rng.choice(ctx["spot_ids"])}',
+         lambda rng, n, t: {'place_type': 'parking'}, True, None),
+        ('favorite_remove', 'DELETE', lambda rng, n, t: f'/api/favorites/{t}',
+         lambda rng, n, t: {'place_type': 'parking'}, True, make_favorite),
+
+        ('ev_list', 'GET', lambda rng, n, t: f'/api/ev-stations?page={rng.randint(1, 10)}&per_page=20',
+         None, False, None),
+        ('ev_detail', 'GET', lambda rng, n, t: f'/api/ev-stations/{rng.choice(ctx["station_ids"])}',
+         None, False, None),
+        ('ev_create', 'POST', lambda rng, n, t: '/api/ev-stations', lambda rng, n, t: station, True, None),
+        ('ev_update', 'PUT', lambda rng, n, t: f'/api/ev-stations/{rng.choice(ctx["admin_station_ids"])}',
+         lambda rng, n, t: {'price_per_kwh': rng.randrange(150, 401, 10)}, True, None),
+        ('ev_delete', 'DELETE', lambda rng, n, t: f'/api/ev-stations/{t}', None, True,
+         make('/api/ev-stations', station)),
+        ('ev_bulk', 'POST', lambda rng, n, t: '/api/ev-stations/bulk', lambda rng, n, t: station_rows,
+         True, None),
+        ('ev_export', 'GET', lambda rng, n, t: '/api/ev-stations/export', None, False, None),
+        ('my_ev_stations', 'GET', lambda rng, n, t: '/api/my-ev-stations', None, True, None),
+
+        ('reservation_create', 'POST', lambda rng, n, t: '/api/reservations',
+         lambda rng, n, t: reservation_body(ctx, rng), True, None),
+        ('reservation_detail', 'GET',
+         lambda rng, n, t: f'/api/reservations/{rng.choice(ctx["admin_reservation_ids"])}', None, True, None),
+        ('my_reservations', 'GET', lambda rng, n, t: '/api/my-reservations', None, True, None),
+        ('reservation_cancel', 'DELETE', lambda rng, n, t: f'/api/reservations/{t}', None, True,
+         make_reservation),
+
+        ('posts_list', 'GET', lambda rng, n, t: f'/api/posts?page={rng.randint(1, 20)}&per_page=20',
+         None, False, None),
+        ('posts_list_likes', 'GET', lambda rng, n, t: '/api/posts?sort=likes&per_page=20', None, False, None),
+        ('posts_popular', 'GET', lambda rng, n, t: '/api/posts/popular?limit=10', None, False, None),
+        ('post_detail', 'GET', lambda rng, n, t: f'/api/posts/{rng.choice(ctx["post_ids"])}', None, False, None),
+        ('post_comments', 'GET', lambda rng, n, t: f'/api/posts/{rng.choice(ctx["post_ids"])}/comments',
+         None, False, None),
+        ('post_create', 'POST', lambda rng, n, t: '/api/posts', lambda rng, n, t: article, True, None),
+        ('post_update', 'PUT', lambda rng, n, t: f'/api/posts/{rng.choice(ctx["admin_post_ids"])}',
+         lambda rng, n, t: {'content': f'수정된 내용 {n}'}, True, None),
+        ('post_delete', 'DELETE', lambda rng, n, t: f'/api/posts/{t}', None, True, make('/api/posts', article)),
+        ('my_posts', 'GET', lambda rng, n, t: '/api/my-posts', None, True, None),
+        ('comment_create', 'POST', lambda rng, n, t: f'/api/posts/{rng.choice(ctx["post_ids"])}/comments',
+         lambda rng, n, t: {'content': '부하 테스트 댓글'}, True, None),
+        ('post_like', 'POST', lambda rng, n, t: f'/api/posts/{rng.choice(ctx["post_ids"])}/like',
+         None, True, None),
+
+        ('events_stats', 'GET', lambda rng, n, t: '/api/events/stats', None, False, None),
+        ('metrics', 'GET', lambda rng, n, t: '/api/metrics', None, False, None),
+    ]
+
+
+# ============================================================================
+# 측정
+# ============================================================================
+
+def percentile(samples: list, q: float) -> float:
+    """정렬된 samples의 q 분위수 (nearest-rank)"""
+    if not samples:
+        return 0.0
+    return samples[max(0, math.ceil(q * len(samples)) - 1)]
+
+
+def measure(scenario: tuple, ctx: dict, transports: list, requests: int, seed_value: int) -> dict:
+    """시나리오 하나를 transports 수만큼의 스레드로 requests번 실행"""
+    name, method, path_of, body_of, auth, prepare = scenario
+    token = ctx['admin_token'] if auth else None
+    jobs = list(range(requests))
+    samples, statuses, errors = [], {}, [0]
+    lock = threading.Lock()
+
+    def worker(index: int):
+        transport = transports[index]
+        rng = random.Random(f'{seed_value}-{name}-{index}')
+        local_samples, local_statuses, local_errors = [], {}, 0
+        for n in jobs[index::len(transports)]:
+            try:
+                target = prepare(transport.send, rng, n) if prepare else None
+                path = path_of(rng, n, target)
+                body = body_of(rng, n, target) if body_of else None
+                started = time.perf_counter()
+                status, _ = transport.send(method, path, body, target if auth == 'prepared' else token)
+                local_samples.append((time.perf_counter() - started) * 1000)
+            except (OSError, http.client.HTTPException, RuntimeError):
+                local_errors += 1
+                continue
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+            if status >= 500:
+                local_errors += 1
+        with lock:
+            samples.extend(local_samples)
+            errors[0] += local_errors
+            for status, n in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + n
+        return sum(local_samples)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(len(transports)) as pool:
+        list(pool.map(worker, range(len(transports))))
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    if prepare:
+        elapsed = sum(samples) / 1000 / len(transports)  # 준비 요청 시간은 빼고 스레드당 측정 요청에 쓴 시간만
+    return {
+        'endpoint': name,
+        'method': method,
+        'requests': len(samples),
+        'errors': errors[0],
+        'status': {str(k): v for k, v in sorted(statuses.items())},
+        'p50_ms': round(percentile(samples, 0.50), 3),
+        'p95_ms': round(percentile(samples, 0.95), 3),
+        'p99_ms': round(percentile(samples, 0.99), 3),
+        'rps': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        'elapsed_s': round(elapsed, 3),
+    }
+
+
+def run_mode(mode: str, ctx: dict, make_transport, args) -> list:
+    selected = [s for s in scenarios(ctx) if not args.endpoints or s[0] in args.endpoints]
+    results = []
+    for scenario in selected:
+        transports = [make_transport() for _ in range(args.concurrency)]
+        try:
+            result = measure(scenario, ctx, transports, args.requests, args.seed)
+        finally:
+            for transport in transports:
+                transport.close()
+        result['mode'] = mode
+        results.append(result)
+        print(f"{mode:>8} {result['endpoint']:<22} {result['method']:<6} {result['requests']:>7} "
+              f"{result['errors']:>6} {result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9} "
+              f"{result['rps']:>10}", flush=True)
+    return results
+
+
+def run_gunicorn(ctx: dict, args, env: dict) -> list:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers), '--worker-class', 'gthread',
+         '--threads', str(max(4, args.concurrency)), '--bind', f'127.0.0.1:{port}',
+         '--log-level', 'warning', 'main:app'],
+        cwd=BE_DIR, env=env)
+    try:
+        wait_ready(port, timeout=60)
+        return run_mode('gunicorn', ctx, lambda: HTTPTransport(port), args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['client', 'gunicorn', 'both'], default='client')
+    parser.add_argument('--backend', choices=['memory', 'sqlite'], default='memory',
+                        help='client 모드 저장소 (gunicorn이 포함되면 항상 sqlite)')
+    parser.add_argument('--scale', type=float, default=1.0, help='데이터 규모 배수 (개별 지정값에는 적용 안 됨)')
+    for name, size in DEFAULT_SIZES.items():
+        parser.add_argument(f'--{name}', type=int, help=f'생성할 개수 (기본 {size} × scale)')
+    parser.add_argument('--requests', type=int, default=300, help='엔드포인트별 요청 수')
+    parser.add_argument('--concurrency', type=int, default=4, help='엔드포인트별 동시 요청 스레드 수')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn 워커 수')
+    parser.add_argument('--endpoints', nargs='+', help='측정할 엔드포인트 이름 (기본: 전체)')
+    parser.add_argument('--seed', type=int, default=0, help='데이터/요청 난수 시드')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    sizes = {name: getattr(args, name) if getattr(args, name) is not None else max(1, int(size * args.scale))
+             for name, size in DEFAULT_SIZES.items()}
+    workdir = tempfile.mkdtemp(prefix='plinku-bench-api-')
+    backend = 'sqlite' if args.mode != 'client' else args.backend
+    env = dict(os.environ, PLINKU_STORAGE=backend, PLINKU_DB_PATH=os.path.join(workdir, 'parking.db'),
+               PLINKU_SECRET_KEY=os.environ.get('PLINKU_SECRET_KEY') or secrets.token_hex(32),
+               PLINKU_RATE_LIMIT='0')  # 한 클라이언트가 같은 라우트를 반복 호출하므로 속도 제한은 끔
+    os.environ.update(env)  # main 모듈은 import 시점에 환경 변수로 저장소를 고름
+    try:
+        main = importlib.import_module('main')
+        started = time.perf_counter()
+        ctx = seed(main, sizes, args.seed)
+        seeded_s = round(time.perf_counter() - started, 2)
+        print(f'seeded {sizes} backend={backend} in {seeded_s}s')
+
+        print(f"{'mode':>8} {'endpoint':<22} {'method':<6} {'reqs':>7} {'errors':>6} "
+              f"{'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'req/s':>10}")
+        results = []
+        if args.mode in ('client', 'both'):
+            results += run_mode('client', ctx, lambda: TestClientTransport(main.app), args)
+        if args.mode in ('gunicorn', 'both'):
+            main.event_bus.join()
+            results += run_gunicorn(ctx, args, env)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'config': {'mode': args.mode, 'backend': backend, 'sizes': sizes, 'seed': args.seed,
+                           'requests': args.requests, 'concurrency': args.concurrency,
+                           'workers': args.workers, 'seed_seconds': seeded_s},
+                'results': results,
+            }, f, indent=2, ensure_ascii=False)
+    sys.exit(1 if any(r['errors'] for r in results) else 0)
+
+
+if __name__ == '__main__':
+    run()
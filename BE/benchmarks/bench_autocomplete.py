@@ -0,0 +1,92 @@
+"""
+장소 자동완성 지연 시간 벤치마크 (장소 수 1만 → 10만)
+
+주차장/충전소를 절반씩 늘려가며 index_parking_spots/index_ev_stations로 직접 채워 넣고,
+한 글자씩 입력하는 것처럼 조합 중인 접두사("ㄷ", "대", "대저", "대전", "대전ㅇ", "대전여" ...)로
+GET /api/places/autocomplete를 호출해서 평균/p99 지연 시간을 잰다. 목표는 10만 곳에서 5ms 이하.
+
+사용법 (BE 디렉토리에서):
+    python benchmarks/bench_autocomplete.py --sizes 10000 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+AREAS = ['대전역', '둔산동', '현충원역', '구암역', '유성온천', '갑천', '월평동', '탄방동', '서대전', '오룡역',
+         '한밭대학교', '충남대학교', '카이스트', '엑스포공원', '관저동', '도안동', '노은역', '신탄진', '가양동', '용문역']
+KINDS = ['공영주차장', '주차장', '노상주차장', '환승주차장', '전기차 충전소', '급속충전소']
+DISTRICTS = ['동구', '중구', '서구', '유성구', '대덕구']
+# 한 글자씩 입력할 때 서버로 가는 질의 (한글 조합 중간 상태 포함)
+KEYSTROKES = ['ㄷ', '대', '대ㅈ', '대저', '대전', '대전ㅇ', '대전여', '대전역',
+              'ㄷ', '두', '둔', '둔ㅅ', '둔사', '둔산', '둔산ㄷ', '둔산도', '둔산동',
+              'ㅎ', '하', '한', '한ㅂ', '한바', '한밭', '한밭ㄷ', '한밭대', '유성구 ㄱ', '서구 탄방']
+
+
+def fill_places(count: int, rng: random.Random):
+    """장소 수가 count가 될 때까지 주차장/충전소를 절반씩 추가"""
+    for collection, index_many, place_type in ((main.parking_spots, main.index_parking_spots, 'parking'),
+                                               (main.ev_stations, main.index_ev_stations, 'ev')):
+        batch = []
+        for _ in range(len(collection), count // 2):
+            place_id = main.get_next_id(place_type)
+            area = rng.choice(AREAS)
+            place = {
+                'id': place_id, 'name': f'{area} {rng.choice(KINDS)} {rng.randint(1, 99)}',
+                'address': f'대전광역시 {rng.choice(DISTRICTS)} {area}로 {rng.randint(1, 999)}',
+                'latitude': 36.3 + rng.random() * 0.1, 'longitude': 127.3 + rng.random() * 0.15,
+                'available': 4, 'total': 4, 'owner_id': None,
+            }
+            dict.__setitem__(collection, place_id, place)
+            batch.append(place)
+            if len(batch) == 1000:
+                index_many(batch)
+                batch = []
+        index_many(batch)
+
+
+def measure(client, count: int, iterations: int) -> dict:
+    rng = random.Random(count)
+    samples = []
+    for _ in range(iterations):
+        params = {'q': rng.choice(KEYSTROKES), 'limit': 10}
+        if rng.random() < 0.5:
+            params.update(lat=36.35, lng=127.38)
+        started = time.perf_counter()
+        response = client.get('/api/places/autocomplete', query_string=params)
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+    samples.sort()
+    return {
+        'places': count,
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'p99_ms': round(samples[int(len(samples) * 0.99) - 1], 3),
+    }
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    client = main.app.test_client()
+    rng = random.Random(args.seed)
+    print(f"{'places':>10} {'index_s':>8} {'mean_ms':>9} {'p99_ms':>9}")
+    for count in sorted(args.sizes):
+        started = time.perf_counter()
+        fill_places(count, rng)
+        index_s = round(time.perf_counter() - started, 1)
+        result = measure(client, count, args.iterations)
+        print(f"{result['places']:>10} {index_s:>8} {result['mean_ms']:>9} {result['p99_ms']:>9}", flush=True)
+
+
+if __name__ == '__main__':
+    run()
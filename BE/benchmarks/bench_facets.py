@@ -0,0 +1,125 @@
+"""
+주차장 패싯 필터 지연 시간 벤치마크 (주차장 수 1만 → 10만)
+
+주차장을 늘려가며 index_parking_spots로 직접 채워 넣고, 여러 조건을 조합한 필터
+(EV + 24시간 + 빈자리 많음 + 가격대 + 근처 반경 ...)로
+- 패싯 교집합(parking_spot_facets.query, 작은 집합부터)
+- 모든 주차장을 한 번씩 확인하는 선형 스캔 (비교 기준)
+- GET /api/parking-spots (패싯 개수 포함 전체 응답)
+의 평균/p99 지연 시간을 잰다. 두 방식의 결과가 다르면 종료 코드 1.
+
+사용법 (BE 디렉토리에서):
+    python benchmarks/bench_facets.py --sizes 10000 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+CENTER = (36.35, 127.38)
+# 조합할 조건 후보 (속성 → 고를 수 있는 값 목록)
+CHOICES = {
+    'is_ev': ['true', 'false'],
+    'hours': ['24h', 'limited'],
+    'availability': ['few', 'many', 'few,many'],
+    'price_band': ['0-1000', '1001-2000', '0-1000,1001-2000', '3001-5000,5001+'],
+}
+
+
+def fill_spots(count: int, rng: random.Random):
+    """주차장 수가 count가 될 때까지 추가 (HTTP를 거치지 않고 직접 등록)"""
+    batch = []
+    for _ in range(len(main.parking_spots), count):
+        spot_id = main.get_next_id('parking')
+        total = rng.randint(4, 40)
+        spot = {
+            'id': spot_id, 'name': f'주차장 {spot_id}', 'address': '대전광역시',
+            'latitude': 36.2 + rng.random() * 0.3, 'longitude': 127.2 + rng.random() * 0.35,
+            'is_ev': rng.random() < 0.2, 'price_per_hour': rng.choice([500, 1000, 1500, 2000, 3000, 4000, 6000]),
+            'operating_hours': rng.choice(['24시간', '09:00-18:00', '06:00-23:00']),
+            'available': rng.randint(0, total), 'total': total, 'distance': round(rng.random() * 10, 1),
+            'owner_id': None,
+        }
+        dict.__setitem__(main.parking_spots, spot_id, spot)
+        batch.append(spot)
+        if len(batch) == 1000:
+            main.index_parking_spots(batch)
+            batch = []
+    main.index_parking_spots(batch)
+
+
+def make_params(rng: random.Random) -> dict:
+    """조건 2~4개 + 절반은 근처 반경 조건"""
+    params = {name: rng.choice(values) for name, values in rng.sample(sorted(CHOICES.items()), rng.randint(2, 4))}
+    if rng.random() < 0.5:
+        params.update(lat=CENTER[0], lng=CENTER[1], radius_km=rng.choice([1, 3, 5]))
+    return params
+
+
+def scan(params: dict) -> set:
+    """비교 기준: 모든 주차장을 한 번씩 확인"""
+    wanted = {name: set(params[name].split(',')) for name in CHOICES if name in params}
+    result = set()
+    for spot in main.parking_spots.values():
+        if not all(main.facet_label(main.PARKING_FACETS[name][0](spot)) in values for name, values in wanted.items()):
+            continue
+        if 'radius_km' in params and main.haversine_km(
+                params['lat'], params['lng'], spot['latitude'], spot['longitude']) > params['radius_km']:
+            continue
+        result.add(spot['id'])
+    return result
+
+
+def indexed(params: dict) -> set:
+    filters, _ = main.parse_facet_filters(params, main.PARKING_FACETS)
+    extra = []
+    if 'radius_km' in params:
+        extra = [[main.parking_spot_grid.ids_within(params['lat'], params['lng'], params['radius_km'])]]
+    return main.parking_spot_facets.query(filters, extra)
+
+
+def timed(fn, queries) -> tuple:
+    samples = []
+    results = []
+    for params in queries:
+        started = time.perf_counter()
+        results.append(fn(params))
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return round(statistics.fmean(samples), 3), round(samples[int(len(samples) * 0.99) - 1], 3), results
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    client = main.app.test_client()
+    rng = random.Random(args.seed)
+    print(f"{'spots':>10} {'matches':>8} {'index_ms':>9} {'index_p99':>10} {'scan_ms':>9} {'api_ms':>9} {'api_p99':>9}")
+    ok = True
+    for count in sorted(args.sizes):
+        fill_spots(count, rng)
+        queries = [make_params(rng) for _ in range(args.iterations)]
+        index_ms, index_p99, found = timed(indexed, queries)
+        scan_ms, _, expected = timed(scan, queries[:max(1, args.iterations // 10)])
+        ok = ok and found[:len(expected)] == expected
+        api_ms, api_p99, _ = timed(
+            lambda params: client.get('/api/parking-spots', query_string={**params, 'per_page': 10}).get_json(),
+            queries)
+        matches = round(statistics.fmean(map(len, found)))
+        print(f"{count:>10} {matches:>8} {index_ms:>9} {index_p99:>10} {scan_ms:>9} {api_ms:>9} {api_p99:>9}", flush=True)
+    print('OK' if ok else 'MISMATCH')
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    run()
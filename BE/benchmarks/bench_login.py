@@ -0,0 +1,69 @@
+"""
+로그인 지연 시간 벤치마크 (사용자 수 1천 → 1백만)
+
+사용자 수를 늘려가며 users/users_by_email에 직접 채워 넣고,
+Flask 테스트 클라이언트로 POST /api/login을 반복 호출해서 평균/p99 지연 시간을 잰다.
+이메일 인덱스 덕분에 사용자 수와 관계없이 지연 시간이 일정해야 한다.
+(로그인 시간 대부분은 비밀번호 해시(PBKDF2) 계산 - PLINKU_PASSWORD_ITERATIONS로 조절)
+
+사용법 (BE 디렉토리에서):
+    python benchmarks/bench_login.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('PLINKU_RATE_LIMIT', '0')  # 한 사용자/IP로 반복 요청하므로 속도 제한은 끔
+
+import main  # noqa: E402
+
+
+PASSWORD_HASH = main.hash_password('pw')  # 해시 계산은 느리므로 한 번만 하고 모든 사용자가 공유
+
+
+def fill_users(count: int):
+    """사용자 수가 count가 될 때까지 추가 (HTTP를 거치지 않고 직접 등록)"""
+    for user_id in range(len(main.users) + 1, count + 1):
+        user = {'id': user_id, 'email': f'user{user_id}@plinku', 'password': PASSWORD_HASH,
+                'name': f'user{user_id}'}
+        dict.__setitem__(main.users, user_id, user)
+        main.index_user(user)
+
+
+def measure(client, count: int, iterations: int) -> dict:
+    rng = random.Random(count)
+    samples = []
+    for _ in range(iterations):
+        user_id = rng.randint(1, count)
+        started = time.perf_counter()
+        response = client.post('/api/login', json={'email': f'user{user_id}@plinku', 'password': 'pw'})
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+    samples.sort()
+    return {
+        'users': count,
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'p99_ms': round(samples[int(len(samples) * 0.99) - 1], 3),
+    }
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    client = main.app.test_client()
+    print(f"{'users':>10} {'mean_ms':>9} {'p99_ms':>9}")
+    for count in sorted(args.sizes):
+        fill_users(count)
+        result = measure(client, count, args.iterations)
+        print(f"{result['users']:>10} {result['mean_ms']:>9} {result['p99_ms']:>9}")
+
+
+if __name__ == '__main__':
+    run()
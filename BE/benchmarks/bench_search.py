@@ -0,0 +1,105 @@
+"""
+게시글 검색 지연 시간 벤치마크 (게시글 수 1만 → 1백만)
+
+게시글 수를 늘려가며 posts에 직접 채워 넣고(색인 포함),
+Flask 테스트 클라이언트로 GET /api/posts/search를 반복 호출해서 평균/p99 지연 시간을 잰다.
+비교용으로 같은 질의를 전체 게시글 부분 문자열 검색(스캔)으로 처리한 시간도 함께 출력.
+게시글 내용은 시연용 게시글의 단어를 무작위로 섞어서 만든다 (시드 고정).
+
+사용법 (BE 디렉토리에서):
+    python benchmarks/bench_search.py --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+QUERIES = ['주차장', '전기차 충전', '한밭대 할인', '예약 취소', 'N4', '충전소 후기', '대전역 주변 주차장']
+
+
+def vocabulary() -> list:
+    main.init_dummy_data()
+    words = set()
+    for post in main.posts.values():
+        words.update(post['title'].split())
+        words.update(post['content'].split())
+    return sorted(words)
+
+
+def fill_posts(count: int, words: list, rng: random.Random):
+    """게시글 수가 count가 될 때까지 추가 (HTTP를 거치지 않고 직접 등록)"""
+    now = datetime.now()
+    for _ in range(len(main.posts), count):
+        post_id = main.get_next_id('post')
+        post = {
+            'id': post_id,
+            'title': ' '.join(rng.choices(words, k=rng.randint(2, 5))),
+            'content': ' '.join(rng.choices(words, k=rng.randint(5, 15))),
+            'author': '벤치', 'author_id': None, 'date': now.strftime('%m/%d'),
+            'views': 0, 'likes': rng.randint(0, 20),
+            'created_at': now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+        }
+        dict.__setitem__(main.posts, post_id, post)
+        main.index_post(post)
+
+
+def scan(query: str) -> int:
+    """비교용: 색인 없이 전체 게시글 부분 문자열 검색"""
+    words = query.split()
+    return sum(1 for post in main.posts.values()
+               if all(w in post['title'] or w in post['content'] for w in words))
+
+
+def measure(client, count: int, iterations: int, scan_iterations: int) -> dict:
+    rng = random.Random(count)
+    samples = []
+    for _ in range(iterations):
+        query = rng.choice(QUERIES)
+        started = time.perf_counter()
+        response = client.get('/api/posts/search', query_string={'q': query, 'per_page': 10})
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+    scans = []
+    for i in range(scan_iterations):
+        started = time.perf_counter()
+        scan(QUERIES[i % len(QUERIES)])
+        scans.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'posts': count,
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'p99_ms': round(samples[int(len(samples) * 0.99) - 1], 3),
+        'scan_ms': round(statistics.fmean(scans), 1) if scans else None,
+    }
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--scan-iterations', type=int, default=3, help='비교용 전체 스캔 횟수 (0이면 생략)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    client = main.app.test_client()
+    rng = random.Random(args.seed)
+    words = vocabulary()
+    print(f"{'posts':>10} {'index_s':>8} {'mean_ms':>9} {'p99_ms':>9} {'scan_ms':>9}")
+    for count in sorted(args.sizes):
+        started = time.perf_counter()
+        fill_posts(count, words, rng)
+        index_s = round(time.perf_counter() - started, 1)
+        result = measure(client, count, args.iterations, args.scan_iterations)
+        print(f"{result['posts']:>10} {index_s:>8} {result['mean_ms']:>9} {result['p99_ms']:>9} "
+              f"{result['scan_ms'] or '-':>9}", flush=True)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,147 @@
+"""
+gunicorn 워커 수별 처리량(requests/sec) 비교 벤치마크
+
+SQLite 공유 저장소(PLINKU_STORAGE=sqlite)로 gunicorn을 1, 4, 8 워커로 띄우고
+같은 혼합 부하(목록 조회 / 상세 조회 / 좋아요 토글)를 보내서 처리량을 비교한다.
+
+사용법 (BE 디렉토리에서):
+    python benchmarks/bench_workers.py --duration 10 --clients 32
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def request(conn: http.client.HTTPConnection, method: str, path: str, body=None, token=None):
+    headers = {'Content-Type': 'application/json'}
+    if token is not None:
+        headers['Authorization'] = f'Bearer {token}'
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    return response.status, data
+
+
+def wait_ready(port: int, timeout: float = 15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            status, _ = request(conn, 'GET', '/api/health')
+            conn.close()
+            if status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('gunicorn did not start')
+
+
+def seed(port: int, spots: int, posts: int) -> str:
+    """사용자 1명 + 주차장/게시글 생성, 사용자 세션 토큰 반환"""
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    _, data = request(conn, 'POST', '/api/signup', {'email': 'bench@plinku', 'password': 'bench'})
+    token = json.loads(data)['token']
+    for i in range(spots):
+        request(conn, 'POST', '/api/parking-spots', {
+            'name': f'벤치 주차장 {i}', 'address': '대전광역시',
+            'latitude': 36.3 + random.random() * 0.1, 'longitude': 127.3 + random.random() * 0.1,
+        }, token)
+    for i in range(posts):
+        request(conn, 'POST', '/api/posts', {'title': f'게시글 {i}', 'content': '내용'}, token)
+    conn.close()
+    return token
+
+
+def client_loop(args):
+    """클라이언트 프로세스 하나: duration 동안 요청을 보내고 성공 횟수 반환"""
+    port, duration, token, spots, posts, seed_value = args
+    rng = random.Random(seed_value)
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    done = errors = 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        roll = rng.random()
+        if roll < 0.5:
+            path, method = f'/api/parking-spots?page={rng.randint(1, 5)}&per_page=20', 'GET'
+        elif roll < 0.9:
+            path, method = f'/api/parking-spots/{rng.randint(1, spots)}', 'GET'
+        else:
+            path, method = f'/api/posts/{rng.randint(1, posts)}/like', 'POST'
+        try:
+            status, _ = request(conn, method, path, token=token if method == 'POST' else None)
+            if status < 500:
+                done += 1
+            else:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.close()
+    return done, errors
+
+
+def run(workers: int, args) -> dict:
+    workdir = tempfile.mkdtemp(prefix='plinku-bench-')
+    port = free_port()
+    env = dict(os.environ, PLINKU_STORAGE='sqlite', PLINKU_DB_PATH=os.path.join(workdir, 'parking.db'),
+               PLINKU_RATE_LIMIT='0')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+         '--log-level', 'warning', 'main:app'],
+        cwd=BE_DIR, env=env)
+    try:
+        wait_ready(port)
+        token = seed(port, args.spots, args.posts)
+        jobs = [(port, args.duration, token, args.spots, args.posts, i) for i in range(args.clients)]
+        started = time.time()
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.map(client_loop, jobs)
+        elapsed = time.time() - started
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+    done = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    return {'workers': workers, 'requests': done, 'errors': errors, 'rps': round(done / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--duration', type=float, default=10.0, help='워커 수별 측정 시간(초)')
+    parser.add_argument('--clients', type=int, default=32, help='동시 클라이언트 프로세스 수')
+    parser.add_argument('--spots', type=int, default=500)
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    results = [run(workers, args) for workers in args.workers]
+    print(f"{'workers':>8} {'requests':>10} {'errors':>7} {'req/s':>10}")
+    for r in results:
+        print(f"{r['workers']:>8} {r['requests']:>10} {r['errors']:>7} {r['rps']:>10}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+동시 예약 스트레스 테스트
+
+여러 스레드가 Flask 테스트 클라이언트로 소수의 장소/슬롯/시간대에 수천 건의 예약을 동시에 보내고
+- 같은 (장소, 슬롯, 시간대)에 성공한 예약이 2건 이상인지 (이중 예약)
+- 예약 ID가 중복되지 않았는지
+- available이 지금 진행 중인 예약이 있는 슬롯 수와 맞는지 (시간대는 미래 → 예약이 있어도 전부 빈자리)
+를 확인한다. 이상이 있으면 종료 코드 1.
+
+사용법 (BE 디렉토리에서):
+    python benchmarks/stress_reservations.py --requests 5000 --threads 64
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('PLINKU_RATE_LIMIT', '0')  # 한 사용자/IP로 반복 요청하므로 속도 제한은 끔
+
+import main  # noqa: E402
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--places', type=int, default=4)
+    parser.add_argument('--slots', type=int, default=6)
+    parser.add_argument('--windows', type=int, default=8, help='시간대(1시간 단위) 개수')
+    args = parser.parse_args()
+
+    # 스레드 전환을 자주 일으켜서 경합 구간이 겹치게 만듦
+    sys.setswitchinterval(1e-6)
+
+    client = main.app.test_client()
+    response = client.post('/api/signup', json={'email': f'stress-{time.time()}', 'password': 'x'})
+    headers = {'Authorization': f"Bearer {response.get_json()['token']}"}
+    place_ids = []
+    for i in range(args.places):
+        response = client.post('/api/parking-spots', headers=headers, json={
+            'name': f'스트레스 {i}', 'address': '대전', 'rows': 1, 'cols': args.slots})
+        place_ids.append(response.get_json()['id'])
+
+    rng = random.Random(0)
+    jobs = [(rng.choice(place_ids), rng.randrange(args.slots), rng.randrange(args.windows))
+            for _ in range(args.requests)]
+    local = threading.local()
+
+    def book(job):
+        place_id, slot, window = job
+        if not hasattr(local, 'client'):
+            local.client = main.app.test_client()
+        response = local.client.post('/api/reservations', headers=headers, json={
+            'place_id': place_id, 'place_type': 'parking', 'slot': slot,
+            'start_time': f'2030-01-01T{window:02d}:00:00',
+            'end_time': f'2030-01-01T{window + 1:02d}:00:00',
+        })
+        return job, response.status_code, response.get_json()
+
+    started = time.time()
+    with ThreadPoolExecutor(args.threads) as pool:
+        results = list(pool.map(book, jobs))
+    elapsed = time.time() - started
+
+    booked = Counter(job for job, status, _ in results if status == 201)
+    ids = Counter(body['id'] for _, status, body in results if status == 201)
+    double_booked = {job: n for job, n in booked.items() if n > 1}
+    duplicate_ids = {rid: n for rid, n in ids.items() if n > 1}
+    server_errors = sum(1 for _, status, _ in results if status >= 500)
+    wrong_available = []
+    for place_id in place_ids:
+        # 미래 예약은 점유가 아님 → 같은 시간대를 지정해서 조회하면 예약된 슬롯이 taken
+        spot = client.get(f'/api/parking-spots/{place_id}').get_json()
+        if spot['available'] != args.slots:
+            wrong_available.append((place_id, spot['available'], args.slots))
+        for window in range(args.windows):
+            taken = {slot for (pid, slot, w) in booked if pid == place_id and w == window}
+            detail = client.get(f'/api/parking-spots/{place_id}', query_string={
+                'start_time': f'2030-01-01T{window:02d}:00:00', 'end_time': f'2030-01-01T{window + 1:02d}:00:00'})
+            shown = {slot['id'] for slot in detail.get_json()['slots'] if slot['taken']}
+            if shown != taken:
+                wrong_available.append((place_id, window, sorted(shown), sorted(taken)))
+
+    print(f'requests={len(results)} booked={sum(booked.values())} '
+          f'unique_targets={len(set(jobs))} elapsed={elapsed:.2f}s')
+    print(f'double_booked={len(double_booked)} duplicate_ids={len(duplicate_ids)} '
+          f'server_errors={server_errors} wrong_available={wrong_available}')
+    ok = (not double_booked and not duplicate_ids and not server_errors and not wrong_available
+          and sum(booked.values()) == len(set(jobs)))
+    print('OK' if ok else 'FAILED')
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    run()
@@ -2,16 +2,659 @@
 PlinkU 주차장 예약 시스템 백엔드
 Flask 기반 REST API 서버
 """
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import datetime, timedelta
 from typing import Dict, List, Set, Optional, Tuple
 from functools import wraps
+from itertools import count
+from contextlib import contextmanager, nullcontext
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, OrderedDict, deque
+from heapq import nlargest
+import atexit
+import base64
+import cProfile
+import csv
+import hashlib
+import hmac
 import json
+import math
+import os
+import pickle
+import queue
+import re
+import secrets
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import fcntl  # 스냅샷 저장소의 프로세스 잠금 (POSIX)
+except ImportError:
+    fcntl = None
 
 app = Flask(__name__)
 CORS(app)  # 프론트엔드와 통신을 위한 CORS 설정
 
+# ============================================================================
+# 저장소 계층: 인메모리(기본) / SQLite(멀티 워커 공유 상태)
+# ============================================================================
+# 
+# [플러그형 저장소]
+# 아래 컬렉션(parking_spots, users, ...)은 storage.collection()이 돌려주는 dict 계열 객체.
+# - memory: 평범한 dict → 단일 워커 전용, 기존 동작 그대로
+# - sqlite: SQLite(WAL 모드)를 원본으로 두고 워커마다 dict 복제본을 유지하는 ReplicatedDict
+#   쓰기는 SQLite에 바로 기록(write-through)하고 변경 로그(plinku_changes)에 남김
+#   요청 시작 시 다른 워커가 남긴 변경 로그만 읽어서 복제본과 파생 인덱스를 갱신 → 읽기는 dict 속도 그대로
+# - snapshot: 평범한 dict + 운영 로그(append-only) + 주기적 스냅샷 → 단일 워커, 재시작해도 상태 유지
+# 가변 객체(mutable object): 저장된 dict를 제자리에서 수정했다면 collection[key] = value로 다시 저장해야 공유됨.
+
+STORAGE_BACKEND = os.environ.get('PLINKU_STORAGE', 'memory')  # 'memory', 'sqlite' 또는 'snapshot'
+STORAGE_DB_PATH = os.environ.get('PLINKU_DB_PATH', os.path.join(app.instance_path, 'parking.db'))
+STORAGE_POOL_SIZE = int(os.environ.get('PLINKU_DB_POOL_SIZE', 4))
+SNAPSHOT_DIR = os.environ.get('PLINKU_DATA_DIR', app.instance_path)  # 스냅샷/운영 로그 위치 (snapshot 저장소)
+SNAPSHOT_EVERY = int(os.environ.get('PLINKU_SNAPSHOT_EVERY', 50000))  # 로그가 몇 건 쌓이면 스냅샷을 새로 만들지
+LOG_FSYNC_SEC = float(os.environ.get('PLINKU_LOG_FSYNC_SEC', 1.0))  # 운영 로그 fsync 주기(초)
+
+
+class MemoryStorage:
+    """
+    인메모리 저장소 - 모듈 전역 dict 그대로 사용 (단일 워커 전용)
+    """
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self._counter_lock = threading.Lock()
+
+    def collection(self, name: str) -> Dict:
+        return {}
+
+    def next_id(self, entity_type: str) -> int:
+        # 읽기-수정-쓰기를 잠금으로 묶어서 스레드 워커(--threads)에서도 ID 중복 방지
+        with self._counter_lock:
+            self.counters[entity_type] = self.counters.get(entity_type, 0) + 1
+            return self.counters[entity_type]
+
+    def transaction(self):
+        return nullcontext()
+
+    def sync(self):
+        pass
+
+
+class SQLiteConnectionPool:
+    """
+    SQLite 연결 풀 - 최대 size개의 연결을 만들어 재사용 (LIFO로 최근 연결 우선)
+    큐(Queue): 반납된 연결 대기열
+    """
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self.size = size
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: 자동 트랜잭션 대신 BEGIN/COMMIT을 직접 관리
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')  # 읽기와 쓰기가 서로 막지 않음
+        conn.execute('PRAGMA synchronous=NORMAL')  # WAL에서는 NORMAL로도 커밋 내구성 충분
+        conn.execute('PRAGMA busy_timeout=30000')
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return self._connect()
+        return self._idle.get()
+
+    def release(self, conn: sqlite3.Connection):
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+
+class ReplicatedDict(dict):
+    """
+    SQLite에 기록되는 dict 복제본
+    읽기(get, values, items, in)는 dict 그대로, 쓰기(__setitem__, __delitem__)만 SQLite에 기록
+    트랜잭션 안에서 get/[]로 읽은 키는 기록해 둠 → 롤백 시 제자리 수정(다시 저장하기 전)된 값도 DB 값으로 복구
+    """
+    def __init__(self, storage: 'SQLiteStorage', name: str):
+        super().__init__()
+        self._storage = storage
+        self.name = name
+        self.versions: Dict[int, int] = {}  # {key: 마지막으로 반영한 변경 로그 seq}
+
+    def __getitem__(self, key):
+        self._storage.touch(self.name, key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self._storage.touch(self.name, key)
+        return super().get(key, default)
+
+    def __setitem__(self, key, value):
+        self.versions[key] = self._storage.write(self.name, key, value)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.versions[key] = self._storage.write(self.name, key, None)
+
+
+class SQLiteStorage:
+    """
+    SQLite 공유 저장소 (WAL 모드 + 연결 풀)
+    - plinku_records: (collection, key) → pickle된 값
+    - plinku_changes: 변경 로그 (seq 증가 순) - 워커는 마지막으로 본 seq 이후만 읽음
+    - plinku_counters: ID 카운터 - 쓰기 트랜잭션 안에서 증가시켜 워커 간 중복 ID 방지
+    """
+    CHANGE_LOG_LIMIT = 100000  # 변경 로그 보관 개수 (넘으면 오래된 것부터 정리)
+
+    def __init__(self, path: str, pool_size: int = 4):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.pool = SQLiteConnectionPool(path, pool_size)
+        self.collections: Dict[str, ReplicatedDict] = {}
+        self.last_seq = 0
+        self._sync_lock = threading.RLock()
+        self._local = threading.local()  # 스레드별 진행 중인 트랜잭션 연결
+        self._writes = 0
+        with self.pool.connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS plinku_records (
+                    collection TEXT NOT NULL,
+                    key INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (collection, key)
+                );
+                CREATE TABLE IF NOT EXISTS plinku_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    collection TEXT NOT NULL,
+                    key INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS plinku_counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+            """)
+            row = conn.execute('SELECT MAX(seq) FROM plinku_changes').fetchone()
+            self.last_seq = row[0] or 0
+
+    def collection(self, name: str) -> ReplicatedDict:
+        """컬렉션 복제본 생성 + 현재 저장된 값 전체 로드"""
+        replica = ReplicatedDict(self, name)
+        with self.pool.connection() as conn:
+            for key, version, data in conn.execute(
+                    'SELECT key, version, data FROM plinku_records WHERE collection = ?', (name,)):
+                dict.__setitem__(replica, key, pickle.loads(data))
+                replica.versions[key] = version
+        self.collections[name] = replica
+        return replica
+
+    @contextmanager
+    def transaction(self):
+        """
+        쓰기 트랜잭션 - BEGIN IMMEDIATE로 DB 쓰기 잠금을 먼저 잡고 최신 변경을 반영한 뒤 실행
+        → 확인 후 기록(check-then-act)이 워커 사이에서도 원자적으로 수행됨
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            yield  # 중첩 트랜잭션은 바깥 트랜잭션에 합류
+            return
+        with self.pool.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            self._local.conn = conn
+            self._local.touched = set()
+            try:
+                self.sync(conn)
+                yield
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                # 롤백된 쓰기가 복제본에 남지 않도록 DB 기준으로 전체 재동기화
+                self.resync(conn)
+                # 읽은 뒤 제자리에서 수정했지만 다시 저장하지 않은 값은 버전이 같아서 재동기화로는 복구되지 않음
+                touched, self._local.touched = self._local.touched, None
+                with self._sync_lock:
+                    for name, key in touched:
+                        self._apply(conn, name, key, force=True)
+                raise
+            finally:
+                self._local.conn = None
+                self._local.touched = None
+
+    def touch(self, name: str, key):
+        """트랜잭션 안에서 읽은 키 기록 (롤백 시 복구 대상)"""
+        touched = getattr(self._local, 'touched', None)
+        if touched is not None:
+            touched.add((name, key))
+
+    def _write(self, conn: sqlite3.Connection, name: str, key, value) -> int:
+        seq = conn.execute('INSERT INTO plinku_changes (collection, key) VALUES (?, ?)', (name, key)).lastrowid
+        if value is None:
+            conn.execute('DELETE FROM plinku_records WHERE collection = ? AND key = ?', (name, key))
+        else:
+            conn.execute(
+                'INSERT OR REPLACE INTO plinku_records (collection, key, version, data) VALUES (?, ?, ?, ?)',
+                (name, key, seq, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            conn.execute('DELETE FROM plinku_changes WHERE seq < ?', (seq - self.CHANGE_LOG_LIMIT,))
+        return seq
+
+    def write(self, name: str, key, value) -> int:
+        """값 기록 (value=None이면 삭제) - 변경 로그 seq 반환"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return self._write(conn, name, key, value)
+        with self.pool.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                seq = self._write(conn, name, key, value)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return seq
+
+    def next_id(self, entity_type: str) -> int:
+        """워커 간 공유 ID 카운터"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            with self.transaction():
+                return self.next_id(entity_type)
+        conn.execute('INSERT OR IGNORE INTO plinku_counters (name, value) VALUES (?, 0)', (entity_type,))
+        conn.execute('UPDATE plinku_counters SET value = value + 1 WHERE name = ?', (entity_type,))
+        return conn.execute('SELECT value FROM plinku_counters WHERE name = ?', (entity_type,)).fetchone()[0]
+
+    def _apply(self, conn: sqlite3.Connection, name: str, key, force: bool = False):
+        """키 하나를 DB 값으로 갱신하고 변경 리스너 호출 (force: 버전이 같아도 다시 읽음)"""
+        replica = self.collections.get(name)
+        if replica is None:
+            return
+        row = conn.execute('SELECT version, data FROM plinku_records WHERE collection = ? AND key = ?',
+                           (name, key)).fetchone()
+        old = dict.get(replica, key)
+        if row is None:
+            if key not in replica:
+                return
+            dict.__delitem__(replica, key)
+            replica.versions.pop(key, None)
+            new = None
+        else:
+            if replica.versions.get(key) == row[0] and not force:
+                return
+            new = pickle.loads(row[1])
+            dict.__setitem__(replica, key, new)
+            replica.versions[key] = row[0]
+        for listener in change_listeners.get(name, []):
+            listener(key, old, new)
+
+    def sync(self, conn: Optional[sqlite3.Connection] = None):
+        """다른 워커가 남긴 변경 로그를 읽어서 복제본에 반영"""
+        if conn is None:
+            with self.pool.connection() as conn:
+                return self.sync(conn)
+        with self._sync_lock:
+            row = conn.execute('SELECT MIN(seq), MAX(seq) FROM plinku_changes').fetchone()
+            if row[1] is None or row[1] <= self.last_seq:
+                return
+            if row[0] > self.last_seq + 1 and self.last_seq:
+                # 정리된 변경 로그 구간을 놓쳤으면 전체 재동기화
+                self.resync(conn)
+                return
+            changed = {}
+            for seq, name, key in conn.execute(
+                    'SELECT seq, collection, key FROM plinku_changes WHERE seq > ? ORDER BY seq', (self.last_seq,)):
+                changed[(name, key)] = seq
+                self.last_seq = seq
+            for (name, key), seq in changed.items():
+                replica = self.collections.get(name)
+                if replica is not None and replica.versions.get(key, 0) >= seq:
+                    continue  # 이 워커가 직접 쓴 변경
+                self._apply(conn, name, key)
+
+    def resync(self, conn: Optional[sqlite3.Connection] = None):
+        """모든 컬렉션을 DB와 비교해서 버전이 다른 키만 다시 읽음"""
+        if conn is None:
+            with self.pool.connection() as conn:
+                return self.resync(conn)
+        with self._sync_lock:
+            row = conn.execute('SELECT MAX(seq) FROM plinku_changes').fetchone()
+            self.last_seq = row[0] or 0
+            for name, replica in self.collections.items():
+                stored = dict(conn.execute('SELECT key, version FROM plinku_records WHERE collection = ?', (name,)))
+                stale = [key for key, version in stored.items() if replica.versions.get(key) != version]
+                stale += [key for key in replica if key not in stored]
+                for key in stale:
+                    self._apply(conn, name, key)
+
+
+class LoggedDict(dict):
+    """
+    운영 로그에 기록되는 dict
+    읽기는 dict 그대로, 쓰기(__setitem__, __delitem__)는 로그 추가와 dict 반영을 한 잠금 안에서 처리
+    → 로그 순서 = 메모리 반영 순서 (재생 결과가 종료 직전 상태와 같음)
+    """
+    def __init__(self, storage: 'SnapshotStorage', name: str):
+        super().__init__()
+        self._storage = storage
+        self.name = name
+
+    def __setitem__(self, key, value):
+        with self._storage.log_lock:
+            self._storage.append(self.name, key, value)
+            super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        with self._storage.log_lock:
+            super().__delitem__(key)
+            self._storage.append(self.name, key, None)
+
+
+class SnapshotStorage:
+    """
+    스냅샷 + 운영 로그(append-only) 저장소 - 인메모리 dict 속도 그대로, 재시작해도 상태 유지 (단일 프로세스 전용)
+    - plinku-wal.<세대>.log: 쓰기마다 (컬렉션, 키, 값)을 [길이, CRC32, pickle] 프레임으로 추가
+      OS에는 쓰기마다(트랜잭션이면 끝날 때) 넘기고, fsync는 백그라운드에서 PLINKU_LOG_FSYNC_SEC마다 (잠금 밖)
+    - plinku.snapshot: 전체 상태를 pickle 프로토콜 5로 저장 (로그가 PLINKU_SNAPSHOT_EVERY건 쌓이면 백그라운드에서)
+      로그 세대를 넘기는 순간에만 잠금 안에서 컬렉션을 얕은 복사, 직렬화(SNAPSHOT_CHUNK개씩)/파일 쓰기/fsync는 잠금 밖
+    - 시작 시: 최신 스냅샷 로드 → 그 뒤 세대의 로그만 재생 (끝이 잘린 프레임은 버리고 이어서 기록)
+    """
+    MAGIC = b'PLNK'
+    FRAME = struct.Struct('<II')  # (pickle 길이, CRC32)
+    SNAPSHOT_CHUNK = 1000  # 스냅샷 조각 하나에 담는 항목 수 (조각 하나를 직렬화하는 동안만 다른 스레드가 기다림)
+
+    def __init__(self, directory: str, snapshot_every: int = 50000, fsync_sec: float = 1.0):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync_sec = fsync_sec
+        self.collections: Dict[str, LoggedDict] = {}
+        self.counters: Dict[str, int] = {}
+        self.log_lock = threading.RLock()
+        self.snapshot_count = 0
+        self.last_snapshot_sec = None  # 마지막 스냅샷에 걸린 시간
+        self._loaded: Dict[str, Dict] = {}
+        self._local = threading.local()
+        self._ops_since_snapshot = 0
+        self._dirty = False
+        self._snapshotting = False
+        self._pid = None
+        self._lock_file = open(os.path.join(directory, 'plinku.lock'), 'a')
+        self._acquire_process_lock()
+        started = time.perf_counter()
+        self.generation = self._load_snapshot()
+        for generation in self._wal_generations():
+            if generation >= self.generation:
+                self._replay(generation)
+        self.generation = max([self.generation] + self._wal_generations())
+        self.load_sec = round(time.perf_counter() - started, 3)
+        self._wal = open(self._wal_path(self.generation), 'ab')
+        atexit.register(self.flush, True)
+
+    def _acquire_process_lock(self, timeout: float = 30.0):
+        """
+        같은 디렉토리를 두 프로세스가 쓰지 않도록 파일 잠금
+        워커 재시작 때 이전 워커가 끝나길 timeout초까지 기다리고, 그래도 잠겨 있으면 실패
+        """
+        if fcntl is None:
+            return
+        deadline = time.time() + timeout
+        while True:
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except OSError:
+                if time.time() >= deadline:
+                    raise RuntimeError('snapshot storage is single-process only (use WEB_CONCURRENCY=1 or sqlite)')
+                time.sleep(0.1)
+
+    # --- 파일 경로 / 시작 시 복구 ---
+
+    def _wal_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f'plinku-wal.{generation:08d}.log')
+
+    def _wal_generations(self) -> List[int]:
+        generations = []
+        for filename in os.listdir(self.directory):
+            if filename.startswith('plinku-wal.') and filename.endswith('.log'):
+                try:
+                    generations.append(int(filename[len('plinku-wal.'):-len('.log')]))
+                except ValueError:
+                    pass
+        return sorted(generations)
+
+    def _load_snapshot(self) -> int:
+        """스냅샷이 있으면 불러오고 이어서 재생할 로그 세대 반환"""
+        path = os.path.join(self.directory, 'plinku.snapshot')
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            header = pickle.load(f)
+            self.counters = header['counters']
+            # 컬렉션마다 조각 여러 개 (frames가 없는 이전 형식은 컬렉션마다 하나)
+            for _ in range(header.get('frames', len(header['collections']))):
+                name, data = pickle.load(f)
+                self._loaded.setdefault(name, {}).update(data)
+        return header['generation']
+
+    def _replay(self, generation: int):
+        """로그 한 세대 재생 - CRC가 안 맞거나 잘린 프레임에서 멈추고 그 뒤를 잘라냄"""
+        path = self._wal_path(generation)
+        valid = 0
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(self.FRAME.size)
+                if len(header) < self.FRAME.size:
+                    break
+                size, crc = self.FRAME.unpack(header)
+                payload = f.read(size)
+                if len(payload) < size or zlib.crc32(payload) != crc:
+                    break
+                for name, key, value in pickle.loads(payload):
+                    if name is None:
+                        self.counters[key] = value
+                    elif value is None:
+                        self._loaded.get(name, {}).pop(key, None)
+                    else:
+                        self._loaded.setdefault(name, {})[key] = value
+                    self._ops_since_snapshot += 1
+                valid = f.tell()
+        if valid < os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(valid)
+
+    # --- 저장소 인터페이스 (MemoryStorage / SQLiteStorage와 같음) ---
+
+    def collection(self, name: str) -> LoggedDict:
+        """컬렉션 생성 + 스냅샷/로그에서 복구한 값 채우기"""
+        replica = LoggedDict(self, name)
+        dict.update(replica, self._loaded.pop(name, {}))
+        self.collections[name] = replica
+        return replica
+
+    def next_id(self, entity_type: str) -> int:
+        with self.log_lock:
+            value = self.counters[entity_type] = self.counters.get(entity_type, 0) + 1
+            self.append(None, entity_type, value)
+        return value
+
+    @contextmanager
+    def transaction(self):
+        """트랜잭션 동안의 쓰기는 프로세스 버퍼에 모았다가 끝날 때 한 번에 OS로 넘김 (중첩 가능)"""
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            if not self._local.depth:
+                self.flush()
+
+    def sync(self):
+        pass
+
+    # --- 운영 로그 ---
+
+    def append(self, name: Optional[str], key, value):
+        """
+        로그 프레임 추가 (log_lock 안에서 호출) - name=None은 ID 카운터, value=None은 삭제
+        트랜잭션 밖이면 바로 OS로 넘김 → 프로세스가 죽어도 남음 (전원 장애는 fsync 주기만큼 유실 가능)
+        """
+        self._start()
+        payload = pickle.dumps([(name, key, value)], protocol=5)
+        self._wal.write(self.FRAME.pack(len(payload), zlib.crc32(payload)))
+        self._wal.write(payload)
+        self._ops_since_snapshot += 1
+        self._dirty = True
+        if not getattr(self._local, 'depth', 0):
+            self._wal.flush()
+
+    def flush(self, fsync: bool = False):
+        """
+        버퍼를 OS로 넘김 (잠금 안, 빠름) + fsync=True면 디스크 동기화 (잠금 밖)
+        fsync 중에도 다른 쓰기는 계속 진행 - 복제한 파일 디스크립터로 동기화하므로 그 사이 세대가 바뀌어도 안전
+        """
+        with self.log_lock:
+            self._wal.flush()
+            if not (fsync and self._dirty):
+                return
+            self._dirty = False
+            fd = os.dup(self._wal.fileno())
+        try:
+            os.fsync(fd)
+        except OSError:
+            self._dirty = True  # 다음 주기에 다시
+            raise
+        finally:
+            os.close(fd)
+
+    def _start(self):
+        """첫 쓰기 때 백그라운드 스레드 시작 (프로세스마다 한 번)"""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        threading.Thread(target=self._background, name='plinku-snapshot', daemon=True).start()
+
+    def _background(self):
+        """fsync_sec마다 로그 fsync, 로그가 snapshot_every건 쌓이면 스냅샷"""
+        while True:
+            time.sleep(self.fsync_sec)
+            try:
+                self.flush(fsync=True)
+                if self._ops_since_snapshot >= self.snapshot_every:
+                    self.snapshot()
+            except Exception:
+                app.logger.exception('snapshot storage background task failed')
+
+    # --- 스냅샷 ---
+
+    def snapshot(self) -> bool:
+        """
+        전체 상태 스냅샷 - 이미 진행 중이면 False
+        잠금 안 (짧게): 로그를 새 세대로 넘기고 카운터 + 컬렉션의 (키, 값) 목록을 얕은 복사 - O(항목 수) 참조 복사뿐
+        잠금 밖: 이전 세대 로그 fsync → SNAPSHOT_CHUNK개씩 직렬화해서 임시 파일에 쓰고 fsync
+                 → 이름 바꾸기(원자적 교체) → 이전 세대 로그 삭제
+        [보장] 키 집합과 키마다 가리키는 값 객체는 세대를 넘긴 순간 기준. 그 뒤 제자리 수정된 값(dict)은 더 최신 내용으로
+        들어갈 수 있지만, 제자리 수정 뒤에는 항상 다시 저장(collection[key] = value)하므로 그 쓰기는 새 세대 로그에 있고
+        재생이 값을 통째로 덮어써서 "스냅샷 + 새 세대 로그" 결과는 마지막으로 저장한 상태와 같음.
+        조각 하나의 직렬화(pickle.dumps)는 GIL을 놓지 않으므로 조각 안의 값이 직렬화 도중 바뀌지 않음.
+        """
+        with self.log_lock:
+            if self._snapshotting:
+                return False
+            self._snapshotting = True
+        path = os.path.join(self.directory, 'plinku.snapshot')
+        try:
+            with self.log_lock:
+                self._wal.flush()
+                old_wal = os.dup(self._wal.fileno())
+                self._wal.close()
+                self.generation += 1
+                self._wal = open(self._wal_path(self.generation), 'ab')
+                generation = self.generation
+                counters = dict(self.counters)
+                copies = {name: list(collection.items()) for name, collection in self.collections.items()}
+                self._ops_since_snapshot = 0
+            started = time.perf_counter()
+            try:
+                os.fsync(old_wal)  # 스냅샷이 끝나기 전에 죽어도 이전 세대 로그로 복구
+            finally:
+                os.close(old_wal)
+            chunk = self.SNAPSHOT_CHUNK
+            frames = sum((len(items) + chunk - 1) // chunk for items in copies.values())
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump({'generation': generation, 'counters': counters,
+                             'collections': list(copies), 'frames': frames}, f, protocol=5)
+                for name, items in copies.items():
+                    for start in range(0, len(items), chunk):
+                        # 조각마다 따로 직렬화 → 조각 사이사이 요청 스레드가 실행됨
+                        f.write(pickle.dumps((name, dict(items[start:start + chunk])), protocol=5))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + '.tmp', path)
+            for old in self._wal_generations():
+                if old < generation:
+                    os.remove(self._wal_path(old))
+            self.snapshot_count += 1
+            self.last_snapshot_sec = round(time.perf_counter() - started, 3)
+            return True
+        finally:
+            self._snapshotting = False
+
+
+def create_storage(backend: str):
+    """환경 변수(PLINKU_STORAGE)에 따라 저장소 선택"""
+    if backend == 'sqlite':
+        return SQLiteStorage(STORAGE_DB_PATH, STORAGE_POOL_SIZE)
+    if backend == 'snapshot':
+        return SnapshotStorage(SNAPSHOT_DIR, SNAPSHOT_EVERY, LOG_FSYNC_SEC)
+    return MemoryStorage()
+
+
+storage = create_storage(STORAGE_BACKEND)
+
+# 등록용 데코레이터: 다른 워커의 변경을 반영할 때 파생 인덱스(공간 인덱스, 예약 타임라인 등)를 갱신할 리스너 목록
+change_listeners: Dict[str, List] = {}  # {collection_name: [listener(key, old, new), ...]}
+
+
+def on_remote_change(collection_name: str):
+    """
+    등록용 데코레이터: 컬렉션 변경 리스너 등록
+    listener(key, old, new) - 삭제면 new=None, 새로 생기면 old=None
+    """
+    def decorator(func):
+        change_listeners.setdefault(collection_name, []).append(func)
+        return func
+    return decorator
+
+
+def rebuild_indexes():
+    """시작 시 저장소에서 불러온 데이터로 파생 인덱스 구성"""
+    for name, listeners in change_listeners.items():
+        collection = getattr(storage, 'collections', {}).get(name)
+        if not collection:
+            continue
+        for key, value in list(collection.items()):
+            for listener in listeners:
+                listener(key, None, value)
+
+
 # ============================================================================
 # 자료구조 활용: Dictionary, Set 기반 인메모리 데이터 저장소
 # ============================================================================
@@ -23,12 +666,12 @@ CORS(app)  # 프론트엔드와 통신을 위한 CORS 설정
 # 가변 객체(mutable object): 딕셔너리처럼 내부 상태 변경 가능 → 함수 기본값으로 쓰면 안 되는 타입.
 
 # Dictionary 기반 조회(O(1)) - ParkingSpot, User 등 빠른 조회 구조
-parking_spots: Dict[int, Dict] = {}  # {id: spot_data} - 해시 기반 O(1) 조회
-ev_stations: Dict[int, Dict] = {}  # {id: station_data} - 해시 기반 O(1) 조회
-users: Dict[int, Dict] = {}  # {id: user_data} - 해시 기반 O(1) 조회
-reservations: Dict[int, Dict] = {}  # {id: reservation_data} - 해시 기반 O(1) 조회
-posts: Dict[int, Dict] = {}  # {id: post_data} - 해시 기반 O(1) 조회
-comments: Dict[int, Dict] = {}  # {id: comment_data} - 해시 기반 O(1) 조회
+parking_spots: Dict[int, Dict] = storage.collection('parking_spots')  # {id: spot_data} - 해시 기반 O(1) 조회
+ev_stations: Dict[int, Dict] = storage.collection('ev_stations')  # {id: station_data} - 해시 기반 O(1) 조회
+users: Dict[int, Dict] = storage.collection('users')  # {id: user_data} - 해시 기반 O(1) 조회
+reservations: Dict[int, Dict] = storage.collection('reservations')  # {id: reservation_data} - 해시 기반 O(1) 조회
+posts: Dict[int, Dict] = storage.collection('posts')  # {id: post_data} - 해시 기반 O(1) 조회
+comments: Dict[int, Dict] = storage.collection('comments')  # {id: comment_data} - 해시 기반 O(1) 조회
 
 # [Set 기반 중복 체크 및 집합 연산]
 # 중복 제거(set) — 주차장 타입, EV 여부 필터 등에서 중복 없는 집합 처리 시 유용.
@@ -36,22 +679,186 @@ comments: Dict[int, Dict] = {}  # {id: comment_data} - 해시 기반 O(1) 조회
 # set operations(교집합/합집합/차집합) — 필터 기능(예: EV+빈자리+근처거리)에 응용 가능.
 
 # Set 기반 중복 제거 및 빠른 조회
-favorites: Dict[int, Set[int]] = {}  # {user_id: {spot_id1, spot_id2, ...}} - Set으로 중복 자동 제거
+favorites: Dict[int, Set[int]] = storage.collection('favorites')  # {user_id: {spot_id1, spot_id2, ...}} - Set으로 중복 자동 제거
 blocked_users: Set[int] = set()  # 차단된 유저 ID 집합 - Set operations로 빠른 조회
-reserved_slots: Dict[str, Set[int]] = {}  # {"place_type:place_id": {slot1, slot2, ...}} - place_type과 place_id를 조합한 키로 충돌 방지, Set으로 중복 체크
-post_likes: Dict[int, Set[int]] = {}  # {post_id: {user_id1, user_id2, ...}} - 좋아요 기능, Set으로 중복 체크
-
-# ID 카운터 (자동 증가)
-id_counters = {
-    'parking_spot': 0,
-    'ev_station': 0,
-    'user': 0,
-    'reservation': 0,
-    'post': 0,
-    'comment': 0
-}
+post_likes: Dict[int, Set[int]] = storage.collection('post_likes')  # {post_id: {user_id1, user_id2, ...}} - 좋아요 기능, Set으로 중복 체크
+
+# [보조 인덱스(secondary index)]
+# 값으로 ID를 찾는 역방향 dict → 전체 스캔 없이 O(1) 조회. 원본 컬렉션이 바뀔 때 함께 갱신.
+
+users_by_email: Dict[str, int] = {}  # {email: user_id} - 회원가입 중복 체크/로그인 O(1) 조회
+signup_lock = threading.Lock()  # 같은 이메일 동시 가입 방지 (중복 체크 → 등록을 원자적으로)
+
+
+def index_user(user: Dict):
+    """사용자 등록/수정 시 이메일 인덱스 갱신"""
+    users_by_email[user['email']] = user['id']
+
+
+def unindex_user(user: Dict):
+    """사용자 삭제 시 이메일 인덱스에서 제거"""
+    if users_by_email.get(user['email']) == user['id']:
+        del users_by_email[user['email']]
+
+
+@on_remote_change('users')
+def sync_user_email_index(user_id: int, old: Optional[Dict], new: Optional[Dict]):
+    """다른 워커에서 바뀐 사용자를 이메일 인덱스에 반영"""
+    if old is not None:
+        unindex_user(old)
+    if new is not None:
+        index_user(new)
+
 
-# 사용자 인증은 헤더의 X-User-Id로 처리
+class OwnerIndex:
+    """
+    소유자별 보조 인덱스: {owner_id: {id1, id2, ...}}
+    역방향 dict {id: owner_id}도 함께 유지 → PUT으로 소유자가 바뀌어도 이전 소유자 집합에서 빠르게 제거
+    """
+    def __init__(self):
+        self._by_owner: Dict[int, Set[int]] = {}
+        self._owner_of: Dict[int, int] = {}
+
+    def update(self, item_id: int, owner_id):
+        """등록/수정 시 호출 - 소유자가 바뀌었으면 이동"""
+        previous = self._owner_of.get(item_id)
+        if previous == owner_id and item_id in self._owner_of:
+            return
+        self.remove(item_id)
+        if owner_id is None:
+            return
+        self._by_owner.setdefault(owner_id, set()).add(item_id)
+        self._owner_of[item_id] = owner_id
+
+    def remove(self, item_id: int):
+        """삭제 시 호출"""
+        if item_id not in self._owner_of:
+            return
+        owner_id = self._owner_of.pop(item_id)
+        ids = self._by_owner.get(owner_id)
+        if ids is not None:
+            ids.discard(item_id)
+            if not ids:
+                del self._by_owner[owner_id]
+
+    def ids(self, owner_id) -> List[int]:
+        """소유자의 ID 목록 (오름차순) - O(결과 수 log 결과 수)"""
+        return sorted(self._by_owner.get(owner_id, ()))
+
+
+parking_spots_by_owner = OwnerIndex()  # owner_id → 주차장 ID 집합
+ev_stations_by_owner = OwnerIndex()  # owner_id → 충전소 ID 집합
+posts_by_author = OwnerIndex()  # author_id → 게시글 ID 집합
+
+
+def index_ev_station(station: Dict):
+    """충전소 등록/수정 시 인덱스 갱신"""
+    ev_stations_by_owner.update(station['id'], station.get('owner_id'))
+    ev_station_list.update(station)
+    place_prefix_index.update('ev', station)
+    place_detail_cache.invalidate('ev', station['id'])
+
+
+def index_ev_stations(stations: List[Dict]):
+    """대량 등록 시 인덱스 일괄 갱신 - 정렬 인덱스는 배치마다 한 번만 병합"""
+    for station in stations:
+        ev_stations_by_owner.update(station['id'], station.get('owner_id'))
+        place_detail_cache.invalidate('ev', station['id'])
+    ev_station_list.update_many(stations)
+    place_prefix_index.update_many('ev', stations)
+
+
+def unindex_ev_station(station: Dict):
+    """충전소 삭제 시 인덱스에서 제거"""
+    ev_stations_by_owner.remove(station['id'])
+    ev_station_list.discard(station['id'])
+    place_prefix_index.remove('ev', station['id'])
+    place_detail_cache.invalidate('ev', station['id'])
+
+
+def index_post(post: Dict):
+    """게시글 작성/수정/좋아요 변경 시 인덱스 갱신 (작성자 + 날짜순/좋아요순 + 검색 역색인)"""
+    posts_by_author.update(post['id'], post.get('author_id'))
+    posts_by_date.update(post)
+    posts_by_likes.update(post)
+    post_search_index.update(post)
+
+
+def unindex_post(post: Dict):
+    """게시글 삭제 시 인덱스에서 제거"""
+    posts_by_author.remove(post['id'])
+    posts_by_date.remove(post['id'])
+    posts_by_likes.remove(post['id'])
+    post_search_index.remove(post['id'])
+
+
+@on_remote_change('ev_stations')
+def sync_ev_station_indexes(station_id: int, old: Optional[Dict], new: Optional[Dict]):
+    """다른 워커에서 바뀐 충전소를 인덱스에 반영"""
+    if new is None:
+        unindex_ev_station(old)
+    else:
+        index_ev_station(new)
+
+
+@on_remote_change('posts')
+def sync_post_indexes(post_id: int, old: Optional[Dict], new: Optional[Dict]):
+    """다른 워커에서 바뀐 게시글을 인덱스에 반영"""
+    if new is None:
+        unindex_post(old)
+    else:
+        index_post(new)
+
+
+# 좋아요 수는 toggle_like에서 증분 갱신 → 날짜순/좋아요순 정렬 인덱스(posts_by_date, posts_by_likes)도 index_post에서 함께 갱신
+post_likes_lock = threading.Lock()  # 좋아요 토글 → 좋아요 수 → 순위 갱신을 한 번에 처리
+
+
+def post_created_ts(post: Dict) -> float:
+    """정렬 키용 작성 시각 (epoch 초)"""
+    created_at = post.get('created_at')
+    return created_at.timestamp() if isinstance(created_at, datetime) else 0.0
+
+
+# 게시글별 댓글 ID 목록 (작성 순 = ID 오름차순) - 상세 조회/삭제 시 전체 댓글 스캔 불필요
+post_comment_ids: Dict[int, List[int]] = {}  # {post_id: [comment_id1, comment_id2, ...]}
+
+
+def index_comment(comment: Dict):
+    """댓글 작성 시 게시글별 댓글 목록에 추가 (ID가 증가하므로 보통 맨 뒤에 붙음)"""
+    ids = post_comment_ids.setdefault(comment['post_id'], [])
+    if not ids or ids[-1] < comment['id']:
+        ids.append(comment['id'])
+    else:
+        i = bisect_right(ids, comment['id'])
+        if i == 0 or ids[i - 1] != comment['id']:
+            insort(ids, comment['id'])
+
+
+def unindex_comment(comment: Dict):
+    """댓글 삭제 시 게시글별 댓글 목록에서 제거"""
+    ids = post_comment_ids.get(comment['post_id'])
+    if not ids:
+        return
+    i = bisect_right(ids, comment['id']) - 1
+    if i >= 0 and ids[i] == comment['id']:
+        del ids[i]
+    if not ids:
+        del post_comment_ids[comment['post_id']]
+
+
+@on_remote_change('comments')
+def sync_comment_index(comment_id: int, old: Optional[Dict], new: Optional[Dict]):
+    """다른 워커에서 작성/삭제된 댓글을 게시글별 댓글 목록에 반영"""
+    if new is None:
+        unindex_comment(old)
+    else:
+        index_comment(new)
+
+
+# ID 카운터 (자동 증가) - storage.next_id()가 저장소별로 관리 (SQLite는 워커 간 공유)
+
+# 사용자 인증은 Authorization: Bearer <세션 토큰> 헤더로 처리 (아래 "인증" 섹션)
 
 # ============================================================================
 # 시퀀스 기반 구조: 커스텀 리스트 클래스 (__getitem__, 슬라이싱, __contains__)
@@ -67,6 +874,11 @@ id_counters = {
 # 슬라이싱(slicing): list[a:b] 잘라 쓰기 → 페이징, 일부 구간만 보여줄 때 재활용.
 # 리스트 컴프리헨션(list comprehension): 한 줄로 리스트 생성 → 더미데이터, id 목록, 필터링 결과 만드는 데 사용.
 
+def is_finite_number(value) -> bool:
+    """유한한 숫자인지 (bool 제외) - NaN은 비교가 항상 False라 정렬 목록의 이진 탐색을 깨뜨리고 JSON에도 비표준 값으로 나감"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
 class ParkingSpotList:
     """
     Sequence 기반 구조: __getitem__으로 반복 가능 객체 만들기
@@ -74,10 +886,148 @@ class ParkingSpotList:
     __contains__ 오버라이드: 특정 ID 포함 여부 같은 로직 최적화
     
     선형 리스트(배열형 리스트): 인덱스로 바로 접근 가능한 연속 메모리 리스트 → 이미 파이썬 list가 이 역할
+    
+    [상시 유지되는 정렬 인덱스]
+    요청마다 정렬/전체 순회하지 않도록 등록/수정/삭제 시점에 bisect로 제자리 갱신 (index_* 함수에서 호출)
+    - _sorted_ids: ID 오름차순 목록 (페이징, 커서)
+    - _by_field[field]: (값, ID) 오름차순 목록 → 숫자 필드 범위 질의를 이진 탐색 두 번으로 처리
     """
-    def __init__(self, spots: Dict[int, Dict]):
+    def __init__(self, spots: Dict[int, Dict], fields: Tuple[str, ...] = ()):
         self._spots = spots
-        self._sorted_ids = sorted(spots.keys())
+        self._fields = fields
+        self._sorted_ids: List[int] = []
+        self._by_field: Dict[str, List[tuple]] = {field: [] for field in fields}
+        self._value_of: Dict[str, Dict[int, float]] = {field: {} for field in fields}
+        self._lock = threading.RLock()
+        for spot in list(spots.values()):
+            self.update(spot)
+    
+    def update(self, spot: Dict):
+        """등록/수정 시 ID와 숫자 필드 값 갱신 - 값이 바뀐 필드만 빼고 다시 삽입"""
+        spot_id = spot['id']
+        with self._lock:
+            i = bisect_left(self._sorted_ids, spot_id)
+            if i == len(self._sorted_ids) or self._sorted_ids[i] != spot_id:
+                self._sorted_ids.insert(i, spot_id)  # ID는 보통 증가하므로 맨 뒤
+            for field in self._fields:
+                value = spot.get(field, 0)
+                if not is_finite_number(value):
+                    value = None
+                values = self._value_of[field]
+                if values.get(spot_id) == value and (value is not None or spot_id not in values):
+                    continue
+                self._remove_value(field, spot_id)
+                if value is not None:
+                    insort(self._by_field[field], (value, spot_id))
+                    values[spot_id] = value
+
+    def update_many(self, spots: List[Dict]):
+        """
+        대량 등록 시 한 번에 갱신 - 새 항목은 모아서 붙인 뒤 정렬 한 번으로 병합
+        (항목마다 insort하면 목록 이동 비용이 항목 수만큼 반복됨, 정렬은 이미 정렬된 두 구간을 O(n)에 병합)
+        이미 있는 ID는 update()로 처리
+        """
+        with self._lock:
+            known = set(self._sorted_ids)
+            fresh = {spot['id']: spot for spot in spots if spot['id'] not in known}
+            for spot in spots:
+                if spot['id'] not in fresh:
+                    self.update(spot)
+            if not fresh:
+                return
+            self._sorted_ids.extend(fresh)
+            self._sorted_ids.sort()
+            for field in self._fields:
+                values = self._value_of[field]
+                keys = self._by_field[field]
+                for spot_id, spot in fresh.items():
+                    value = spot.get(field, 0)
+                    if is_finite_number(value):
+                        keys.append((value, spot_id))
+                        values[spot_id] = value
+                keys.sort()
+
+    def discard(self, spot_id: int):
+        """삭제 시 모든 정렬 목록에서 제거"""
+        with self._lock:
+            i = bisect_left(self._sorted_ids, spot_id)
+            if i < len(self._sorted_ids) and self._sorted_ids[i] == spot_id:
+                del self._sorted_ids[i]
+            for field in self._fields:
+                self._remove_value(field, spot_id)
+    
+    def _remove_value(self, field: str, spot_id: int):
+        value = self._value_of[field].pop(spot_id, None)
+        if value is not None:
+            keys = self._by_field[field]
+            i = bisect_left(keys, (value, spot_id))
+            if i < len(keys) and keys[i] == (value, spot_id):
+                del keys[i]
+    
+    def _bounds(self, field: str, low, high) -> Tuple[int, int]:
+        """[low, high] 범위가 차지하는 _by_field[field] 구간 (None이면 열린 끝)"""
+        keys = self._by_field[field]
+        start = bisect_left(keys, (low, -math.inf)) if low is not None else 0
+        end = bisect_right(keys, (high, math.inf)) if high is not None else len(keys)
+        return start, max(start, end)
+    
+    def range_ids(self, field: str, low=None, high=None) -> List[int]:
+        """숫자 필드 범위 질의: low <= 값 <= high 인 ID (값 오름차순)"""
+        with self._lock:
+            start, end = self._bounds(field, low, high)
+            return [spot_id for _, spot_id in self._by_field[field][start:end]]
+    
+    def select(self, ranges: Optional[Dict[str, tuple]] = None, within: Optional[Set[int]] = None) -> List[int]:
+        """
+        여러 필드 범위 조건을 모두 만족하는 ID (ID 오름차순)
+        후보가 가장 적은 범위 하나만 꺼내고 나머지 범위는 저장된 값으로 확인 → 전체 순회 없음
+        within: 미리 좁힌 후보 ID 집합 (패싯 교집합) - 범위 구간보다 작으면 이 집합에서 시작
+        """
+        ranges = {field: bounds for field, bounds in (ranges or {}).items() if bounds != (None, None)}
+        with self._lock:
+            if not ranges:
+                return sorted(within) if within is not None else list(self._sorted_ids)
+            spans = {field: self._bounds(field, *bounds) for field, bounds in ranges.items()}
+            field = min(spans, key=lambda f: spans[f][1] - spans[f][0])
+            start, end = spans[field]
+            if within is not None and len(within) <= end - start:
+                field = None
+                ids = list(within)
+            else:
+                ids = [spot_id for _, spot_id in self._by_field[field][start:end]]
+                if within is not None:
+                    ids = [spot_id for spot_id in ids if spot_id in within]
+            for other, (low, high) in ranges.items():
+                if other == field:
+                    continue
+                values = self._value_of[other]
+                ids = [spot_id for spot_id in ids if spot_id in values
+                       and (low is None or values[spot_id] >= low)
+                       and (high is None or values[spot_id] <= high)]
+        ids.sort()
+        return ids
+    
+    def query(self, ranges: Optional[Dict[str, tuple]] = None, predicate=None,
+              within: Optional[Set[int]] = None) -> List[Dict]:
+        """범위 조건 + 추가 조건(predicate)을 만족하는 항목 (ID 오름차순)"""
+        spots = (self._spots.get(spot_id) for spot_id in self.select(ranges, within))
+        return [spot for spot in spots if spot is not None and (predicate is None or predicate(spot))]
+    
+    def seek(self, after_id: Optional[int], count: int, predicate=None,
+             ranges: Optional[Dict[str, tuple]] = None, within: Optional[Set[int]] = None) -> List[Dict]:
+        """
+        키셋(커서) 페이지네이션: after_id 다음 ID부터 조건에 맞는 항목 count개
+        이진 탐색으로 시작 위치를 바로 찾음 → 앞 페이지를 건너뛰는 비용 없음
+        """
+        ids = self.select(ranges, within) if ranges or within is not None else self._sorted_ids
+        i = bisect_right(ids, after_id) if after_id is not None else 0
+        result = []
+        while i < len(ids) and len(result) < count:
+            spot = self._spots.get(ids[i])
+            i += 1
+            if spot is not None and (predicate is None or predicate(spot)):
+                result.append(spot)
+        return result
     
     def __getitem__(self, key):
         """
@@ -94,7 +1044,7 @@ class ParkingSpotList:
         return self._spots[self._sorted_ids[key]]
     
     def __len__(self):
-        return len(self._spots)
+        return len(self._sorted_ids)
     
     def __contains__(self, item):
         """
@@ -113,20 +1063,1355 @@ class ParkingSpotList:
     
     def filter(self, **kwargs):
         """
-        필터링 기능
+        필터링 기능 (값이 같은 항목)
+        인덱스된 숫자 필드는 범위 [값, 값] 질의로 후보를 좁히고, 나머지 필드만 항목별로 비교
         리스트 컴프리헨션: 한 줄로 리스트 생성 → 필터링 결과 만드는 데 사용
         """
-        result = []
-        for spot in self:
-            match = True
-            for key, value in kwargs.items():
-                if spot.get(key) != value:
-                    match = False
-                    break
-            if match:
-                result.append(spot)
+        ranges = {key: (value, value) for key, value in kwargs.items() if key in self._by_field}
+        others = {key: value for key, value in kwargs.items() if key not in ranges}
+        return self.query(ranges, lambda spot: all(spot.get(key) == value for key, value in others.items()))
+
+
+# 목록 조회용 상시 정렬 인덱스 - 등록/수정/삭제 시 index_* 함수에서 함께 갱신
+parking_spot_list = ParkingSpotList(parking_spots, ('price_per_hour', 'available', 'distance'))
+ev_station_list = ParkingSpotList(ev_stations, ('available', 'distance'))
+
+
+class SortedIndex:
+    """
+    항상 정렬된 상태로 유지되는 ID 인덱스
+    리스트(list)에 (정렬 키..., id) 튜플을 오름차순으로 저장하고 변경 시 bisect로 제자리 삽입/삭제
+    → 요청마다 전체 정렬(O(n log n)) 대신 변경 시점에만 O(log n) 탐색 + 필요한 구간만 슬라이싱
+    """
+    def __init__(self, key_func):
+        self.key_func = key_func  # 일급 객체: 항목 dict → 정렬 키 튜플
+        self._keys: List[tuple] = []
+        self._key_of: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, item_id):
+        return item_id in self._key_of
+
+    def update(self, item: Dict):
+        """등록/수정 시 호출 - 정렬 키가 바뀐 경우만 위치 이동"""
+        key = tuple(self.key_func(item)) + (item['id'],)
+        with self._lock:
+            old = self._key_of.get(item['id'])
+            if old == key:
+                return
+            if old is not None:
+                del self._keys[bisect_left(self._keys, old)]
+            insort(self._keys, key)
+            self._key_of[item['id']] = key
+
+    def remove(self, item_id: int):
+        """삭제 시 호출"""
+        with self._lock:
+            old = self._key_of.pop(item_id, None)
+            if old is not None:
+                del self._keys[bisect_left(self._keys, old)]
+
+    def key_of(self, item_id: int) -> Optional[tuple]:
+        """항목의 현재 정렬 키 (커서 생성용)"""
+        return self._key_of.get(item_id)
+
+    def after(self, key: tuple, count: int, reverse: bool = False) -> List[int]:
+        """
+        키셋(커서) 페이지네이션: 정렬 키 key 바로 다음부터 count개의 ID
+        key는 (정렬 키..., id) 전체라서 중간에 항목이 추가/삭제되어도 페이지가 밀리지 않음
+        """
+        count = max(count, 0)
+        with self._lock:
+            if reverse:
+                i = bisect_left(self._keys, key)
+                return [k[-1] for k in reversed(self._keys[max(i - count, 0):i])]
+            i = bisect_right(self._keys, key)
+            return [k[-1] for k in self._keys[i:i + count]]
+
+    def page(self, start: int, count: int, reverse: bool = False) -> List[int]:
+        """정렬 순서로 start번째부터 count개의 ID (reverse=True면 내림차순)"""
+        start = max(start, 0)
+        count = max(count, 0)
+        if reverse:
+            end = len(self._keys) - start
+            # 슬라이싱(slicing): 필요한 구간만 잘라서 뒤집음
+            return [key[-1] for key in reversed(self._keys[max(end - count, 0):max(end, 0)])]
+        return [key[-1] for key in self._keys[start:start + count]]
+
+
+# 게시글 정렬 인덱스: 날짜순 (작성 시각, id) / 좋아요순 (좋아요 수, 작성 시각, id) - 내림차순으로 읽음
+# 익명 함수(lambda): 한 줄짜리 작은 함수 → 정렬 기준에 사용
+posts_by_date = SortedIndex(lambda post: (post_created_ts(post),))
+posts_by_likes = SortedIndex(lambda post: (post.get('likes', 0), post_created_ts(post)))
+
+
+# ============================================================================
+# 게시글 검색: 역색인(inverted index) + BM25
+# ============================================================================
+# 
+# [역색인]
+# 단어(term) → {게시글 ID: 단어 빈도} dict. 검색은 질의 단어들의 게시글 집합 교집합만 보면 됨 → 전체 게시글 스캔 X
+# 게시글 작성/수정/삭제(index_post/unindex_post)에서 해당 게시글의 단어만 증분 갱신.
+# 
+# [한글 n-gram 토큰화]
+# 한국어는 조사/어미가 붙어서 띄어쓰기 단위 단어로는 "주차장이"와 "주차장"이 안 맞음
+# → 한글 연속 구간은 2글자씩 겹치게 자른 bigram("주차장이" → 주차, 차장, 장이), 영문/숫자는 단어 그대로(소문자).
+# 질의도 같은 방식으로 자르고 모든 bigram이 들어 있는 게시글만 후보 (AND) → "주차장"은 "주차"+"차장"을 모두 포함한 글.
+# 색인할 때는 한글 글자 하나씩(unigram)도 함께 넣음 → 한 글자 질의("역")도 "대전역"이 들어간 글에 맞음.
+# 
+# [순위]
+# BM25(단어 빈도, 문서 길이 정규화, 희귀한 단어일수록 높은 가중치) × 좋아요 보정 × 최신 글 보정
+# 제목 단어는 SEARCH_TITLE_WEIGHT배로 셈. 후보가 SEARCH_MAX_CANDIDATES보다 많으면 최신 글(ID가 큰 글)부터 그만큼만 점수 계산
+# (흔한 단어 하나짜리 질의도 일정한 시간 안에 응답 - 어차피 최신 글 보정이 있어서 오래된 글은 상위에 오기 어려움).
+
+HANGUL_OR_WORD = re.compile(r'[가-힣]+|[0-9a-z]+')
+SEARCH_TITLE_WEIGHT = 2  # 제목 단어 빈도 가중치
+SEARCH_BM25_K1 = 1.2
+SEARCH_BM25_B = 0.75
+SEARCH_LIKES_WEIGHT = 0.1  # 점수 × (1 + 0.1 × ln(1 + 좋아요 수))
+SEARCH_HALF_LIFE_DAYS = 30.0  # 최신 글 보정: 30일마다 보정분이 절반 (0.5 ~ 1.0배)
+SEARCH_MAX_CANDIDATES = int(os.environ.get('PLINKU_SEARCH_MAX_CANDIDATES', 2000))
+
+
+def search_terms(text: str, unigrams: bool = False) -> List[str]:
+    """텍스트 → 검색 단어 목록 (한글은 bigram, 영문/숫자는 단어) - unigrams=True(색인용)면 한글 글자 하나씩도 추가"""
+    terms = []
+    for run in HANGUL_OR_WORD.findall((text or '').lower()):
+        if len(run) > 1 and '가' <= run[0] <= '힣':
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+            if unigrams:
+                terms.extend(run)
+        else:
+            terms.append(run)
+    return terms
+
+
+class PostSearchIndex:
+    """
+    게시글 역색인: {단어: {post_id: 가중 빈도}}
+    게시글별 단어 목록/문서 길이도 보관 → 수정/삭제 시 그 게시글의 단어만 제거
+    """
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._doc_ts: Dict[int, float] = {}  # 작성 시각 (최신 글 보정용, 요청마다 datetime 변환 X)
+        self._signature: Dict[int, int] = {}  # (제목, 내용) 해시 → 좋아요/조회수만 바뀐 경우는 다시 자르지 않음
+        self._total_len = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._doc_len)
+
+    def update(self, post: Dict):
+        """게시글 작성/수정 시 호출 - 제목/내용이 바뀐 경우만 다시 색인"""
+        title, content = post.get('title') or '', post.get('content') or ''
+        signature = hash((title, content))
+        if self._signature.get(post['id']) == signature:
+            return
+        frequencies = Counter(search_terms(content, unigrams=True))
+        for term, n in Counter(search_terms(title, unigrams=True)).items():
+            frequencies[term] += n * SEARCH_TITLE_WEIGHT
+        with self._lock:
+            self._remove(post['id'])
+            for term, frequency in frequencies.items():
+                self._postings.setdefault(term, {})[post['id']] = frequency
+            length = sum(frequencies.values())
+            self._doc_terms[post['id']] = tuple(frequencies)
+            self._doc_len[post['id']] = length
+            self._doc_ts[post['id']] = post_created_ts(post)
+            self._signature[post['id']] = signature
+            self._total_len += length
+
+    def remove(self, post_id: int):
+        """게시글 삭제 시 호출"""
+        with self._lock:
+            self._remove(post_id)
+
+    def _remove(self, post_id: int):
+        for term in self._doc_terms.pop(post_id, ()):
+            posting = self._postings[term]
+            del posting[post_id]
+            if not posting:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(post_id, 0)
+        self._doc_ts.pop(post_id, None)
+        self._signature.pop(post_id, None)
+
+    def search(self, query: str, count: int) -> Tuple[List[Tuple[float, int]], int]:
+        """
+        질의 → (점수 높은 순 상위 count개의 (점수, post_id), 전체 일치 수)
+        가장 짧은 게시글 집합부터 교집합 → 비용은 가장 희귀한 단어의 게시글 수에 비례
+        """
+        terms = set(search_terms(query))
+        if not terms:
+            return [], 0
+        now = time.time()
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return [], 0
+            postings.sort(key=len)
+            candidates = postings[0].keys()
+            for posting in postings[1:]:
+                candidates = candidates & posting.keys()
+                if not candidates:
+                    return [], 0
+            total = len(candidates)
+            if total > SEARCH_MAX_CANDIDATES:
+                candidates = sorted(candidates)[-SEARCH_MAX_CANDIDATES:]
+
+            n = len(self._doc_len)
+            avg_len = self._total_len / n if n else 1.0
+            weights = [(posting, math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5)))
+                       for posting in postings]
+            k1, b = SEARCH_BM25_K1, SEARCH_BM25_B
+            length_factor = k1 * b / avg_len
+            half_life = SEARCH_HALF_LIFE_DAYS * 86400
+            doc_len, doc_ts = self._doc_len, self._doc_ts
+            scored = []
+            for post_id in candidates:
+                norm = k1 * (1 - b) + length_factor * doc_len[post_id]
+                score = 0.0
+                for posting, idf in weights:
+                    tf = posting[post_id]
+                    score += idf * tf * (k1 + 1) / (tf + norm)
+                likes = posts.get(post_id, {}).get('likes', 0)
+                score *= 1 + SEARCH_LIKES_WEIGHT * math.log1p(likes)
+                score *= 0.5 + 0.5 * 0.5 ** (max(now - doc_ts[post_id], 0) / half_life)
+                scored.append((score, post_id))
+        return nlargest(count, scored), total
+
+
+post_search_index = PostSearchIndex()  # 게시글 검색 역색인 - index_post/unindex_post에서 함께 갱신
+
+
+def reservation_created_ts(reservation: Dict) -> float:
+    """정렬 키용 예약 생성 시각 (epoch 초)"""
+    created_at = reservation.get('created_at')
+    return to_timestamp(created_at) if created_at else 0.0
+
+
+class ReservationIndex:
+    """
+    사용자별 예약 인덱스: {user_id: SortedIndex((생성 시각, id))} → 내 예약을 최신순으로 바로 읽음 (요청마다 정렬 X)
+    예약 구간 (start, end) epoch 초도 함께 저장 → 지난/다가오는 예약, 날짜 필터에서 ISO 문자열을 다시 파싱하지 않음
+    """
+    def __init__(self):
+        self._by_user: Dict[int, SortedIndex] = {}
+        self._user_of: Dict[int, int] = {}
+        self._window_of: Dict[int, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, reservation: Dict):
+        """예약 생성 시 호출 (다른 워커 변경 반영 포함)"""
+        reservation_id = reservation['id']
+        user_id = reservation.get('user_id')
+        with self._lock:
+            if self._user_of.get(reservation_id, user_id) != user_id:
+                self._remove(reservation_id)
+            if user_id is None:
+                return
+            index = self._by_user.get(user_id)
+            if index is None:
+                index = self._by_user[user_id] = SortedIndex(lambda item: (reservation_created_ts(item),))
+            self._user_of[reservation_id] = user_id
+            self._window_of[reservation_id] = (to_timestamp(reservation['start_time']),
+                                               to_timestamp(reservation['end_time']))
+            index.update(reservation)
+
+    def remove(self, reservation_id: int):
+        """예약 취소 시 호출"""
+        with self._lock:
+            self._remove(reservation_id)
+
+    def _remove(self, reservation_id: int):
+        user_id = self._user_of.pop(reservation_id, None)
+        self._window_of.pop(reservation_id, None)
+        index = self._by_user.get(user_id)
+        if index is not None:
+            index.remove(reservation_id)
+            if not len(index):
+                del self._by_user[user_id]
+
+    def window(self, reservation_id: int) -> Optional[Tuple[float, float]]:
+        """예약 구간 (start, end) epoch 초"""
+        return self._window_of.get(reservation_id)
+
+    def index_of(self, user_id: int) -> Optional[SortedIndex]:
+        """사용자의 예약 정렬 인덱스 (없으면 None)"""
+        return self._by_user.get(user_id)
+
+    def ids(self, user_id: int) -> List[int]:
+        """사용자의 예약 ID 목록 (최신순)"""
+        index = self._by_user.get(user_id)
+        return index.page(0, len(index), reverse=True) if index is not None else []
+
+
+reservations_by_user = ReservationIndex()  # user_id → 예약 ID (생성 시각 순)
+
+
+def encode_cursor(*values) -> str:
+    """
+    커서 페이지네이션 토큰 생성 - 마지막으로 돌려준 항목의 정렬 키를 불투명 문자열로 인코딩
+    불변 객체(immutable object): 튜플처럼 바뀌지 않는 정렬 키 묶음을 그대로 담음
+    """
+    raw = json.dumps(values, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: Optional[str]) -> Optional[list]:
+    """커서 토큰 해석 (없거나 잘못된 토큰이면 None)"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+# ============================================================================
+# 공간 인덱스: 위도/경도 격자(grid) 버킷 기반 근접 검색
+# ============================================================================
+# 
+# [격자 기반 공간 인덱스]
+# 위도/경도를 일정 크기(cell_deg)의 격자 칸으로 나누고 칸마다 주차장 ID 집합을 저장.
+# 근접 검색은 질의 좌표가 속한 칸에서 시작해 링(ring) 단위로 바깥쪽 칸을 넓혀가며 후보만 검사 → 전체 선형 스캔 불필요.
+# 튜플(tuple): (격자 행, 격자 열) 같은 변경되면 안 되는 묶음 → dict 키로 사용.
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = 111.32
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    두 좌표 사이의 대원 거리(km)
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def is_valid_location(lat: float, lng: float, radius_km: Optional[float] = None) -> bool:
+    """위경도(및 반경)가 유한한 값이고 범위 안인지 (nan/inf는 격자 계산에서 예외를 일으킴)"""
+    if not all(math.isfinite(value) for value in (lat, lng)) or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return False
+    return radius_km is None or (math.isfinite(radius_km) and radius_km >= 0)
+
+
+class GridIndex:
+    """
+    격자 버킷 공간 인덱스
+    Dictionary 기반 조회(O(1)) - {(격자 행, 격자 열): {id, ...}}
+    삽입/삭제 O(1), k-최근접 검색은 질의 지점 주변 칸만 검사
+    """
+    def __init__(self, cell_deg: float = 0.01):
+        self.cell_deg = cell_deg
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}  # {(row, col): {id1, id2, ...}}
+        self._points: Dict[int, Tuple[float, float, Tuple[int, int]]] = {}  # {id: (lat, lng, cell)}
+        self._lock = threading.Lock()  # 검색 중 다른 스레드의 삽입/삭제로 버킷 집합이 바뀌지 않도록
+
+    def _cell_of(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, item):
+        return item in self._points
+
+    def insert(self, item_id: int, lat, lng):
+        """좌표 등록 (이미 있으면 위치 갱신, 좌표가 없거나 유효하지 않으면 삭제만)"""
+        try:
+            lat = float(lat)
+            lng = float(lng)
+        except (TypeError, ValueError):
+            lat = lng = math.nan
+        with self._lock:
+            self._remove(item_id)
+            if not is_valid_location(lat, lng):
+                return
+            cell = self._cell_of(lat, lng)
+            self._cells.setdefault(cell, set()).add(item_id)
+            self._points[item_id] = (lat, lng, cell)
+
+    def remove(self, item_id: int):
+        """좌표 삭제"""
+        with self._lock:
+            self._remove(item_id)
+
+    def _remove(self, item_id: int):
+        entry = self._points.pop(item_id, None)
+        if entry is None:
+            return
+        cell = entry[2]
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(item_id)
+            if not bucket:
+                del self._cells[cell]
+
+    def _ring(self, center: Tuple[int, int], r: int):
+        """중심 칸에서 체비쇼프 거리 r인 칸들 (r=0이면 중심 칸)"""
+        row, col = center
+        if r == 0:
+            yield center
+            return
+        for c in range(col - r, col + r + 1):
+            yield (row - r, c)
+            yield (row + r, c)
+        for rr in range(row - r + 1, row + r):
+            yield (rr, col - r)
+            yield (rr, col + r)
+
+    def _cell_km(self, lat: float) -> float:
+        """격자 한 칸의 최소 변 길이(km) - 링 r까지 탐색하면 반경 r * cell_km 이내는 모두 확인됨"""
+        lng_km = KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6)
+        return self.cell_deg * min(KM_PER_DEG_LAT, lng_km)
+
+    def nearest(self, lat: float, lng: float, k: int, radius_km: Optional[float] = None,
+                predicate=None) -> List[Tuple[float, int]]:
+        """
+        k-최근접 검색: [(거리 km, id), ...] 거리 오름차순
+        predicate: id를 받아 bool을 반환하는 필터 함수 (일급 객체)
+        """
+        with self._lock:
+            return self._nearest(lat, lng, k, radius_km, predicate)
+
+    def _nearest(self, lat: float, lng: float, k: int, radius_km: Optional[float], predicate):
+        if k <= 0 or not self._points:
+            return []
+        center = self._cell_of(lat, lng)
+        cell_km = self._cell_km(lat)
+        max_ring = int(radius_km / cell_km) + 1 if radius_km is not None else None
+
+        def candidates(item_ids):
+            for item_id in item_ids:
+                p_lat, p_lng, _ = self._points[item_id]
+                dist = haversine_km(lat, lng, p_lat, p_lng)
+                if radius_km is not None and dist > radius_km:
+                    continue
+                if predicate is not None and not predicate(item_id):
+                    continue
+                yield (dist, item_id)
+
+        found: List[Tuple[float, int]] = []
+        r = 0
+        while max_ring is None or r <= max_ring:
+            # 링의 칸 수가 실제 점유 칸 수보다 많아지면 (데이터가 성긴 경우) 점유 칸만 직접 검사
+            if 8 * r > len(self._cells):
+                found = list(candidates(self._points))
+                break
+            for cell in self._ring(center, r):
+                bucket = self._cells.get(cell)
+                if bucket:
+                    found.extend(candidates(bucket))
+            if len(found) >= k:
+                found.sort()
+                # 링 r까지 탐색했으면 반경 r * cell_km 이내의 점은 모두 확인된 상태
+                if found[k - 1][0] <= r * cell_km:
+                    return found[:k]
+            r += 1
+        found.sort()
+        return found[:k]
+
+    def within(self, lat: float, lng: float, radius_km: float) -> List[Tuple[float, int]]:
+        """반경 검색: radius_km 이내의 [(거리 km, id), ...] 거리 오름차순"""
+        return self.nearest(lat, lng, len(self._points), radius_km)
+
+    def ids_within(self, lat: float, lng: float, radius_km: float) -> Set[int]:
+        """
+        반경 radius_km 이내의 ID 집합 (순서 없음) - 반경을 덮는 격자 칸만 확인
+        네 모서리가 모두 반경 안인 칸은 거리 계산 없이 통째로 추가, 경계에 걸친 칸만 점마다 거리 계산
+        패싯 교집합에 "근처" 조건으로 넣음
+        """
+        with self._lock:
+            return self._ids_within(lat, lng, radius_km)
+
+    def _ids_within(self, lat: float, lng: float, radius_km: float) -> Set[int]:
+        center = self._cell_of(lat, lng)
+        max_ring = int(radius_km / self._cell_km(lat)) + 1
+        if (2 * max_ring + 1) ** 2 > len(self._cells):
+            # 덮는 칸 수가 실제 점유 칸 수보다 많으면 점유 칸만 직접 확인
+            cells = [cell for cell in self._cells
+                     if abs(cell[0] - center[0]) <= max_ring and abs(cell[1] - center[1]) <= max_ring]
+        else:
+            cells = [cell for r in range(max_ring + 1) for cell in self._ring(center, r) if cell in self._cells]
+        result: Set[int] = set()
+        points = self._points
+        for row, col in cells:
+            corners = (row * self.cell_deg, (row + 1) * self.cell_deg)
+            if all(haversine_km(lat, lng, c_lat, (col + dc) * self.cell_deg) <= radius_km
+                   for c_lat in corners for dc in (0, 1)):
+                result |= self._cells[(row, col)]
+                continue
+            result.update(item_id for item_id in self._cells[(row, col)]
+                          if haversine_km(lat, lng, points[item_id][0], points[item_id][1]) <= radius_km)
         return result
 
+    def distance_km(self, item_id: int, lat: float, lng: float) -> Optional[float]:
+        """등록된 점까지의 거리 (좌표가 없는 항목이면 None)"""
+        entry = self._points.get(item_id)
+        return haversine_km(lat, lng, entry[0], entry[1]) if entry is not None else None
+
+
+# 주차장 공간 인덱스 - 생성/수정/삭제 시 함께 갱신
+parking_spot_grid = GridIndex()
+
+
+# ============================================================================
+# 패싯(facet) 인덱스: 속성값별 ID 집합 + 작은 집합부터 교집합
+# ============================================================================
+# 
+# [패싯 필터]
+# 속성값마다 ID 집합(posting set)을 유지: ('is_ev', True) → {1, 5, ...}, ('price_band', '1001-2000') → {...}
+# 필터 = 속성별로 고른 값들의 합집합, 속성끼리는 교집합 (EV + 빈자리 많음 + 근처 + 24시간 ...)
+# 
+# [질의 계획(planner)]
+# 집합 크기를 O(1)로 알 수 있으므로 가장 작은 것부터 교집합 → 교집합은 작은 쪽만 순회하므로 비용은 O(가장 작은 집합)
+# 중간 결과가 비면 바로 종료. 근처 조건은 GridIndex로 구한 반경 내 ID 집합을 같은 방식으로 교집합에 넣음.
+# 
+# [패싯 개수]
+# 필터 UI용으로 속성값마다 "다른 속성 조건은 유지하고 이 속성만 바꿨을 때" 몇 곳인지 반환
+# (같은 속성 안에서 여러 값을 고르는 UI에서 선택하지 않은 값의 개수도 보여줄 수 있도록)
+# 가격/빈자리/거리 범위 조건도 한 그룹으로 넣어서 개수가 실제 결과와 맞음.
+# 같은 조건의 개수는 인덱스 버전(갱신할 때마다 증가)과 함께 캐시 → 인덱스가 그대로면 다시 계산하지 않음
+
+PRICE_BANDS = ((1000, '0-1000'), (2000, '1001-2000'), (3000, '2001-3000'), (5000, '3001-5000'), (math.inf, '5001+'))
+AVAILABILITY_BUCKETS = ((0, 'full'), (4, 'few'), (math.inf, 'many'))  # 빈자리 0 / 1~4 / 5 이상
+FACET_COUNTS_CACHE_SIZE = 256  # 조건별 패싯 개수 캐시 크기
+
+
+def bucket_of(value, buckets: tuple) -> Optional[str]:
+    """숫자 → 구간 이름 (상한 오름차순 (상한, 이름) 목록, 숫자가 아니면 None)"""
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
+    for upper, name in buckets:
+        if value <= upper:
+            return name
+    return None
+
+
+# 24시간 운영 표기: 정해진 문구 또는 하루 전체를 덮는 시간 범위 ("00:00-24:00", "00:00~23:59", "00:00-00:00")
+ALL_DAY_HOURS = {'24시간', '24h', '24/7', '연중무휴24시간'}
+HOURS_RANGE = re.compile(r'(\d{1,2}):(\d{2})[-~](\d{1,2}):(\d{2})')
+
+
+def is_all_day(operating_hours) -> bool:
+    """운영 시간 문자열이 24시간 운영인지 - "09:00-24:00"처럼 24가 들어 있어도 범위가 하루 전체가 아니면 False"""
+    text = ''.join(str(operating_hours or '').lower().split())
+    if text in ALL_DAY_HOURS:
+        return True
+    match = HOURS_RANGE.fullmatch(text)
+    if match is None:
+        return False
+    start_h, start_m, end_h, end_m = map(int, match.groups())
+    start, end = start_h * 60 + start_m, end_h * 60 + end_m
+    return start == end or (start == 0 and end in (23 * 60 + 59, 24 * 60))
+
+
+# 주차장 패싯: 속성 이름 → (항목 → 값) 함수, 허용 값 목록 (요청 검증/개수 출력 순서)
+PARKING_FACETS = {
+    'is_ev': (lambda spot: bool(spot.get('is_ev')), (True, False)),
+    'price_band': (lambda spot: bucket_of(spot.get('price_per_hour'), PRICE_BANDS),
+                   tuple(name for _, name in PRICE_BANDS)),
+    'hours': (lambda spot: '24h' if is_all_day(spot.get('operating_hours')) else 'limited', ('24h', 'limited')),
+    'availability': (lambda spot: bucket_of(spot.get('available'), AVAILABILITY_BUCKETS),
+                     tuple(name for _, name in AVAILABILITY_BUCKETS)),
+}
+
+
+def facet_label(value) -> str:
+    """패싯 값 → 요청/응답에 쓰는 문자열 (True → 'true')"""
+    return str(value).lower() if isinstance(value, bool) else str(value)
+
+
+class FacetIndex:
+    """
+    속성값별 ID 집합: {(속성, 값): {id, ...}} + 항목별 현재 값 {id: {속성: 값}}
+    수정 시 값이 바뀐 속성만 이전 집합에서 빼고 새 집합에 추가 → O(속성 수)
+    version: 등록/수정/삭제마다 증가 (다른 인덱스 갱신이 끝난 뒤 호출되므로 개수 캐시 키로 씀)
+    """
+    def __init__(self, facets: Dict[str, tuple]):
+        self.facets = facets
+        self.version = 0
+        self._postings: Dict[Tuple[str, object], Set[int]] = {}
+        self._values: Dict[int, Dict[str, object]] = {}
+        self._counts_cache: 'OrderedDict[tuple, Dict[str, Dict[str, int]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def update(self, item: Dict):
+        """등록/수정 시 호출"""
+        values = {name: value_of(item) for name, (value_of, _) in self.facets.items()}
+        with self._lock:
+            old = self._values.get(item['id'], {})
+            for name, value in values.items():
+                if name in old and old[name] == value:
+                    continue
+                if name in old:
+                    self._discard(name, old[name], item['id'])
+                self._postings.setdefault((name, value), set()).add(item['id'])
+            self._values[item['id']] = values
+            self.version += 1
+
+    def remove(self, item_id: int):
+        """삭제 시 호출"""
+        with self._lock:
+            for name, value in self._values.pop(item_id, {}).items():
+                self._discard(name, value, item_id)
+            self.version += 1
+
+    def _discard(self, name: str, value, item_id: int):
+        ids = self._postings.get((name, value))
+        if ids is not None:
+            ids.discard(item_id)
+            if not ids:
+                del self._postings[(name, value)]
+
+    def _groups(self, filters: Dict[str, list], skip: Optional[str] = None) -> List[List[Set[int]]]:
+        """필터 → 합집합 그룹 목록 (그룹 안은 합집합, 그룹끼리는 교집합)"""
+        return [[self._postings.get((name, value), set()) for value in values]
+                for name, values in filters.items() if name != skip]
+
+    @staticmethod
+    def _intersect(groups: List[List[Set[int]]]) -> Set[int]:
+        """
+        질의 계획: 예상 크기(그룹 안 집합 크기 합)가 작은 그룹부터 교집합
+        집합끼리는 set & (작은 쪽만 순회), 여러 값 그룹은 값마다 교집합 후 합집합
+        """
+        groups = sorted(groups, key=lambda sets: sum(map(len, sets)))
+        first = groups[0]
+        if len(groups) == 1:
+            return set().union(*first)
+        # 첫 그룹은 복사하지 않고 다음 교집합에서 새 집합이 만들어짐
+        result = first[0] if len(first) == 1 else set().union(*first)
+        for sets in groups[1:]:
+            if not result:
+                return set()
+            if len(sets) == 1:
+                result = result & sets[0]
+            else:
+                # 값마다 따로 교집합 후 합침 → 각각 작은 쪽만 순회 (합집합을 먼저 만들지 않음)
+                result = set().union(*(result & ids for ids in sets))
+        return result
+
+    def query(self, filters: Dict[str, list], extra: Optional[List[List[Set[int]]]] = None) -> Optional[Set[int]]:
+        """
+        필터를 모두 만족하는 ID 집합 (새 집합), 조건이 하나도 없으면 None (= 전체)
+        extra: 다른 인덱스의 합집합 그룹 (예: 근처 격자 칸 집합들)
+        """
+        groups = self._groups(filters) + list(extra or [])
+        if not groups:
+            return None
+        with self._lock:
+            return self._intersect(groups)
+
+    def counts(self, filters: Dict[str, list], extra: Optional[List[List[Set[int]]]] = None,
+               cache_key: Optional[tuple] = None) -> Dict[str, Dict[str, int]]:
+        """
+        속성값별 개수 - 이 속성의 필터만 빼고 나머지 조건(extra 포함)을 적용한 결과 기준
+        cache_key: extra를 만든 조건 + 그 전에 읽은 version → 같은 키면 캐시된 개수를 그대로 반환
+        (version을 먼저 읽으므로 그 사이 갱신이 있었다면 이미 지난 키로 저장될 뿐)
+        """
+        result = {}
+        with self._lock:
+            if cache_key is not None and cache_key in self._counts_cache:
+                self._counts_cache.move_to_end(cache_key)
+                return self._counts_cache[cache_key]
+            for name, (_, allowed) in self.facets.items():
+                groups = self._groups(filters, skip=name) + list(extra or [])
+                base = self._intersect(groups) if groups else None
+                result[name] = {}
+                for value in allowed:
+                    ids = self._postings.get((name, value), set())
+                    result[name][facet_label(value)] = len(ids) if base is None else len(base & ids)
+            if cache_key is not None:
+                self._counts_cache[cache_key] = result
+                while len(self._counts_cache) > FACET_COUNTS_CACHE_SIZE:
+                    self._counts_cache.popitem(last=False)
+        return result
+
+
+parking_spot_facets = FacetIndex(PARKING_FACETS)  # 주차장 패싯 - index_parking_spot(s)/refresh_available에서 함께 갱신
+
+
+def parse_facet_filters(args, facets: Dict[str, tuple]) -> Tuple[Dict[str, list], Optional[str]]:
+    """
+    쿼리 파라미터 → {속성: [값, ...]} (쉼표로 여러 값 = 합집합)
+    잘못된 값이 있으면 (필터, 오류 메시지)
+    """
+    filters = {}
+    for name, (_, allowed) in facets.items():
+        raw = args.get(name)
+        if raw is None or raw == '':
+            continue
+        labels = {facet_label(value): value for value in allowed}
+        labels.update({'1': True, '0': False} if True in allowed else {})
+        values = []
+        for label in raw.split(','):
+            if label.strip().lower() not in labels:
+                return {}, f'Invalid {name}: {label}'
+            values.append(labels[label.strip().lower()])
+        filters[name] = list(dict.fromkeys(values))
+    return filters, None
+
+
+def index_parking_spot(spot: Dict):
+    """주차장 등록/수정 시 인덱스 갱신 (공간 인덱스 + 소유자 인덱스)"""
+    parking_spot_grid.insert(spot['id'], spot.get('latitude'), spot.get('longitude'))
+    parking_spots_by_owner.update(spot['id'], spot.get('owner_id'))
+    parking_spot_list.update(spot)
+    parking_spot_facets.update(spot)
+    place_prefix_index.update('parking', spot)
+    place_detail_cache.invalidate('parking', spot['id'])
+
+
+def index_parking_spots(spots: List[Dict]):
+    """대량 등록 시 인덱스 일괄 갱신 - 정렬 인덱스는 배치마다 한 번만 병합"""
+    parking_spot_list.update_many(spots)  # 패싯 인덱스(version)보다 먼저
+    for spot in spots:
+        parking_spot_grid.insert(spot['id'], spot.get('latitude'), spot.get('longitude'))
+        parking_spots_by_owner.update(spot['id'], spot.get('owner_id'))
+        parking_spot_facets.update(spot)
+        place_detail_cache.invalidate('parking', spot['id'])
+    place_prefix_index.update_many('parking', spots)
+
+
+def unindex_parking_spot(spot: Dict):
+    """주차장 삭제 시 인덱스에서 제거"""
+    parking_spot_grid.remove(spot['id'])
+    parking_spots_by_owner.remove(spot['id'])
+    parking_spot_list.discard(spot['id'])
+    parking_spot_facets.remove(spot['id'])
+    place_prefix_index.remove('parking', spot['id'])
+    place_detail_cache.invalidate('parking', spot['id'])
+
+
+@on_remote_change('parking_spots')
+def sync_parking_spot_indexes(spot_id: int, old: Optional[Dict], new: Optional[Dict]):
+    """다른 워커에서 바뀐 주차장을 인덱스에 반영"""
+    if new is None:
+        unindex_parking_spot(old)
+    else:
+        index_parking_spot(new)
+
+
+# ============================================================================
+# 장소 자동완성: 정렬된 접두사 인덱스 (bisect)
+# ============================================================================
+# 
+# [정렬된 접두사 인덱스]
+# 주차장/충전소의 이름 전체(공백 제거), 이름 단어, 주소 단어를 (단어, 종류, 장소 타입, id) 튜플로 한 리스트에 정렬해 둠.
+# 접두사 p로 시작하는 단어는 정렬 순서상 [p, p의 마지막 글자 + 1) 구간에 모여 있음 → bisect 두 번으로 구간을 찾고 그 구간만 읽음.
+# trie와 같은 접두사 질의를 리스트 하나로 처리 (노드 dict 수백만 개 대신 튜플 리스트 → 메모리 적고 구간 읽기가 빠름).
+# 
+# [한글 입력 중 질의 (퍼지 접두사)]
+# 키 입력마다 요청하면 마지막 글자가 조합 중인 상태로 옴 → 마지막 글자만 범위를 넓혀서 찾음
+# - 받침 없는 글자("대저")는 같은 초성+중성의 모든 받침 글자(저, 적, 전, ..., 젛)와 일치 → "대저"로 "대전역"을 찾음
+# - 자음만 입력한 글자("대전ㅇ")는 그 초성으로 시작하는 모든 글자와 일치 → "대전역", "대전월드컵경기장"
+# 
+# [순위]
+# 이름 전체 접두사 > 이름 단어 접두사 > 주소 단어 접두사, 단어와 정확히 같으면 가산점,
+# lat/lng를 주면 가까울수록 가산점. 짧은 질의로 구간이 매우 길면 앞쪽 AUTOCOMPLETE_SCAN_LIMIT개만 읽음.
+
+AUTOCOMPLETE_SCAN_LIMIT = 1000  # 질의 하나에서 읽는 최대 인덱스 항목 수
+AUTOCOMPLETE_KIND_SCORE = (3.0, 2.0, 1.0)  # 이름 전체 / 이름 단어 / 주소 단어
+AUTOCOMPLETE_EXACT_BONUS = 1.0
+AUTOCOMPLETE_PROXIMITY_WEIGHT = 3.0  # + 3 / (1 + 거리 km)
+HANGUL_BASE = 0xAC00
+HANGUL_INITIALS = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'  # 초성 순서 (자음만 입력한 글자 → 초성 번호)
+
+
+def prefix_range(word: str, fuzzy: bool = False) -> Tuple[str, str]:
+    """
+    접두사 word로 시작하는 단어의 정렬 구간 [low, high)
+    fuzzy=True면 마지막 글자가 조합 중인 한글이라고 보고 구간을 넓힘
+    """
+    head, last = word[:-1], word[-1]
+    first = last_char = ord(last)
+    if fuzzy and last in HANGUL_INITIALS:
+        first = HANGUL_BASE + HANGUL_INITIALS.index(last) * 588
+        last_char = first + 587
+    elif fuzzy and '가' <= last <= '힣' and (first - HANGUL_BASE) % 28 == 0:
+        last_char = first + 27
+    return head + chr(first), head + chr(last_char + 1)
+
+
+def place_tokens(place: Dict) -> Dict[str, int]:
+    """장소 → {단어: 종류} (0: 이름 전체, 1: 이름 단어, 2: 주소 단어 - 같은 단어면 더 높은 종류만)"""
+    name = (place.get('name') or '').lower()
+    tokens: Dict[str, int] = {}
+    for kind, words in ((0, [''.join(name.split())]), (1, name.split()),
+                        (2, (place.get('address') or '').lower().split())):
+        for word in words:
+            if word and word not in tokens:
+                tokens[word] = kind
+    return tokens
+
+
+class PlacePrefixIndex:
+    """
+    주차장 + 충전소 이름/주소 접두사 인덱스
+    정렬된 (단어, 종류, 장소 타입, id) 리스트 + 장소별 단어 목록 (수정/삭제 시 그 장소의 항목만 제거)
+    장소별 (이름 길이, 위도, 경도)도 보관 → 순위 계산 중에는 원본 컬렉션을 읽지 않음
+    """
+    def __init__(self):
+        self._entries: List[Tuple[str, int, str, int]] = []
+        self._tokens: Dict[Tuple[str, int], Dict[str, int]] = {}
+        self._meta: Dict[Tuple[str, int], Tuple[int, Optional[float], Optional[float]]] = {}
+        self._signature: Dict[Tuple[str, int], tuple] = {}  # (이름, 주소, 좌표) → 가용 슬롯만 바뀐 경우는 건너뜀
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    @staticmethod
+    def _signature_of(place: Dict) -> tuple:
+        return (place.get('name'), place.get('address'), place.get('latitude'), place.get('longitude'))
+
+    def _changed(self, place_type: str, place: Dict) -> Optional[Dict[str, int]]:
+        signature = self._signature_of(place)
+        if self._signature.get((place_type, place['id'])) == signature:
+            return None
+        return place_tokens(place)
+
+    def update(self, place_type: str, place: Dict):
+        """등록/수정 시 호출 - 이름/주소가 바뀐 경우만 다시 색인"""
+        tokens = self._changed(place_type, place)
+        if tokens is None:
+            return
+        with self._lock:
+            self._remove(place_type, place['id'])
+            for token, kind in tokens.items():
+                insort(self._entries, (token, kind, place_type, place['id']))
+            self._store(place_type, place, tokens)
+
+    def update_many(self, place_type: str, places: List[Dict]):
+        """
+        대량 등록 시 호출 - 새 항목만 정렬한 뒤 기존 목록과 한 번에 병합 (O(n + m log n))
+        항목마다 insort하면 목록 이동이 m번, 전체 sort는 문자열 튜플 비교가 n번 → 삽입 위치만 bisect로 찾고 구간 복사
+        """
+        changed = [(place, tokens) for place in places
+                   if (tokens := self._changed(place_type, place)) is not None]
+        if not changed:
+            return
+        with self._lock:
+            added = []
+            for place, tokens in changed:
+                self._remove(place_type, place['id'])
+                added.extend((token, kind, place_type, place['id']) for token, kind in tokens.items())
+                self._store(place_type, place, tokens)
+            added.sort()
+            entries, merged, prev = self._entries, [], 0
+            for entry in added:
+                i = bisect_left(entries, entry, prev)
+                merged.extend(entries[prev:i])
+                merged.append(entry)
+                prev = i
+            merged.extend(entries[prev:])
+            self._entries = merged
+
+    def remove(self, place_type: str, place_id: int):
+        """삭제 시 호출"""
+        with self._lock:
+            self._remove(place_type, place_id)
+
+    def _store(self, place_type: str, place: Dict, tokens: Dict[str, int]):
+        key = (place_type, place['id'])
+        try:
+            lat, lng = float(place['latitude']), float(place['longitude'])
+        except (KeyError, TypeError, ValueError):
+            lat = lng = None
+        self._tokens[key] = tokens
+        self._meta[key] = (len(place.get('name') or ''), lat, lng)
+        self._signature[key] = self._signature_of(place)
+
+    def _remove(self, place_type: str, place_id: int):
+        self._signature.pop((place_type, place_id), None)
+        self._meta.pop((place_type, place_id), None)
+        for token, kind in self._tokens.pop((place_type, place_id), {}).items():
+            entry = (token, kind, place_type, place_id)
+            i = bisect_left(self._entries, entry)
+            if i < len(self._entries) and self._entries[i] == entry:
+                del self._entries[i]
+
+    def search(self, query: str, limit: int, place_type: Optional[str] = None,
+               lat: Optional[float] = None, lng: Optional[float] = None) -> List[Tuple[float, str, int, Optional[float]]]:
+        """
+        질의 → 점수 높은 순 [(점수, 장소 타입, id, 거리 km), ...] 최대 limit개
+        여러 단어면 구간이 가장 짧은 단어로 후보를 찾고, 나머지 단어는 후보의 단어 목록에서 접두사 확인
+        """
+        words = query.lower().split()
+        if not words or limit <= 0:
+            return []
+        ranges = [prefix_range(word, fuzzy=i == len(words) - 1) for i, word in enumerate(words)]
+        proximity = lat is not None and lng is not None
+        if proximity:
+            # 순위용 거리는 평면 근사 (도시 범위에서는 대원 거리와 거의 같고 훨씬 빠름), 응답 거리만 haversine
+            km_per_deg_lng = KM_PER_DEG_LAT * math.cos(math.radians(lat))
+        with self._lock:
+            entries = self._entries
+            spans = [(bisect_left(entries, (low,)), bisect_left(entries, (high,)), i)
+                     for i, (low, high) in enumerate(ranges)]
+            start, end, pivot = min(spans, key=lambda span: span[1] - span[0])
+            others = [r for i, r in enumerate(ranges) if i != pivot]
+            exact_len = len(words[pivot])
+            best: Dict[Tuple[str, int], float] = {}
+            scanned = 0
+            # 구간을 슬라이싱으로 복사하지 않고 인덱스로 앞에서부터 필요한 만큼만 읽음
+            for i in range(start, end):
+                token, kind, entry_type, place_id = entries[i]
+                if place_type is not None and entry_type != place_type:
+                    continue
+                scanned += 1
+                if scanned > AUTOCOMPLETE_SCAN_LIMIT:
+                    break
+                key = (entry_type, place_id)
+                if others and not all(any(low <= t < high for t in self._tokens[key]) for low, high in others):
+                    continue
+                score = AUTOCOMPLETE_KIND_SCORE[kind]
+                if len(token) == exact_len:
+                    score += AUTOCOMPLETE_EXACT_BONUS
+                if score > best.get(key, 0.0):
+                    best[key] = score
+
+            results = []
+            meta = self._meta
+            for key, score in best.items():
+                name_len, p_lat, p_lng = meta[key]
+                if proximity and p_lat is not None:
+                    distance = math.hypot((p_lat - lat) * KM_PER_DEG_LAT, (p_lng - lng) * km_per_deg_lng)
+                    score += AUTOCOMPLETE_PROXIMITY_WEIGHT / (1 + distance)
+                # 같은 점수면 이름이 짧은 장소 먼저 (입력한 글자가 이름에서 차지하는 비율이 큼)
+                results.append((score, -name_len, key))
+            top = nlargest(limit, results)
+            points = [meta[key][1:] for _, _, key in top]
+
+        return [(score, key[0], key[1],
+                 haversine_km(lat, lng, p_lat, p_lng) if proximity and p_lat is not None else None)
+                for (score, _, key), (p_lat, p_lng) in zip(top, points)]
+
+
+place_prefix_index = PlacePrefixIndex()  # 주차장/충전소 자동완성 - index_parking_spot(s)/index_ev_station(s)에서 함께 갱신
+
+
+# ============================================================================
+# 시간 구간 예약 엔진: 슬롯별 정렬된 예약 구간 목록 (bisect 기반)
+# ============================================================================
+# 
+# [시간 구간 예약]
+# 슬롯 하나에 겹치지 않는 [start, end) 예약 구간들을 시작 시각 순으로 저장.
+# 구간끼리 겹치지 않으므로 종료 시각도 같은 순서로 정렬됨 → 겹침 검사/삽입 위치를 이진 탐색(O(log n))으로 찾음.
+# 종료된 예약은 앞쪽부터 잘라내서(expire) 슬롯이 다시 예약 가능해짐.
+
+
+def to_timestamp(value) -> float:
+    """
+    ISO 문자열 또는 datetime → epoch 초
+    'Z' 접미사 허용, 시간대 정보가 없는 값은 서버 로컬 시간으로 해석
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value.timestamp()
+
+
+class SlotTimeline:
+    """
+    슬롯 하나의 예약 구간 목록
+    리스트(list): starts/ends/reservation_ids를 같은 인덱스로 맞춰 저장 (시작 시각 오름차순)
+    """
+    __slots__ = ('starts', 'ends', 'reservation_ids')
+
+    def __init__(self):
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        self.reservation_ids: List[int] = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlaps(self, start: float, end: float) -> bool:
+        """[start, end)와 겹치는 예약이 있는지 - O(log n)"""
+        # 종료 시각이 start보다 늦은 첫 구간만 확인하면 됨
+        i = bisect_right(self.ends, start)
+        return i < len(self.starts) and self.starts[i] < end
+
+    def active(self, now: float) -> bool:
+        """now 시각에 진행 중인 예약이 있는지 - O(log n)"""
+        i = bisect_right(self.ends, now)
+        return i < len(self.starts) and self.starts[i] <= now
+
+    def add(self, start: float, end: float, reservation_id: int) -> bool:
+        """겹치지 않을 때만 구간 추가"""
+        if end <= start or self.overlaps(start, end):
+            return False
+        i = bisect_right(self.ends, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.reservation_ids.insert(i, reservation_id)
+        return True
+
+    def remove(self, start: float, reservation_id: int) -> bool:
+        """예약 구간 삭제 (시작 시각으로 위치 탐색)"""
+        i = bisect_right(self.starts, start) - 1
+        if i >= 0 and self.reservation_ids[i] == reservation_id:
+            del self.starts[i]
+            del self.ends[i]
+            del self.reservation_ids[i]
+            return True
+        return False
+
+    def expire(self, now: float) -> int:
+        """종료 시각이 지난 구간을 앞에서부터 제거하고 제거 개수 반환"""
+        i = bisect_right(self.ends, now)
+        if i:
+            # 슬라이스에 할당 / del: 슬라이싱을 이용해 중간 구간 삭제
+            del self.starts[:i]
+            del self.ends[:i]
+            del self.reservation_ids[:i]
+        return i
+
+
+class PlaceSchedule:
+    """
+    장소(주차장/충전소) 하나의 슬롯별 예약 타임라인
+    Dictionary 기반 조회(O(1)) - {slot: SlotTimeline}
+    지금 진행 중인 예약이 있는 슬롯만 '점유 중' (아직 시작하지 않은 예약은 점유 아님) → available = total - 점유 슬롯 수
+    예약 시작/종료 시각마다 refresh(now)로 점유 상태를 다시 계산 (스케줄러 작업)
+    version: 예약 구간이나 점유 상태가 바뀔 때마다 증가 → 상세 응답 캐시 무효화 판단에 사용
+    occupied: 점유 슬롯 비트맵 (정수 하나, i번째 비트 = i번 슬롯) → 슬롯 수백 개도 set 대신 정수 하나로 표현
+    """
+    __slots__ = ('timelines', 'version', 'occupied')
+    
+    def __init__(self):
+        self.timelines: Dict[int, SlotTimeline] = {}
+        self.version = 0
+        self.occupied = 0
+
+    def _sync_slot(self, slot: int, now: Optional[float]):
+        """슬롯 하나의 점유 비트를 now 기준으로 맞춤"""
+        now = datetime.now().timestamp() if now is None else now
+        timeline = self.timelines.get(slot)
+        if timeline is not None and timeline.active(now):
+            self.occupied |= 1 << slot
+        else:
+            self.occupied &= ~(1 << slot)
+
+    def book(self, slot: int, start: float, end: float, reservation_id: int, now: Optional[float] = None) -> bool:
+        """예약 추가 - 겹치면 False (지금 진행 중인 구간이면 바로 점유)"""
+        timeline = self.timelines.get(slot)
+        if timeline is None:
+            timeline = self.timelines[slot] = SlotTimeline()
+        if not timeline.add(start, end, reservation_id):
+            if not timeline:
+                del self.timelines[slot]
+            return False
+        self.version += 1
+        self._sync_slot(slot, now)
+        return True
+
+    def release(self, slot: int, start: float, reservation_id: int, now: Optional[float] = None) -> bool:
+        """예약 삭제 - 삭제했으면 True"""
+        timeline = self.timelines.get(slot)
+        if timeline is None or not timeline.remove(start, reservation_id):
+            return False
+        self.version += 1
+        if not timeline:
+            del self.timelines[slot]
+        self._sync_slot(slot, now)
+        return True
+
+    def refresh(self, now: float) -> int:
+        """
+        종료된 예약 정리 + now 기준 점유 상태 다시 계산 → 점유 상태가 바뀐 슬롯 비트맵 반환
+        정리 후에는 각 슬롯의 첫 구간만 확인하면 됨 (종료 시각 > now) → 슬롯당 O(1)
+        """
+        occupied = 0
+        for slot in list(self.timelines):
+            timeline = self.timelines[slot]
+            if timeline.expire(now):
+                self.version += 1
+                if not timeline:
+                    del self.timelines[slot]
+                    continue
+            if timeline.starts[0] <= now:
+                occupied |= 1 << slot
+        changed = occupied ^ self.occupied
+        if changed:
+            self.occupied = occupied
+            self.version += 1
+        return changed
+
+    def occupied_count(self) -> int:
+        """지금 점유 중인 슬롯 수"""
+        return bin(self.occupied).count('1')
+
+    def taken_mask(self, start: Optional[float] = None, end: Optional[float] = None) -> int:
+        """[start, end)에 예약이 겹치는 슬롯 비트맵 (구간 미지정 시 지금 점유 중인 슬롯 비트맵)"""
+        if start is None or end is None:
+            return self.occupied
+        mask = 0
+        for slot, timeline in self.timelines.items():
+            if timeline.overlaps(start, end):
+                mask |= 1 << slot
+        return mask
+    
+    def taken_slots(self, start: Optional[float] = None, end: Optional[float] = None) -> Set[int]:
+        """
+        [start, end)에 예약이 겹치는 슬롯 집합 (구간 미지정 시 지금 점유 중인 슬롯)
+        슬롯당 O(log n)
+        """
+        if start is None or end is None:
+            return set(mask_slots(self.occupied))
+        return {slot for slot, timeline in self.timelines.items() if timeline.overlaps(start, end)}
+
+    def free_slots(self, total: int, start: float, end: float) -> List[int]:
+        """[start, end)에 예약 가능한 슬롯 번호 목록"""
+        taken = self.taken_slots(start, end)
+        return [slot for slot in range(total) if slot not in taken]
+
+
+# {(place_type, place_id): PlaceSchedule} - 튜플 키로 충돌 방지 (요청마다 문자열 키를 만들지 않음)
+slot_schedules: Dict[Tuple[str, int], PlaceSchedule] = {}
+
+
+class PlaceLocks:
+    """
+    장소별 잠금 (callable 객체)
+    서로 다른 장소의 예약은 경합하지 않고, 같은 장소의 예약/취소/만료 정리만 순서대로 처리
+    RLock: 같은 스레드에서 잠금을 다시 잡아도(예약 생성 → 만료 정리) 교착되지 않음
+    """
+    def __init__(self):
+        self._locks: Dict[Tuple[str, int], threading.RLock] = {}
+        self._guard = threading.Lock()
+
+    def __call__(self, place_type: str, place_id: int) -> threading.RLock:
+        key = (place_type, place_id)
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(key, threading.RLock())
+        return lock
+
+
+place_lock = PlaceLocks()
+
+
+def get_place_schedule(place_type: str, place_id: int) -> PlaceSchedule:
+    """장소별 예약 타임라인 (없으면 생성)"""
+    key = (place_type, place_id)
+    schedule = slot_schedules.get(key)
+    if schedule is None:
+        schedule = slot_schedules[key] = PlaceSchedule()
+    return schedule
+
+
+def get_place_collection(place_type: str) -> Optional[Dict[int, Dict]]:
+    """place_type('parking' / 'ev')에 해당하는 컬렉션"""
+    if place_type == 'parking':
+        return parking_spots
+    if place_type == 'ev':
+        return ev_stations
+    return None
+
+
+def refresh_available(place_type: str, place_data: Dict, schedule: PlaceSchedule):
+    """
+    available = total - 지금 점유 중인 슬롯 수 (미래 예약은 빼지 않음)
+    증감 대신 매번 같은 값을 다시 계산 → 여러 워커가 같은 예약을 정리해도 결과가 같음
+    """
+    available = max(0, place_data.get('total', 0) - schedule.occupied_count())
+    if place_data.get('available') != available:
+        place_data['available'] = available
+        get_place_collection(place_type)[place_data['id']] = place_data
+        if place_type == 'parking':
+            parking_spot_list.update(place_data)
+            parking_spot_facets.update(place_data)  # 빈자리 구간이 바뀌었을 수 있음
+        else:
+            ev_station_list.update(place_data)
+        place_detail_cache.invalidate(place_type, place_data['id'])
+
+
+def publish_slot_changes(place_type: str, place_id: int, schedule: PlaceSchedule, slots):
+    """예약/취소/만료로 바뀐 슬롯을 'slot_changed' 이벤트로 알림 (실시간 스트림 구독자에게 전달)"""
+    slots = sorted(set(slots))
+    if not slots:
+        return
+    place_collection = get_place_collection(place_type)
+    place_data = place_collection.get(place_id) if place_collection is not None else None
+    dispatch_event('slot_changed', {
+        'place_type': place_type,
+        'place_id': place_id,
+        'slots': [{'slot': slot, 'taken': bool(schedule.occupied >> slot & 1)} for slot in slots],
+        # refresh_available과 같은 계산 - 다른 워커 변경을 반영할 때 장소 데이터보다 예약이 먼저 들어와도 정확
+        'available': max(0, place_data.get('total', 0) - schedule.occupied_count()) if place_data else None,
+        'version': schedule.version
+    }, key=(place_type, place_id))
+
+
+def mask_slots(mask: int) -> List[int]:
+    """비트맵에서 켜진 비트 위치 목록"""
+    slots = []
+    while mask:
+        low = mask & -mask
+        slots.append(low.bit_length() - 1)
+        mask ^= low
+    return slots
+
+
+def expire_place_bookings(place_type: str, place_id: int, place_data: Dict) -> PlaceSchedule:
+    """
+    종료된 예약 정리 + 시작/종료 시각이 지난 슬롯의 점유 상태 갱신 → 바뀐 만큼 available 다시 계산
+    잠금 순서는 항상 저장소 쓰기 트랜잭션 → 장소별 잠금 (예약 생성/취소와 같은 순서)
+    반대로 잡으면 SQLite 쓰기 잠금을 쥔 예약 요청과 장소 잠금을 쥔 쪽이 서로를 기다림 → 조회(GET) 경로에서는 호출하지 않음
+    """
+    with storage.transaction(), place_lock(place_type, place_id):
+        schedule = get_place_schedule(place_type, place_id)
+        changed = schedule.refresh(datetime.now().timestamp())
+        if changed:
+            refresh_available(place_type, place_data, schedule)
+            publish_slot_changes(place_type, place_id, schedule, mask_slots(changed))
+    return schedule
+
+
+@on_remote_change('reservations')
+def sync_reservation_schedule(reservation_id: int, old: Optional[Dict], new: Optional[Dict]):
+    """다른 워커에서 생성/취소된 예약을 예약 타임라인/사용자별 인덱스에 반영"""
+    if new is None:
+        reservations_by_user.remove(reservation_id)
+    else:
+        reservations_by_user.update(new)
+    if old is not None:
+        with place_lock(old['place_type'], old['place_id']):
+            schedule = get_place_schedule(old['place_type'], old['place_id'])
+            version = schedule.version
+            schedule.release(old['slot'], to_timestamp(old['start_time']), reservation_id)
+            if schedule.version != version:
+                publish_slot_changes(old['place_type'], old['place_id'], schedule, [old['slot']])
+    if new is not None:
+        with place_lock(new['place_type'], new['place_id']):
+            schedule = get_place_schedule(new['place_type'], new['place_id'])
+            version = schedule.version
+            schedule.book(new['slot'], to_timestamp(new['start_time']), to_timestamp(new['end_time']), reservation_id)
+            if schedule.version != version:
+                publish_slot_changes(new['place_type'], new['place_id'], schedule, [new['slot']])
+                schedule_reservation_tasks(new, remind=False)
+
+
+def parse_time_window() -> Tuple[Optional[float], Optional[float]]:
+    """쿼리 파라미터 start_time/end_time → (start, end) epoch 초 (없거나 잘못되면 None)"""
+    start_time = request.args.get('start_time')
+    end_time = request.args.get('end_time')
+    if not start_time or not end_time:
+        return None, None
+    try:
+        return to_timestamp(start_time), to_timestamp(end_time)
+    except ValueError:
+        return None, None
+
+
+# ============================================================================
+# 상세 응답 캐시: 인코딩된 JSON bytes + ETag
+# ============================================================================
+# 
+# [버전 기반 캐시 무효화]
+# 상세 페이지는 폴링이 잦지만 장소 정보는 거의 안 바뀌고, 슬롯 상태는 예약/취소/만료 때만 바뀜.
+# 응답을 (장소 정보 버전, 예약 타임라인 버전)과 함께 저장하고 버전이 같으면 그리드 생성/jsonify 없이 그대로 반환.
+# - 장소 정보 버전: index_*/unindex_*/refresh_available에서 invalidate()로 증가 (다른 워커 변경도 리스너를 거쳐 반영)
+# - 예약 타임라인 버전: PlaceSchedule.version (예약/취소/만료 시 증가)
+# ETag는 본문 해시라서 워커가 달라도 같은 내용이면 같은 값 → If-None-Match로 304 응답
+
+class DetailCache:
+    """
+    (place_type, place_id, 질의 구간) → (버전, JSON bytes, ETag)
+    OrderedDict LRU: 질의 구간별 항목이 무한히 늘지 않도록 오래 안 쓴 항목부터 제거
+    """
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._versions: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self, place_type: str, place_id: int):
+        """장소 정보가 바뀌었을 때 호출 - 해당 장소의 캐시 항목이 모두 무효가 됨"""
+        with self._lock:
+            key = (place_type, place_id)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def version(self, place_type: str, place_id: int, schedule: PlaceSchedule) -> Tuple[int, int]:
+        return self._versions.get((place_type, place_id), 0), schedule.version
+
+    def get(self, key: tuple, version: Tuple[int, int]) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key: tuple, version: Tuple[int, int], detail: Dict) -> Tuple[bytes, str]:
+        """응답 dict를 한 번만 인코딩해서 저장"""
+        body = app.json.dumps(detail).encode('utf-8')
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        with self._lock:
+            self._entries[key] = (version, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body, etag
+
+
+place_detail_cache = DetailCache()
+
+
+def encode_bitmap(mask: int, size: int) -> str:
+    """슬롯 비트맵 → base64 (리틀 엔디언: 첫 바이트의 최하위 비트가 0번 슬롯)"""
+    mask &= (1 << size) - 1
+    return base64.b64encode(mask.to_bytes((size + 7) // 8, 'little')).decode('ascii')
+
+
+def place_detail_response(place_type: str, place_id: int, place: Dict, build_detail,
+                          default_grid: Tuple[int, int]):
+    """
+    상세 조회 공통 처리: 캐시 확인 → (없으면) build_detail(taken 비트맵)로 생성
+    build_detail: 일급 객체 - 장소 종류별 그리드 구성 함수
+    format=bitmap: 슬롯별 dict 목록 대신 점유 비트맵(base64) + rows/cols/total만 내려주는 압축 형식
+    읽기 전용 - 예약 시작/종료에 따른 점유 상태 갱신은 스케줄러가 담당 (조회 중 저장소에 쓰지 않음)
+    """
+    schedule = get_place_schedule(place_type, place_id)
+    window = parse_time_window()
+    compact = request.args.get('format') == 'bitmap'
+    key = (place_type, place_id, window, compact)
+    version = place_detail_cache.version(place_type, place_id, schedule)
+    cached = place_detail_cache.get(key, version)
+    if cached is None:
+        with place_lock(place_type, place_id):  # 타임라인을 읽는 동안 예약/취소가 끼어들지 않게
+            taken = schedule.taken_mask(*window)
+        if compact:
+            rows = place.get('rows', default_grid[0])
+            cols = place.get('cols', default_grid[1])
+            total = place.get('total', rows * cols)
+            detail = {**place, 'rows': rows, 'cols': cols, 'total': total,
+                      'occupancy': encode_bitmap(taken, total)}
+        else:
+            detail = build_detail(taken)
+        cached = place_detail_cache.put(key, version, detail)
+    body, etag = cached
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
 
 # ============================================================================
 # 퍼스트 클래스 함수 / 함수형 요소
@@ -144,8 +2429,7 @@ def get_next_id(entity_type: str) -> int:
     ID 생성 함수
     일급 객체(first-class function): 함수를 변수처럼 저장, 인자로 넘기고, 반환값으로 돌려줄 수 있음
     """
-    id_counters[entity_type] += 1
-    return id_counters[entity_type]
+    return storage.next_id(entity_type)
 
 
 # 고차 함수: 함수를 받거나 반환하는 함수
@@ -172,6 +2456,184 @@ def validate_required_fields(*required_fields):
     return decorator
 
 
+def invalid_text_field(data: Dict, fields) -> Optional[str]:
+    """문자열이어야 하는 필드에 다른 타입이 들어왔으면 오류 메시지 (없으면 None) - 저장/색인 전에 확인"""
+    for field in fields:
+        if field in data and not isinstance(data[field], str):
+            return f'Invalid {field}'
+    return None
+
+
+def invalid_number_field(data: Dict, fields) -> Optional[str]:
+    """숫자여야 하는 필드에 숫자가 아니거나 NaN/inf가 들어왔으면 오류 메시지 (없으면 None, null은 허용)"""
+    for field in fields:
+        value = data.get(field)
+        if value is not None and not is_finite_number(value):
+            return f'Invalid {field}'
+    return None
+
+
+# ============================================================================
+# 인증: 서명된 세션 토큰 (HMAC) + 비밀번호 해시 (PBKDF2)
+# ============================================================================
+# 
+# [상태 없는 세션 토큰]
+# 토큰 = "사용자 ID.세션 버전.만료 시각.서명", 서명 = HMAC-SHA256(서버 비밀 키, 앞부분)
+# → 서버는 세션 저장소 없이 서명만 확인하면 되고, 여러 워커가 같은 비밀 키로 같은 토큰을 검증.
+# 로그아웃은 사용자 레코드의 session_version을 올려서 그 전에 발급된 토큰을 모두 무효화 (다른 워커에도 저장소로 전파).
+# 검증한 토큰은 작은 LRU 캐시에 (사용자 ID, 세션 버전, 만료 시각)으로 보관 → 반복 요청은 HMAC 계산 없이 dict 조회 몇 번.
+# 
+# [비밀번호 해시]
+# PBKDF2-HMAC-SHA256 + 사용자별 무작위 salt → 일부러 느린 계산이라 회원가입/로그인에서만 실행 (요청마다 X).
+# 저장 형식: "pbkdf2_sha256$반복 횟수$salt$해시" (반복 횟수를 올려도 기존 해시는 저장된 횟수로 검증)
+# 이전에 평문으로 저장된 비밀번호는 로그인에 성공할 때 해시로 바꿔서 다시 저장.
+
+TOKEN_TTL_SEC = int(float(os.environ.get('PLINKU_TOKEN_TTL_HOURS', 24)) * 3600)  # 세션 토큰 유효 시간
+TOKEN_CACHE_SIZE = int(os.environ.get('PLINKU_TOKEN_CACHE_SIZE', 4096))  # 검증한 토큰 캐시 크기
+PASSWORD_ITERATIONS = int(os.environ.get('PLINKU_PASSWORD_ITERATIONS', 200000))  # PBKDF2 반복 횟수
+
+
+def load_secret_key() -> bytes:
+    """
+    토큰 서명 키 - PLINKU_SECRET_KEY가 없으면 instance/secret_key에 만들어 두고 공유
+    (O_EXCL로 만들기 → 여러 워커가 동시에 시작해도 파일 하나만 생기고 모두 같은 키를 읽음)
+    """
+    if os.environ.get('PLINKU_SECRET_KEY'):
+        return os.environ['PLINKU_SECRET_KEY'].encode()
+    path = os.path.join(app.instance_path, 'secret_key')
+    os.makedirs(app.instance_path, exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        for _ in range(50):  # 다른 워커가 막 만들어서 아직 쓰는 중일 수 있음
+            with open(path, 'rb') as f:
+                key = f.read()
+            if key:
+                return key
+            time.sleep(0.01)
+        raise RuntimeError(f'empty secret key file: {path}')
+    key = secrets.token_hex(32).encode()
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+SECRET_KEY = load_secret_key()
+
+
+def hash_password(password: str, iterations: int = PASSWORD_ITERATIONS) -> str:
+    """비밀번호 → "pbkdf2_sha256$반복 횟수$salt$해시" (salt는 매번 새로)"""
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return f'pbkdf2_sha256${iterations}${base64.b64encode(salt).decode()}${base64.b64encode(digest).decode()}'
+
+
+# 없는 이메일로 로그인해도 같은 시간이 걸리도록 비교할 가짜 해시 (응답 시간으로 가입 여부를 알 수 없게)
+DUMMY_PASSWORD_HASH = hash_password(secrets.token_hex(8))
+
+
+def is_password_hash(stored) -> bool:
+    return isinstance(stored, str) and stored.startswith('pbkdf2_sha256$')
+
+
+def verify_password(password: str, stored) -> bool:
+    """저장된 해시(또는 이전 평문)와 비교 - 상수 시간 비교"""
+    if not is_password_hash(stored):
+        return isinstance(stored, str) and hmac.compare_digest(stored.encode(), password.encode())
+    try:
+        _, iterations, salt, digest = stored.split('$')
+        expected = base64.b64decode(digest)
+        actual = hashlib.pbkdf2_hmac('sha256', password.encode(), base64.b64decode(salt), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+def sign_token(payload: str) -> str:
+    digest = hmac.new(SECRET_KEY, payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode().rstrip('=')
+
+
+def issue_token(user: Dict) -> Tuple[str, int]:
+    """세션 토큰 발급 → (토큰, 만료 epoch 초)"""
+    expires_at = int(time.time()) + TOKEN_TTL_SEC
+    payload = f"{user['id']}.{user.get('session_version', 0)}.{expires_at}"
+    return f'{payload}.{sign_token(payload)}', expires_at
+
+
+class TokenCache:
+    """
+    검증한 토큰 → (user_id, session_version, 만료 시각) LRU
+    OrderedDict: 조회할 때마다 맨 뒤로, 가득 차면 가장 오래 안 쓴 토큰부터 제거
+    """
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, Tuple[int, int, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Tuple[int, int, int]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry
+
+    def put(self, token: str, entry: Tuple[int, int, int]):
+        with self._lock:
+            self._entries[token] = entry
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+
+
+def verify_token(token: str) -> Optional[int]:
+    """
+    토큰 → 사용자 ID (서명이 틀렸거나 만료/로그아웃된 토큰이면 None)
+    캐시에 있으면 HMAC 계산 없이 만료 시각과 세션 버전만 확인
+    """
+    entry = token_cache.get(token)
+    if entry is None:
+        payload, _, signature = token.rpartition('.')
+        # str끼리 compare_digest는 ASCII만 받음 → 헤더에 다른 문자가 섞여 와도 예외 없이 거절되도록 bytes로 비교
+        if not payload or not hmac.compare_digest(signature.encode(), sign_token(payload).encode()):
+            return None
+        try:
+            entry = tuple(int(part) for part in payload.split('.'))
+        except ValueError:
+            return None
+        if len(entry) != 3:
+            return None
+        token_cache.put(token, entry)
+    user_id, session_version, expires_at = entry
+    if expires_at <= time.time():
+        return None
+    # Dictionary 기반 조회(O(1)) - 삭제된 사용자/로그아웃으로 세션 버전이 바뀐 사용자의 토큰은 거절
+    user = users.get(user_id)
+    if user is None or user.get('session_version', 0) != session_version:
+        return None
+    return user_id
+
+
+def current_user_id() -> Optional[int]:
+    """
+    Authorization: Bearer <토큰> → 사용자 ID (없거나 유효하지 않으면 None)
+    요청마다 한 번만 검증하고 g에 보관 (require_auth와 로그인 선택 API가 같은 결과를 씀)
+    """
+    if 'user_id' not in g:
+        header = request.headers.get('Authorization', '')
+        scheme, _, token = header.partition(' ')
+        g.user_id = verify_token(token.strip()) if scheme.lower() == 'bearer' and token else None
+    return g.user_id
+
+
 # ============================================================================
 # 데코레이터 / 클로저
 # ============================================================================
@@ -192,9 +2654,9 @@ def require_auth(func):
     """
     @wraps(func)
     def wrapper(*args, **kwargs):
-        user_id = request.headers.get('X-User-Id', type=int)
-        # Dictionary 기반 조회(O(1)) - User 빠른 조회 구조
-        if user_id is None or user_id not in users:
+        # 세션 토큰 검증 (검증한 토큰은 캐시 → 요청마다 HMAC/비밀번호 해시 계산 없음)
+        user_id = current_user_id()
+        if user_id is None:
             return jsonify({'error': 'Authentication required'}), 401
         # request에 user_id 추가
         request.user_id = user_id
@@ -202,6 +2664,130 @@ def require_auth(func):
     return wrapper
 
 
+def transactional(func):
+    """
+    함수 데코레이터: 트랜잭션 처리
+    핸들러 전체를 storage.transaction()으로 감싸서 확인 → 기록 과정이 다른 워커의 쓰기와 섞이지 않게 함
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with storage.transaction():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+# 요청 속도 제한 (토큰 버킷)
+# 키(라우트 이름 + 사용자 ID 또는 클라이언트 IP)마다 버킷 하나: 최대 capacity개 토큰, 초당 refill_per_sec개씩 다시 참.
+# 요청마다 토큰 1개 사용, 없으면 429 + Retry-After (다음 토큰이 찰 때까지 남은 초).
+# - 게으른 충전: 타이머 없이 요청이 올 때 지난 시간만큼 한 번에 채움 → 버킷은 (토큰 수, 마지막 시각, 가득 차는 시각) 튜플 하나
+# - 메모리 상한: OrderedDict를 최근 사용 순으로 유지, 키가 max_keys를 넘으면 가장 오래 안 쓴 버킷부터 제거
+# - 유휴 제거: 가득 찬 버킷은 새 버킷과 같으므로 앞쪽(오래 안 쓴) 버킷 중 이미 가득 찼을 버킷은 조회할 때 함께 제거
+# 버킷은 워커 프로세스마다 따로 (워커 N개면 실제 허용량은 최대 N배)
+
+RATE_LIMIT_ENABLED = os.environ.get('PLINKU_RATE_LIMIT', '1') != '0'  # 0이면 속도 제한 끔 (부하 테스트 등)
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('PLINKU_RATE_LIMIT_KEYS', 10000))  # 워커당 최대 버킷 수
+# 앞에 둔 리버스 프록시 수 (0이면 직접 연결) - X-Forwarded-For의 맨 왼쪽은 클라이언트가 마음대로 넣을 수 있으므로
+# ProxyFix로 오른쪽에서 이 수만큼(우리 프록시가 붙인 것)만 믿고 remote_addr를 바꿈
+TRUST_PROXY_HOPS = int(os.environ.get('PLINKU_TRUST_PROXY', '0'))
+if TRUST_PROXY_HOPS > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUST_PROXY_HOPS)
+
+
+class RateLimiter:
+    """키별 토큰 버킷 모음 - 조회/갱신 O(1), 버킷 수는 max_keys 이하"""
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self.limited: Dict[str, int] = {}  # 라우트별 거절 횟수 (/api/metrics)
+        self._buckets: 'OrderedDict[tuple, Tuple[float, float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: tuple, capacity: float, refill_per_sec: float, now: Optional[float] = None) -> float:
+        """토큰 1개 사용 → 0.0 (허용) 또는 다음 토큰까지 기다려야 하는 초"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # 유휴 제거: 오래 안 쓴 쪽부터 이미 가득 찼을 버킷은 지워도 결과가 같음
+            while self._buckets:
+                oldest = next(iter(self._buckets.values()))
+                if oldest[2] > now:
+                    break
+                self._buckets.popitem(last=False)
+
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_sec)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / refill_per_sec
+                self.limited[key[0]] = self.limited.get(key[0], 0) + 1
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_sec)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+rate_limiter = RateLimiter(RATE_LIMIT_MAX_KEYS)
+
+
+def client_ip() -> str:
+    """클라이언트 IP (프록시 뒤라면 ProxyFix가 검증한 주소)"""
+    return request.remote_addr or '-'
+
+
+def rate_limit(capacity: int, per_seconds: float, by: str = 'user'):
+    """
+    라우트별 요청 속도 제한 데코레이터 - per_seconds초마다 capacity번 (순간적으로는 capacity번까지 연속 허용)
+    by='user'면 로그인한 사용자별(토큰이 없으면 IP별), by='ip'면 항상 클라이언트 IP별
+    @app.route 바로 아래에 두어서 거절할 요청은 트랜잭션/인증/본문 검증 전에 돌려보냄
+    """
+    refill_per_sec = capacity / per_seconds
+
+    def decorator(func):
+        name = func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not RATE_LIMIT_ENABLED:
+                return func(*args, **kwargs)
+            user_id = current_user_id() if by == 'user' else None
+            key = (name, 'user', user_id) if user_id is not None else (name, 'ip', client_ip())
+            wait = rate_limiter.acquire(key, capacity, refill_per_sec)
+            if wait:
+                retry_after = max(1, math.ceil(wait))
+                response = jsonify({'error': 'Too many requests', 'retry_after': retry_after})
+                response.headers['Retry-After'] = str(retry_after)
+                return response, 429
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# 운영용 엔드포인트(/api/metrics, /api/events/stats) 접근 제한
+# PLINKU_METRICS_TOKEN이 있으면 Authorization: Bearer <토큰>이 같아야 하고, 없으면 같은 호스트(loopback)에서 온 요청만 허용
+METRICS_TOKEN = os.environ.get('PLINKU_METRICS_TOKEN')
+
+
+def require_internal(func):
+    """함수 데코레이터: 운영용 엔드포인트 - 공개 포트로 들어온 요청은 403"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if METRICS_TOKEN:
+            header = request.headers.get('Authorization', '')
+            allowed = hmac.compare_digest(header.encode(), f'Bearer {METRICS_TOKEN}'.encode())
+        else:
+            allowed = client_ip() in ('127.0.0.1', '::1')
+        if not allowed:
+            return jsonify({'error': 'Forbidden'}), 403
+        return func(*args, **kwargs)
+    return wrapper
+
+
 # 등록용 데코레이터: 이벤트 핸들러 목록처럼 플러그인 모으는 데 사용
 event_handlers = {}  # 딕셔너리: key → value 매핑 → 이벤트 타입별 핸들러 목록 저장
 
@@ -220,6 +2806,122 @@ def register_handler(event_type: str):
     return decorator
 
 
+class EventBus:
+    """
+    비동기 이벤트 버스 - event_handlers에 등록된 핸들러를 요청 스레드 밖의 작업 스레드에서 실행
+    
+    큐(Queue): 작업 스레드마다 크기 제한이 있는 FIFO 대기열
+    - 같은 key(예: 장소)의 이벤트는 항상 같은 스레드로 → 발생 순서대로 처리
+    - 배압(backpressure): 대기열이 가득 차면 put_timeout초만 기다리고, 그래도 가득 차면 요청 스레드에서 직접 실행
+      (이벤트를 버리지 않으면서 대기열이 무한히 늘지 않음)
+    - workers=0이면 동기 실행 (테스트/디버깅용)
+    핸들러별 실행 횟수 / 실패 횟수 / 누적·최대 실행 시간과 대기열 깊이를 집계
+    """
+    def __init__(self, workers: int = 4, max_pending: int = 1024, put_timeout: float = 0.05):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.put_timeout = put_timeout
+        self.inline_runs = 0  # 대기열이 가득 차서 요청 스레드에서 실행한 횟수
+        self._queues: List[queue.Queue] = []
+        self._pid = None
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self):
+        """첫 이벤트 때 작업 스레드 시작 (gunicorn 워커 fork 이후 프로세스마다 따로 시작)"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queues = [queue.Queue(self.max_pending) for _ in range(self.workers)]
+            for i, pending in enumerate(self._queues):
+                threading.Thread(target=self._work, args=(pending,), name=f'event-bus-{i}', daemon=True).start()
+            self._pid = os.getpid()
+
+    def dispatch(self, event_type: str, payload: Dict, key=None):
+        if not event_handlers.get(event_type):
+            return
+        if self.workers <= 0:
+            self._run(event_type, payload)
+            return
+        if self._pid != os.getpid():
+            self._start()
+        pending = self._queues[hash(key) % self.workers if key is not None else 0]
+        try:
+            pending.put((event_type, payload), timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self.inline_runs += 1
+            self._run(event_type, payload)
+
+    def _work(self, pending: queue.Queue):
+        while True:
+            event_type, payload = pending.get()
+            try:
+                self._run(event_type, payload)
+            finally:
+                pending.task_done()
+
+    def _run(self, event_type: str, payload: Dict):
+        """핸들러를 등록 순서대로 호출 - 하나가 실패해도 나머지는 계속 실행"""
+        for handler in event_handlers.get(event_type, ()):
+            started = time.perf_counter()
+            failed = False
+            try:
+                handler(payload)
+            except Exception:
+                failed = True
+                app.logger.exception('event handler failed: %s (%s)', handler.__name__, event_type)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stats = self._stats.setdefault(handler.__name__, {'calls': 0, 'errors': 0, 'total_sec': 0.0, 'max_sec': 0.0})
+                stats['calls'] += 1
+                stats['errors'] += failed
+                stats['total_sec'] += elapsed
+                stats['max_sec'] = max(stats['max_sec'], elapsed)
+
+    def queue_depth(self) -> int:
+        return sum(pending.qsize() for pending in self._queues)
+
+    def join(self):
+        """대기 중인 이벤트가 모두 처리될 때까지 대기 (벤치마크/스크립트용)"""
+        for pending in list(self._queues):
+            pending.join()
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            handlers = {
+                name: {
+                    'calls': int(stats['calls']),
+                    'errors': int(stats['errors']),
+                    'avg_ms': round(stats['total_sec'] * 1000 / stats['calls'], 3) if stats['calls'] else 0.0,
+                    'max_ms': round(stats['max_sec'] * 1000, 3),
+                }
+                for name, stats in self._stats.items()
+            }
+            inline_runs = self.inline_runs
+        return {
+            'workers': self.workers,
+            'queue_depth': self.queue_depth(),
+            'max_pending': self.max_pending * max(self.workers, 1),
+            'inline_runs': inline_runs,
+            'handlers': handlers
+        }
+
+
+event_bus = EventBus(
+    workers=int(os.environ.get('PLINKU_EVENT_WORKERS', '4')),
+    max_pending=int(os.environ.get('PLINKU_EVENT_QUEUE', '1024'))
+)
+
+
+def dispatch_event(event_type: str, payload: Dict, key=None):
+    """
+    이벤트 발행 - 등록된 핸들러는 이벤트 버스 작업 스레드에서 실행 (요청 응답을 기다리게 하지 않음)
+    key: 순서를 지켜야 하는 이벤트 묶음 (같은 key는 같은 작업 스레드에서 순서대로 처리)
+    """
+    event_bus.dispatch(event_type, payload, key)
+
+
 # ============================================================================
 # 스택 / 큐 구조
 # ============================================================================
@@ -255,16 +2957,17 @@ from heapq import heappush, heappop
 
 # 리스트(list): 순서 있는 가변 컬렉션 → 우선순위 큐 저장
 priority_queue = []
+priority_seq = count()  # 우선순위가 같으면 넣은 순서대로 (작업 dict끼리 비교하지 않도록)
 
-def add_priority_task(priority: int, task: Dict):
+def add_priority_task(priority: float, task: Dict):
     """
     우선순위 큐: 혼잡도 높은 주차장/긴급 요청 먼저 처리
     
     우선순위 큐(Priority Queue): 우선순위 높은 작업 먼저 처리 → 예) 혼잡도 높은 주차장/긴급 요청 먼저 처리하는 로직에 응용 가능.
-    튜플(tuple): 순서 있지만 불변 → (우선순위, 타임스탬프, 작업) 같은 변경되면 안 되는 묶음에 사용.
+    튜플(tuple): 순서 있지만 불변 → (우선순위, 순번, 작업) 같은 변경되면 안 되는 묶음에 사용.
     """
-    # 튜플(tuple): 순서 있지만 불변 → (우선순위, 타임스탬프, 작업) 같은 변경되면 안 되는 묶음에 사용
-    heappush(priority_queue, (priority, datetime.now(), task))
+    # 튜플(tuple): 순서 있지만 불변 → (우선순위, 순번, 작업) 같은 변경되면 안 되는 묶음에 사용
+    heappush(priority_queue, (priority, next(priority_seq), task))
 
 def get_next_priority_task() -> Optional[Dict]:
     """
@@ -278,13 +2981,313 @@ def get_next_priority_task() -> Optional[Dict]:
     return None
 
 
+# 우선순위 큐 기반 백그라운드 스케줄러: 예약 시작 시 슬롯 점유, 종료 시 슬롯 반납, 시작 전 알림
+# 점유 상태는 시간이 지나기만 해도 바뀌므로 (미래 예약 시작, 진행 중 예약 종료) 시각에 맞춰 다시 계산해야 함
+REMINDER_LEAD_SEC = int(os.environ.get('PLINKU_REMINDER_MINUTES', '10')) * 60
+
+
+class TaskScheduler:
+    """
+    priority_queue를 소비하는 타이머 스레드
+    - 우선순위 = 실행 시각(epoch 초) → 힙의 맨 앞이 항상 다음에 실행할 작업
+    - 맨 앞 작업의 실행 시각까지만 대기하고, 더 이른 작업이 들어오면 깨어나서 다시 계산
+    - 작업 추가/꺼내기 O(log n), 주기적인 전체 예약 순회 없음
+    - 취소된 예약의 작업은 힙에서 찾아 지우지 않고 실행 시점에 건너뜀 (지연 삭제)
+    """
+    def __init__(self):
+        self.runners: Dict[str, callable] = {}  # 작업 종류 → 실행 함수
+        self._cond = threading.Condition()
+        self._pid = None
+
+    def task(self, task_type: str):
+        """등록용 데코레이터: 작업 종류별 실행 함수 등록"""
+        def decorator(func):
+            self.runners[task_type] = func
+            return func
+        return decorator
+
+    def schedule(self, run_at: float, task: Dict):
+        with self._cond:
+            add_priority_task(run_at, task)
+            self._cond.notify()
+        if self._pid != os.getpid():
+            self._start()
+
+    def _start(self):
+        """첫 작업 때 타이머 스레드 시작 (gunicorn 워커 fork 이후 프로세스마다 따로 시작)"""
+        with self._cond:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._loop, name='task-scheduler', daemon=True).start()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not priority_queue or priority_queue[0][0] > time.time():
+                    self._cond.wait(priority_queue[0][0] - time.time() if priority_queue else None)
+                task = get_next_priority_task()
+            try:
+                storage.sync()  # 다른 워커에서 취소된 예약 반영
+                self.runners[task['type']](task)
+            except Exception:
+                app.logger.exception('scheduled task failed: %s', task.get('type'))
+
+    def pending(self) -> int:
+        return len(priority_queue)
+
+
+scheduler = TaskScheduler()
+
+
+def schedule_reservation_tasks(reservation: Dict, remind: bool = True):
+    """
+    예약 하나의 작업 등록: 시작 시각에 슬롯 점유, 종료 시각에 슬롯 반납, 시작 REMINDER_LEAD_SEC초 전에 알림
+    시작/종료 작업은 모든 워커가 각자 등록 (워커마다 예약 타임라인 복제본을 가짐),
+    알림은 예약을 만든 워커만 등록 (remind=True) → 알림이 한 번만 발생
+    """
+    start_at = to_timestamp(reservation['start_time'])
+    if start_at > time.time():
+        scheduler.schedule(start_at, {
+            'type': 'expire',
+            'place_type': reservation['place_type'],
+            'place_id': reservation['place_id']
+        })
+    scheduler.schedule(to_timestamp(reservation['end_time']), {
+        'type': 'expire',
+        'place_type': reservation['place_type'],
+        'place_id': reservation['place_id']
+    })
+    remind_at = to_timestamp(reservation['start_time']) - REMINDER_LEAD_SEC
+    if remind and remind_at > time.time():
+        scheduler.schedule(remind_at, {
+            'type': 'reminder',
+            'reservation_id': reservation['id'],
+            'start_time': reservation['start_time']
+        })
+
+
+@scheduler.task('expire')
+def run_expire_task(task: Dict):
+    """예약 시작/종료 시각이 된 장소의 점유 상태 갱신 → available 다시 계산, 슬롯 변경 이벤트"""
+    place_collection = get_place_collection(task['place_type'])
+    place_data = place_collection.get(task['place_id']) if place_collection is not None else None
+    if place_data:
+        expire_place_bookings(task['place_type'], task['place_id'], place_data)
+
+
+@scheduler.task('reminder')
+def run_reminder_task(task: Dict):
+    """예약 시작 전 알림 이벤트 (취소/변경된 예약은 건너뜀)"""
+    reservation = reservations.get(task['reservation_id'])
+    if reservation and reservation['start_time'] == task['start_time']:
+        dispatch_event('reservation_reminder', dict(reservation),
+                       key=(reservation['place_type'], reservation['place_id']))
+
+
 # 더미 데이터 제거 - 호스팅 바로 할 수 있게 빈 상태로 시작
 
 
+# ============================================================================
+# 요청 계측 / 메트릭 (Prometheus 텍스트 형식)
+# ============================================================================
+# 
+# [요청 계측]
+# before_request/after_request로 엔드포인트(URL 규칙)별 지연 시간 히스토그램, 요청/응답 크기를 기록하고
+# /api/metrics에서 컬렉션 크기, 이벤트 버스/스케줄러 상태와 함께 Prometheus 텍스트 형식으로 내보냄.
+# 값은 워커 프로세스별 (gunicorn 워커마다 따로 집계).
+# 
+# [샘플링 프로파일러 (opt-in)]
+# - PLINKU_PROFILE_EVERY=N: N번째 요청마다 cProfile로 측정
+# - PLINKU_PROFILE_HEADER=1: X-Profile: 1 헤더가 붙은 요청을 측정
+# 결과는 PLINKU_PROFILE_DIR(기본 instance/profiles)에 .prof 파일로 저장 → snakeviz, flameprof 등으로 플레임그래프 확인
+# 한 번에 한 요청만 측정 (cProfile은 프로세스에 하나만 활성화 가능)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_EVERY = int(os.environ.get('PLINKU_PROFILE_EVERY', '0'))
+PROFILE_HEADER = os.environ.get('PLINKU_PROFILE_HEADER') == '1'
+PROFILE_DIR = os.environ.get('PLINKU_PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'profiles'))
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (bisect로 버킷 위치를 찾아 O(log 버킷 수))"""
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestMetrics:
+    """(method, endpoint) → 지연 시간 히스토그램 + 상태 코드별 횟수 + 요청/응답 바이트 합계"""
+    def __init__(self):
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.responses: Dict[Tuple[str, str, int], int] = {}
+        self.request_bytes: Dict[Tuple[str, str], int] = {}
+        self.response_bytes: Dict[Tuple[str, str], int] = {}
+        self.requests_seen = 0
+        self._lock = threading.Lock()
+
+    def next_request(self) -> int:
+        with self._lock:
+            self.requests_seen += 1
+            return self.requests_seen
+
+    def record(self, method: str, endpoint: str, status: int, elapsed: float,
+               request_size: int, response_size: Optional[int]):
+        key = (method, endpoint)
+        with self._lock:
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram()
+            histogram.observe(elapsed)
+            self.responses[key + (status,)] = self.responses.get(key + (status,), 0) + 1
+            self.request_bytes[key] = self.request_bytes.get(key, 0) + request_size
+            if response_size is not None:  # 스트리밍 응답은 크기를 알 수 없음
+                self.response_bytes[key] = self.response_bytes.get(key, 0) + response_size
+
+
+request_metrics = RequestMetrics()
+profiler_lock = threading.Lock()
+
+
+def prometheus_labels(**labels) -> str:
+    """{key="value",...} - 값의 역슬래시/따옴표/줄바꿈 이스케이프"""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+@app.before_request
+def start_request_timer():
+    """요청 시작 시각 기록 + (opt-in) 프로파일러 시작"""
+    g.request_started = time.perf_counter()
+    seen = request_metrics.next_request()
+    wants_profile = (PROFILE_EVERY and seen % PROFILE_EVERY == 0) or (
+        PROFILE_HEADER and request.headers.get('X-Profile') == '1')
+    if wants_profile and profiler_lock.acquire(blocking=False):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """엔드포인트별 지연 시간/크기 기록 + 프로파일 결과 저장"""
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        profiler_lock.release()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = endpoint.strip('/').replace('/', '_').replace('<', '').replace('>', '').replace(':', '-') or 'root'
+        path = os.path.join(PROFILE_DIR, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}-{request.method}-{name}.prof")
+        profiler.dump_stats(path)
+        response.headers['X-Profile-File'] = os.path.basename(path)
+    response_size = None if response.is_streamed else response.calculate_content_length()
+    request_metrics.record(request.method, endpoint, response.status_code, elapsed,
+                           request.content_length or 0, response_size)
+    return response
+
+
+@app.teardown_request
+def release_profiler(exc):
+    """예외로 after_request가 실행되지 않았을 때 프로파일러 정리"""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        profiler_lock.release()
+
+
+@app.route('/api/metrics', methods=['GET'])
+@require_internal
+def get_metrics():
+    """Prometheus 텍스트 형식 메트릭 (워커 프로세스별)"""
+    lines = []
+
+    def metric(name: str, kind: str, help_text: str):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    with request_metrics._lock:
+        latency = {key: (list(h.counts), h.sum, h.count) for key, h in request_metrics.latency.items()}
+        responses = dict(request_metrics.responses)
+        request_bytes = dict(request_metrics.request_bytes)
+        response_bytes = dict(request_metrics.response_bytes)
+
+    metric('plinku_request_duration_seconds', 'histogram', 'Request latency by endpoint')
+    for (method, endpoint), (counts, total, n) in sorted(latency.items()):
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS + ('+Inf',), counts):
+            cumulative += bucket_count
+            labels = prometheus_labels(method=method, endpoint=endpoint, le=bound)
+            lines.append(f'plinku_request_duration_seconds_bucket{labels} {cumulative}')
+        labels = prometheus_labels(method=method, endpoint=endpoint)
+        lines.append(f'plinku_request_duration_seconds_sum{labels} {total:.6f}')
+        lines.append(f'plinku_request_duration_seconds_count{labels} {n}')
+
+    metric('plinku_responses_total', 'counter', 'Responses by endpoint and status code')
+    for (method, endpoint, status), n in sorted(responses.items()):
+        lines.append(f'plinku_responses_total{prometheus_labels(method=method, endpoint=endpoint, status=status)} {n}')
+
+    metric('plinku_request_bytes_total', 'counter', 'Request body bytes by endpoint')
+    for (method, endpoint), n in sorted(request_bytes.items()):
+        lines.append(f'plinku_request_bytes_total{prometheus_labels(method=method, endpoint=endpoint)} {n}')
+
+    metric('plinku_response_bytes_total', 'counter', 'Response body bytes by endpoint (non-streaming)')
+    for (method, endpoint), n in sorted(response_bytes.items()):
+        lines.append(f'plinku_response_bytes_total{prometheus_labels(method=method, endpoint=endpoint)} {n}')
+
+    metric('plinku_collection_size', 'gauge', 'Number of records per collection')
+    for name, collection in (('users', users), ('parking_spots', parking_spots), ('ev_stations', ev_stations),
+                             ('reservations', reservations), ('posts', posts), ('comments', comments),
+                             ('favorites', favorites), ('post_likes', post_likes)):
+        lines.append(f'plinku_collection_size{prometheus_labels(collection=name)} {len(collection)}')
+
+    bus = event_bus.metrics()
+    metric('plinku_event_queue_depth', 'gauge', 'Events waiting in the event bus')
+    lines.append(f"plinku_event_queue_depth {bus['queue_depth']}")
+    metric('plinku_event_inline_runs_total', 'counter', 'Events run on the request thread because the queue was full')
+    lines.append(f"plinku_event_inline_runs_total {bus['inline_runs']}")
+    metric('plinku_event_handler_calls_total', 'counter', 'Event handler calls')
+    for name, stats in sorted(bus['handlers'].items()):
+        lines.append(f"plinku_event_handler_calls_total{prometheus_labels(handler=name)} {stats['calls']}")
+    metric('plinku_event_handler_errors_total', 'counter', 'Event handler failures')
+    for name, stats in sorted(bus['handlers'].items()):
+        lines.append(f"plinku_event_handler_errors_total{prometheus_labels(handler=name)} {stats['errors']}")
+    metric('plinku_event_handler_max_seconds', 'gauge', 'Slowest event handler call')
+    for name, stats in sorted(bus['handlers'].items()):
+        lines.append(f"plinku_event_handler_max_seconds{prometheus_labels(handler=name)} {stats['max_ms'] / 1000:.6f}")
+    metric('plinku_scheduled_tasks', 'gauge', 'Tasks waiting in the background scheduler')
+    lines.append(f'plinku_scheduled_tasks {scheduler.pending()}')
+    metric('plinku_rate_limited_total', 'counter', 'Requests rejected with 429 by route')
+    for name, n in sorted(rate_limiter.limited.items()):
+        lines.append(f'plinku_rate_limited_total{prometheus_labels(route=name)} {n}')
+    metric('plinku_rate_limit_buckets', 'gauge', 'Token buckets held by this worker')
+    lines.append(f'plinku_rate_limit_buckets {len(rate_limiter)}')
+
+    return app.response_class('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+
 # ============================================================================
 # API 엔드포인트
 # ============================================================================
 
+@app.before_request
+def sync_storage():
+    """요청 처리 전에 다른 워커가 기록한 변경 반영 (SQLite 저장소)"""
+    storage.sync()
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """헬스 체크"""
@@ -296,6 +3299,7 @@ def health_check():
 # ============================================================================
 
 @app.route('/api/signup', methods=['POST'])
+@rate_limit(5, 60, by='ip')
 @validate_required_fields('email', 'password')
 def signup():
     """
@@ -304,52 +3308,83 @@ def signup():
     """
     data = request.get_json()
     email = data['email']
-    password = data['password']
+    if not isinstance(email, str) or not isinstance(data['password'], str):
+        return jsonify({'error': 'Invalid email or password'}), 400
+    # 해시 계산은 느리므로 트랜잭션/잠금 밖에서 (안에서는 중복 체크와 등록만)
+    password_hash = hash_password(data['password'])
     
-    # Set operations: 중복 체크 (이미 등록된 이메일인지 확인)
-    existing_user = next((u for u in users.values() if u['email'] == email), None)
-    if existing_user:
-        return jsonify({'error': 'Email already registered'}), 400
-    
-    user_id = get_next_id('user')
-    users[user_id] = {
-        'id': user_id,
-        'email': email,
-        'password': password,  # 실제로는 해시화 필요
-        'name': data.get('name', email.split('@')[0])
-    }
+    with storage.transaction(), signup_lock:
+        # 이메일 인덱스로 중복 체크 (이미 등록된 이메일인지 O(1) 확인)
+        if email in users_by_email:
+            return jsonify({'error': 'Email already registered'}), 400
+        
+        user_id = get_next_id('user')
+        new_user = {
+            'id': user_id,
+            'email': email,
+            'password': password_hash,
+            'name': data.get('name', email.split('@')[0]),
+            'session_version': 0
+        }
+        users[user_id] = new_user
+        index_user(new_user)
     
+    token, expires_at = issue_token(new_user)
     return jsonify({
         'message': 'Signup successful',
-        'user': {'id': user_id, 'email': email}
+        'user': {'id': user_id, 'email': email},
+        'token': token,
+        'expires_at': expires_at
     }), 201
 
 
 @app.route('/api/login', methods=['POST'])
+@rate_limit(10, 60, by='ip')
 @validate_required_fields('email', 'password')
 def login():
     """
-    로그인
+    로그인 → 세션 토큰 발급
     Dictionary 기반 조회(O(1)) - User 빠른 조회 구조
     """
     data = request.get_json()
     email = data['email']
     password = data['password']
+    if not isinstance(email, str) or not isinstance(password, str):
+        return jsonify({'error': 'Invalid email or password'}), 400
     
-    # Dictionary 기반 조회로 사용자 찾기
-    user = next((u for u in users.values() if u['email'] == email and u['password'] == password), None)
-    if not user:
+    # 이메일 인덱스 → Dictionary 기반 조회(O(1))로 사용자 찾기
+    user = users.get(users_by_email.get(email))
+    # 없는 이메일이어도 가짜 해시와 비교해서 같은 시간이 걸리게
+    if not verify_password(password, user['password'] if user else DUMMY_PASSWORD_HASH) or not user:
         return jsonify({'error': 'Invalid email or password'}), 401
     
+    if not is_password_hash(user['password']):
+        # 이전에 평문으로 저장된 비밀번호 → 해시로 바꿔서 다시 저장 (해시 계산 중에는 트랜잭션을 잡지 않음)
+        password_hash = hash_password(password)
+        with storage.transaction():
+            user['password'] = password_hash
+            users[user['id']] = user
+    
+    token, expires_at = issue_token(user)
     return jsonify({
         'message': 'Login successful',
-        'user': {'id': user['id'], 'email': user['email'], 'name': user['name']}
+        'user': {'id': user['id'], 'email': user['email'], 'name': user['name']},
+        'token': token,
+        'expires_at': expires_at
     })
 
 
 @app.route('/api/logout', methods=['POST'])
+@transactional
+@require_auth
 def logout():
-    """로그아웃"""
+    """
+    로그아웃 - 세션 버전을 올려서 지금까지 발급된 이 사용자의 토큰을 모두 무효화
+    (토큰 캐시에 남아 있어도 verify_token이 세션 버전을 비교하므로 바로 거절됨)
+    """
+    user = users[request.user_id]
+    user['session_version'] = user.get('session_version', 0) + 1
+    users[user['id']] = user
     return jsonify({'message': 'Logout successful'})
 
 
@@ -357,6 +3392,25 @@ def logout():
 # 주차장 API
 # ============================================================================
 
+def seek_page(id_list: ParkingSpotList, field: str, per_page: int, predicate=None,
+              ranges: Optional[Dict[str, tuple]] = None, within: Optional[Set[int]] = None, extra: Dict = None):
+    """
+    ID 순 키셋 페이지네이션 응답 구성
+    cursor 쿼리 파라미터(빈 값이면 첫 페이지) → 마지막 ID 다음부터 조건에 맞는 per_page개
+    """
+    cursor = decode_cursor(request.args.get('cursor'))
+    if request.args.get('cursor') and (not cursor or not isinstance(cursor[0], int)):
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    items = id_list.seek(cursor[0] if cursor else None, per_page, predicate, ranges, within)
+    return jsonify({
+        field: items,
+        'per_page': per_page,
+        'next_cursor': encode_cursor(items[-1]['id']) if items and len(items) == per_page else None,
+        **(extra or {})
+    })
+
+
 @app.route('/api/parking-spots', methods=['GET'])
 def get_parking_spots():
     """
@@ -370,34 +3424,105 @@ def get_parking_spots():
     per_page = request.args.get('per_page', 10, type=int)
     
     # Query parameters로 필터링
-    is_ev = request.args.get('is_ev', type=bool)
     max_distance = request.args.get('max_distance', type=float)
     min_available = request.args.get('min_available', type=int)
+    min_price = request.args.get('min_price', type=int)
+    max_price = request.args.get('max_price', type=int)
     
-    # 리스트 컴프리헨션으로 필터링
-    # 리스트 컴프리헨션(list comprehension): 한 줄로 리스트 생성 → 더미데이터, id 목록, 필터링 결과 만드는 데 사용.
-    # map / filter / reduce 대체: 리스트 컴프리헨션 + generator로 깔끔하게 데이터 변환/필터링 → 조회 결과 처리, 통계 계산 등에서 응용.
-    filtered_spots = [
-        spot for spot in parking_spots.values()
-        if (is_ev is None or spot.get('is_ev') == is_ev)
-        and (max_distance is None or spot.get('distance', 0) <= max_distance)
-        and (min_available is None or spot.get('available', 0) >= min_available)
-    ]
+    # 패싯 필터: is_ev=true, price_band=0-1000,1001-2000, hours=24h, availability=few,many (쉼표 = 또는)
+    filters, error = parse_facet_filters(request.args, PARKING_FACETS)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    # 위치 기반 검색 파라미터 (격자 공간 인덱스 사용)
+    lat = request.args.get('lat', type=float)
+    lng = request.args.get('lng', type=float)
+    radius_km = request.args.get('radius_km', type=float)
+    sort_by = request.args.get('sort')
+    if lat is not None and lng is not None and not is_valid_location(lat, lng, radius_km):
+        return jsonify({'error': 'Invalid location'}), 400
+    
+    # 숫자 필드 범위 조건 (field → (최솟값, 최댓값)) - parking_spot_list 정렬 인덱스로 처리
+    ranges = {
+        'distance': (None, max_distance),
+        'available': (min_available, None),
+        'price_per_hour': (min_price, max_price),
+    }
+    
+    # 근처/범위 조건: 반경 내 ID 집합, 범위를 모두 만족하는 ID 집합을 패싯 교집합에 한 그룹씩 참여 (개수에도 반영)
+    near = lat is not None and lng is not None and radius_km is not None
+    version = parking_spot_facets.version  # 집합을 만들기 전에 읽음 (개수 캐시 키)
+    extra = [[parking_spot_grid.ids_within(lat, lng, radius_km)]] if near else []
+    if any(bounds != (None, None) for bounds in ranges.values()):
+        extra.append([set(parking_spot_list.select(ranges))])
+    # 패싯 + 근처 + 범위 조건을 작은 집합부터 교집합 → 후보 ID 집합 (조건이 없으면 None = 전체)
+    facet_ids = parking_spot_facets.query(filters, extra)
+    cache_key = (version, tuple((name, tuple(values)) for name, values in filters.items()),
+                 tuple(ranges.values()), (lat, lng, radius_km) if near else None)
+    facets = parking_spot_facets.counts(filters, extra, cache_key)
+    
+    # 익명 함수(lambda): 한 줄짜리 작은 함수 → 정렬 기준, 간단 필터 조건에 사용.
+    in_ranges = lambda spot: all(
+        (low is None or spot.get(field, 0) >= low) and (high is None or spot.get(field, 0) <= high)
+        for field, (low, high) in ranges.items()
+    )
+    
+    if lat is not None and lng is not None and (sort_by == 'nearest' or radius_km is not None):
+        start = (page - 1) * per_page
+        if sort_by == 'nearest':
+            # 격자 인덱스로 질의 지점 주변 칸만 검사 → 전체 선형 스캔 없이 k-최근접 검색
+            predicate = lambda spot_id: (facet_ids is None or spot_id in facet_ids) and in_ranges(parking_spots[spot_id])
+            nearest = parking_spot_grid.nearest(lat, lng, start + per_page, radius_km, predicate)
+            page_hits = nearest[start:]
+            # count = 전체 일치 수 (다른 경로와 같은 의미) - 근처/범위 조건은 이미 facet_ids 교집합에 들어 있음
+            if facet_ids is None:
+                count = len(parking_spot_grid)  # 조건 없음 = 좌표가 있는 모든 주차장
+            else:
+                count = sum(1 for spot_id in facet_ids if spot_id in parking_spot_grid and predicate(spot_id))
+        else:
+            # 반경 검색: 교집합 결과(반경 + 패싯 조건을 이미 만족)에 범위 조건만 확인
+            hits = [spot_id for spot_id in sorted(facet_ids) if in_ranges(parking_spots[spot_id])]
+            page_hits = [(parking_spot_grid.distance_km(spot_id, lat, lng), spot_id)
+                         for spot_id in hits[start:start + per_page]]
+            count = len(hits)
+        
+        # dict comprehension — JSON 변환 시 빠르고 간결하게 response 구성 가능.
+        return jsonify({
+            'spots': [{**parking_spots[spot_id], 'distance_km': round(dist, 3)} for dist, spot_id in page_hits],
+            'count': count,
+            'page': page,
+            'per_page': per_page,
+            'facets': facets
+        })
+    
+    # 커서 페이지네이션: cursor가 있으면 마지막 ID 다음부터 바로 이어서 조회 (page 무시)
+    if 'cursor' in request.args:
+        return seek_page(parking_spot_list, 'spots', per_page, None, ranges, facet_ids, {'facets': facets})
     
     # 슬라이싱: 페이징, 일부 구간만 보여줄 때 재활용
     # 슬라이싱(slicing): list[a:b] 잘라 쓰기 → 페이징, 일부 구간만 보여줄 때 재활용.
     # 슬라이스에 할당 / del: 슬라이싱을 이용해 중간 구간 삭제/치환 → 페이징 결과에서 특정 구간 제거, 다수 레코드 한번에 교체에 응용.
     start = (page - 1) * per_page
     end = start + per_page
-    paginated_spots = filtered_spots[start:end]
+    if facet_ids is None and all(bounds == (None, None) for bounds in ranges.values()):
+        # 필터 없음: 정렬된 ID 목록에서 해당 구간만 바로 꺼냄
+        paginated_spots = parking_spot_list[start:end]
+        count = len(parking_spot_list)
+    else:
+        # 패싯 교집합 결과와 정렬 인덱스 범위 중 작은 쪽에서 시작해 나머지 조건 확인 → 요청마다 전체 순회/정렬 X
+        # ID만 추려서 세고, 항목은 현재 페이지만 꺼냄
+        filtered_ids = parking_spot_list.select(ranges, within=facet_ids)
+        paginated_spots = [parking_spots[spot_id] for spot_id in filtered_ids[start:end]]
+        count = len(filtered_ids)
     
     # Dictionary comprehension: JSON 변환 시 빠르고 간결하게 response 구성
     # dict comprehension — JSON 변환 시 빠르고 간결하게 response 구성 가능.
     return jsonify({
         'spots': paginated_spots,
-        'count': len(filtered_spots),
+        'count': count,
         'page': page,
-        'per_page': per_page
+        'per_page': per_page,
+        'facets': facets
     })
 
 
@@ -413,52 +3538,45 @@ def get_parking_spot(spot_id):
     
     # 2차원 리스트: 주차구역 그리드, 좌석/구획 배치 같은 표 형태 데이터
     # 2차원 리스트: 리스트 안에 리스트 → 주차구역 그리드, 좌석/구획 배치 같은 표 형태 데이터.
-    slots = []  # 리스트(list): 순서 있는 가변 컬렉션 → 주차장 슬롯 목록 저장
-    total_slots = spot.get('total', 12)
-    rows = spot.get('rows', 3)
-    cols = spot.get('cols', 4)
-    # place_type과 place_id를 조합한 키로 충돌 방지
-    # Dictionary 기반 조회(O(1)) - reserved_slots 빠른 조회 구조
-    reserved_key = f"parking:{spot_id}"
-    # Set 기반 중복 제거 - 이미 예약된 슬롯인지 확인
-    reserved = reserved_slots.get(reserved_key, set())
-    
-    for i in range(total_slots):
-        row = i // cols
-        col = i % cols
-        slots.append({
-            'id': i,
-            'row': row,
-            'col': col,
-            'taken': i in reserved,
-            'free': i not in reserved
-        })
-    
-    spot_detail = spot.copy()
-    spot_detail['slots'] = slots
-    spot_detail['rows'] = rows
-    spot_detail['cols'] = cols
+    # 종료된 예약 정리 후, 요청 구간(start_time/end_time)과 겹치는 예약이 있는 슬롯을 taken으로 표시
+    # 구간을 지정하지 않으면 아직 끝나지 않은 예약이 있는 슬롯이 taken
+    # 장소 정보/예약이 바뀌지 않았으면 캐시된 JSON bytes를 그대로 반환 (ETag 일치 시 304)
+    def build_detail(reserved: int) -> Dict:
+        slots = []  # 리스트(list): 순서 있는 가변 컬렉션 → 주차장 슬롯 목록 저장
+        total_slots = spot.get('total', 12)
+        rows = spot.get('rows', 3)
+        cols = spot.get('cols', 4)
+        
+        # 점유 비트맵에서 i번 비트로 예약된 슬롯인지 확인
+        for i in range(total_slots):
+            row = i // cols
+            col = i % cols
+            taken = bool(reserved >> i & 1)
+            slots.append({
+                'id': i,
+                'row': row,
+                'col': col,
+                'taken': taken,
+                'free': not taken
+            })
+        
+        spot_detail = spot.copy()
+        spot_detail['slots'] = slots
+        spot_detail['rows'] = rows
+        spot_detail['cols'] = cols
+        return spot_detail
     
-    return jsonify(spot_detail)
+    return place_detail_response('parking', spot_id, spot, build_detail, (3, 4))
 
 
-@app.route('/api/parking-spots', methods=['POST'])
-@require_auth
-@validate_required_fields('name', 'address')
-def create_parking_spot():
-    """
-    주차장 등록
-    Dictionary 기반 조회(O(1)) - ParkingSpot 빠른 조회 구조
-    """
-    data = request.get_json()
-    spot_id = get_next_id('parking_spot')
-    
+def build_parking_spot(data: Dict, spot_id: int, owner_id: int) -> Dict:
+    """요청 데이터 → 주차장 레코드 (단건 등록/대량 등록 공용, 빠진 값은 기본값)"""
     # 행렬 정보 (rows, cols) 추가
     rows = data.get('rows', 3)
     cols = data.get('cols', 4)
     total = data.get('total', rows * cols)
     
-    new_spot = {
+    return {
         'id': spot_id,
         'name': data['name'],
         'address': data['address'],
@@ -476,14 +3594,35 @@ def create_parking_spot():
         'latitude': data.get('latitude', 0),
         'longitude': data.get('longitude', 0),
         'description': data.get('description', ''),
-        'owner_id': request.user_id
+        'owner_id': owner_id
     }
+
+
+@app.route('/api/parking-spots', methods=['POST'])
+@rate_limit(30, 60)
+@transactional
+@require_auth
+@validate_required_fields('name', 'address')
+def create_parking_spot():
+    """
+    주차장 등록
+    Dictionary 기반 조회(O(1)) - ParkingSpot 빠른 조회 구조
+    """
+    data = request.get_json()
+    # 이름/주소는 자동완성 색인에서 소문자로 바꾸고, 숫자 필드는 정렬 인덱스/응답 JSON에 들어감
+    error = invalid_text_field(data, ('name', 'address')) or invalid_number_field(data, PLACE_NUMBER_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
+    spot_id = get_next_id('parking_spot')
+    new_spot = build_parking_spot(data, spot_id, request.user_id)
     
     parking_spots[spot_id] = new_spot
+    index_parking_spot(new_spot)
     return jsonify(new_spot), 201
 
 
 @app.route('/api/parking-spots/<int:spot_id>', methods=['PUT'])
+@transactional
 @require_auth
 def update_parking_spot(spot_id):
     """
@@ -499,15 +3638,24 @@ def update_parking_spot(spot_id):
         return jsonify({'error': 'Permission denied'}), 403
     
     data = request.get_json()
+    # 이름/주소는 자동완성 색인에서 소문자로 바꾸고, 숫자 필드는 정렬 인덱스/응답 JSON에 들어감
+    error = invalid_text_field(data, ('name', 'address')) or invalid_number_field(data, PLACE_NUMBER_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
     # 가변 객체(mutable object): 딕셔너리 내부 상태 변경
     # 가변 객체(mutable object): 리스트, 딕셔너리처럼 내부 상태 변경 가능 → 함수 기본값으로 쓰면 안 되는 타입.
     # dict comprehension — JSON 변환 시 빠르고 간결하게 response 구성 가능.
     spot.update({k: v for k, v in data.items() if k != 'id'})
+    parking_spots[spot_id] = spot
+    index_parking_spot(spot)
     
+    dispatch_event('spot_updated', {'place_type': 'parking', 'place_id': spot_id, 'fields': sorted(data)},
+                   key=('parking', spot_id))
     return jsonify(spot)
 
 
 @app.route('/api/parking-spots/<int:spot_id>', methods=['DELETE'])
+@transactional
 @require_auth
 def delete_parking_spot(spot_id):
     """
@@ -523,6 +3671,7 @@ def delete_parking_spot(spot_id):
         return jsonify({'error': 'Permission denied'}), 403
     
     del parking_spots[spot_id]
+    unindex_parking_spot(spot)
     return jsonify({'message': 'Parking spot deleted'})
 
 
@@ -533,8 +3682,9 @@ def get_my_parking_spots():
     내 주차장 목록
     리스트 컴프리헨션: 필터링 결과 만드는 데 사용
     """
-    # 리스트 컴프리헨션으로 내 주차장 필터링
-    my_spots = [spot for spot in parking_spots.values() if spot.get('owner_id') == request.user_id]
+    # 소유자 인덱스로 내 주차장 ID만 꺼내서 조회 (전체 스캔 X)
+    # 리스트 컴프리헨션: 한 줄로 리스트 생성 → 필터링 결과 만드는 데 사용
+    my_spots = [parking_spots[spot_id] for spot_id in parking_spots_by_owner.ids(request.user_id)]
     return jsonify({'spots': my_spots, 'count': len(my_spots)})
 
 
@@ -572,6 +3722,8 @@ def get_favorites():
 
 
 @app.route('/api/favorites/<int:spot_id>', methods=['POST'])
+@rate_limit(60, 60)
+@transactional
 @require_auth
 def add_favorite(spot_id):
     """
@@ -593,17 +3745,18 @@ def add_favorite(spot_id):
         if spot_id not in parking_spots and spot_id not in ev_stations:
             return jsonify({'error': 'Parking spot or EV station not found'}), 404
     
-    if request.user_id not in favorites:
-        favorites[request.user_id] = set()
+    user_favorites = favorites.get(request.user_id, set())
     
     # Set operations: 중복 체크
     # 집합(set): 중복 없는 값의 모음 → 이미 예약된 차량번호, 차단된 유저 id 등 "중복 체크"에 사용.
     # set operations(교집합/합집합/차집합) — 필터 기능(예: EV+빈자리+근처거리)에 응용 가능.
-    favorites[request.user_id].add(spot_id)
+    user_favorites.add(spot_id)
+    favorites[request.user_id] = user_favorites
     return jsonify({'message': 'Favorite added'})
 
 
 @app.route('/api/favorites/<int:spot_id>', methods=['DELETE'])
+@transactional
 @require_auth
 def remove_favorite(spot_id):
     """
@@ -611,7 +3764,9 @@ def remove_favorite(spot_id):
     Set operations: 중복 제거
     """
     if request.user_id in favorites:
-        favorites[request.user_id].discard(spot_id)
+        user_favorites = favorites[request.user_id]
+        user_favorites.discard(spot_id)
+        favorites[request.user_id] = user_favorites
     return jsonify({'message': 'Favorite removed'})
 
 
@@ -631,15 +3786,18 @@ def get_ev_stations():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     
-    # 리스트 컴프리헨션으로 필터링
+    # 필터 파라미터
     max_distance = request.args.get('max_distance', type=float)
     min_available = request.args.get('min_available', type=int)
     
-    filtered_stations = [
-        station for station in ev_stations.values()
-        if (max_distance is None or station.get('distance', 0) <= max_distance)
-        and (min_available is None or station.get('available', 0) >= min_available)
-    ]
+    # 숫자 필드 범위 조건 - ev_station_list 정렬 인덱스로 처리
+    ranges = {'distance': (None, max_distance), 'available': (min_available, None)}
+    
+    # 커서 페이지네이션: cursor가 있으면 마지막 ID 다음부터 바로 이어서 조회 (page 무시)
+    if 'cursor' in request.args:
+        return seek_page(ev_station_list, 'stations', per_page, ranges=ranges)
+    
+    filtered_stations = ev_station_list.query(ranges)
     
     # 슬라이싱: 페이징, 일부 구간만 보여줄 때 재활용
     start = (page - 1) * per_page
@@ -664,32 +3822,33 @@ def get_ev_station(station_id):
     if not station:
         return jsonify({'error': 'EV station not found'}), 404
     
-    # 2차원 리스트: 충전기 그리드 배치
-    chargers = []
-    total_chargers = station.get('total', 4)
-    rows = station.get('rows', 2)
-    cols = station.get('cols', 2)
-    # place_type과 place_id를 조합한 키로 충돌 방지
-    reserved_key = f"ev:{station_id}"
-    reserved = reserved_slots.get(reserved_key, set())
-    
-    for i in range(total_chargers):
-        row = i // cols
-        col = i % cols
-        chargers.append({
-            'id': i,
-            'row': row,
-            'col': col,
-            'taken': i in reserved,
-            'free': i not in reserved
-        })
-    
-    station_detail = station.copy()
-    station_detail['chargers'] = chargers
-    station_detail['rows'] = rows
-    station_detail['cols'] = cols
+    # 2차원 리스트: 충전기 그리드 배치
+    # 종료된 예약 정리 후, 요청 구간과 겹치는 예약이 있는 충전기를 taken으로 표시 (캐시는 주차장 상세와 동일)
+    def build_detail(reserved: int) -> Dict:
+        chargers = []
+        total_chargers = station.get('total', 4)
+        rows = station.get('rows', 2)
+        cols = station.get('cols', 2)
+        
+        for i in range(total_chargers):
+            row = i // cols
+            col = i % cols
+            taken = bool(reserved >> i & 1)
+            chargers.append({
+                'id': i,
+                'row': row,
+                'col': col,
+                'taken': taken,
+                'free': not taken
+            })
+        
+        station_detail = station.copy()
+        station_detail['chargers'] = chargers
+        station_detail['rows'] = rows
+        station_detail['cols'] = cols
+        return station_detail
     
-    return jsonify(station_detail)
+    return place_detail_response('ev', station_id, station, build_detail, (2, 2))
 
 
 # ============================================================================
@@ -697,6 +3856,8 @@ def get_ev_station(station_id):
 # ============================================================================
 
 @app.route('/api/reservations', methods=['POST'])
+@rate_limit(20, 60)
+@transactional
 @require_auth
 @validate_required_fields('place_id', 'place_type', 'start_time', 'end_time', 'slot')
 def create_reservation():
@@ -708,8 +3869,13 @@ def create_reservation():
     place_id = data['place_id']
     place_type = data['place_type']  # 'parking' or 'ev'
     slot = data['slot']
-    start_time = datetime.fromisoformat(data['start_time'].replace('Z', '+00:00'))
-    end_time = datetime.fromisoformat(data['end_time'].replace('Z', '+00:00'))
+    try:
+        start_time = datetime.fromisoformat(data['start_time'].replace('Z', '+00:00'))
+        end_time = datetime.fromisoformat(data['end_time'].replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return jsonify({'error': 'Invalid start_time or end_time'}), 400
+    if end_time <= start_time:
+        return jsonify({'error': 'end_time must be after start_time'}), 400
     
     # 주차장 또는 충전소 확인 (Dictionary 기반 조회(O(1)))
     place_data = None
@@ -724,40 +3890,80 @@ def create_reservation():
     else:
         return jsonify({'error': 'Invalid place type'}), 400
     
-    # Set operations: 중복 체크 (이미 예약된 슬롯인지 확인)
-    # place_type과 place_id를 조합한 키로 충돌 방지 (주차장과 충전소가 같은 ID를 가져도 충돌 없음)
-    # 집합(set): 중복 없는 값의 모음 → 이미 예약된 차량번호, 차단된 유저 id 등 "중복 체크"에 사용.
-    # set operations(교집합/합집합/차집합) — 필터 기능(예: EV+빈자리+근처거리)에 응용 가능.
-    reserved_key = f"{place_type}:{place_id}"
-    if reserved_key not in reserved_slots:
-        reserved_slots[reserved_key] = set()
-    
-    # Set 기반 중복 체크 - 이미 예약된 슬롯인지 확인
-    if slot in reserved_slots[reserved_key]:
-        return jsonify({'error': 'Slot already reserved'}), 400
-    
-    # 예약 생성
-    reservation_id = get_next_id('reservation')
-    reservation = {
-        'id': reservation_id,
-        'user_id': request.user_id,
-        'place_id': place_id,
-        'place_type': place_type,
-        'slot': slot,
-        'start_time': start_time.isoformat(),
-        'end_time': end_time.isoformat(),
-        'created_at': datetime.now().isoformat()
-    }
-    
-    reservations[reservation_id] = reservation
-    reserved_slots[reserved_key].add(slot)
+    # 슬롯 번호는 0 ~ total-1 (점유 비트맵의 비트 위치)
+    if not isinstance(slot, int) or isinstance(slot, bool) or not 0 <= slot < place_data.get('total', 0):
+        return jsonify({'error': 'Invalid slot'}), 400
     
-    # 가용성 업데이트
-    place_data['available'] = max(0, place_data.get('available', 0) - 1)
+    # 시간 구간 예약: 같은 슬롯의 기존 예약과 [start_time, end_time)이 겹치는지 이진 탐색으로 확인
+    # place_type과 place_id를 조합한 키로 충돌 방지 (주차장과 충전소가 같은 ID를 가져도 충돌 없음)
+    # 확인 → 예약 → 가용성 갱신을 장소별 잠금 안에서 한 번에 처리 (동시 요청이 같은 슬롯을 잡지 못함)
+    start_ts = start_time.timestamp()
+    end_ts = end_time.timestamp()
+    with place_lock(place_type, place_id):
+        schedule = expire_place_bookings(place_type, place_id, place_data)
+        if slot in schedule.timelines and schedule.timelines[slot].overlaps(start_ts, end_ts):
+            return jsonify({'error': 'Slot already reserved'}), 400
+        
+        # 예약 생성
+        reservation_id = get_next_id('reservation')
+        reservation = {
+            'id': reservation_id,
+            'user_id': request.user_id,
+            'place_id': place_id,
+            'place_type': place_type,
+            'slot': slot,
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'created_at': datetime.now().isoformat()
+        }
+        
+        schedule.book(slot, start_ts, end_ts, reservation_id)
+        reservations[reservation_id] = reservation
+        reservations_by_user.update(reservation)
+        
+        # 가용성 업데이트
+        refresh_available(place_type, place_data, schedule)
+        publish_slot_changes(place_type, place_id, schedule, [slot])
     
+    schedule_reservation_tasks(reservation)
+    dispatch_event('reservation_created', dict(reservation), key=(place_type, place_id))
     return jsonify(reservation), 201
 
 
+def reservation_views(items: List[Dict]) -> List[Dict]:
+    """
+    예약 + 장소 이름/주소 (응답용 새 dict - 저장된 예약은 수정하지 않음)
+    같은 장소는 한 번만 조회 (한 사용자의 예약은 보통 몇 곳에 몰려 있음)
+    """
+    places: Dict[Tuple[str, int], Optional[Dict]] = {}
+    views = []
+    for reservation in items:
+        key = (reservation.get('place_type', 'parking'), reservation.get('place_id'))
+        if key not in places:
+            collection = get_place_collection(key[0])
+            places[key] = collection.get(key[1]) if collection is not None else None
+        place = places[key]
+        views.append({
+            **reservation,
+            'place_name': place.get('name', '알 수 없음') if place else '삭제된 장소',
+            'place_address': place.get('address', '') if place else ''
+        })
+    return views
+
+
+def parse_date_bound(value: Optional[str], end: bool = False) -> Optional[float]:
+    """
+    날짜 필터 값 → epoch 초 ('YYYY-MM-DD' 또는 ISO 시각)
+    end=True이고 날짜만 주면 그날 끝까지 포함 (다음 날 0시)
+    """
+    if not value:
+        return None
+    ts = to_timestamp(value)
+    if end and len(value) == 10:
+        ts = to_timestamp(datetime.fromisoformat(value) + timedelta(days=1))
+    return ts
+
+
 @app.route('/api/reservations/<int:reservation_id>', methods=['GET'])
 @require_auth
 def get_reservation(reservation_id):
@@ -773,54 +3979,63 @@ def get_reservation(reservation_id):
     if reservation['user_id'] != request.user_id:
         return jsonify({'error': 'Permission denied'}), 403
     
-    return jsonify(reservation)
+    return jsonify(reservation_views([reservation])[0])
 
 
 @app.route('/api/my-reservations', methods=['GET'])
 @require_auth
 def get_my_reservations():
     """
-    내 예약 목록 조회
-    리스트 컴프리헨션: 필터링 결과 만드는 데 사용
+    내 예약 목록 조회 (최신순)
+    - status=upcoming(아직 안 끝난 예약) / past(끝난 예약)
+    - from, to: 예약 시작 시각 범위 ('YYYY-MM-DD' 또는 ISO 시각, to가 날짜면 그날까지 포함)
+    - per_page + cursor: 키셋 페이지네이션 (per_page가 없으면 전체)
     """
-    # 리스트 컴프리헨션으로 내 예약 필터링
-    # 리스트 컴프리헨션(list comprehension): 한 줄로 리스트 생성 → 더미데이터, id 목록, 필터링 결과 만드는 데 사용.
-    # map / filter / reduce 대체: 리스트 컴프리헨션 + generator로 깔끔하게 데이터 변환/필터링 → 조회 결과 처리, 통계 계산 등에서 응용.
-    my_reservations = [
-        reservation for reservation in reservations.values()
-        if reservation.get('user_id') == request.user_id
-    ]
+    status = request.args.get('status')
+    if status not in (None, '', 'upcoming', 'past'):
+        return jsonify({'error': 'Invalid status'}), 400
+    try:
+        since = parse_date_bound(request.args.get('from'))
+        until = parse_date_bound(request.args.get('to'), end=True)
+    except ValueError:
+        return jsonify({'error': 'Invalid date range'}), 400
+    per_page = request.args.get('per_page', type=int)
+    cursor = decode_cursor(request.args.get('cursor'))
+    if request.args.get('cursor') and (not cursor or not all(isinstance(v, (int, float)) for v in cursor)):
+        return jsonify({'error': 'Invalid cursor'}), 400
     
-    # 예약 정보에 장소 정보 추가
-    for reservation in my_reservations:
-        place_id = reservation.get('place_id')
-        place_type = reservation.get('place_type', 'parking')
-        
-        if place_type == 'parking':
-            place_data = parking_spots.get(place_id)
-        elif place_type == 'ev':
-            place_data = ev_stations.get(place_id)
-        else:
-            place_data = None
-        
-        if place_data:
-            reservation['place_name'] = place_data.get('name', '알 수 없음')
-            reservation['place_address'] = place_data.get('address', '')
-        else:
-            reservation['place_name'] = '삭제된 장소'
-            reservation['place_address'] = ''
+    now = datetime.now().timestamp()
     
-    # 날짜순 정렬 (최신순)
-    # 익명 함수(lambda): 한 줄짜리 작은 함수 → 정렬 기준, 간단 필터 조건에 사용.
-    my_reservations.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+    def matches(reservation_id: int) -> bool:
+        # 인덱스에 저장된 (start, end) epoch 초로 비교 → ISO 문자열 파싱 없음
+        start, end = reservations_by_user.window(reservation_id) or (0.0, 0.0)
+        return ((status != 'upcoming' or end > now) and (status != 'past' or end <= now)
+                and (since is None or start >= since) and (until is None or start < until))
     
+    # 사용자별 예약 인덱스가 이미 생성 시각 순 → 정렬 없이 최신순으로 읽으면서 필터링 (전체 예약 스캔 X)
+    index = reservations_by_user.index_of(request.user_id)
+    if index is None:
+        return jsonify({'reservations': [], 'count': 0, 'next_cursor': None})
+    # 리스트 컴프리헨션(list comprehension): 한 줄로 리스트 생성 → 필터링 결과 만드는 데 사용.
+    matched = [rid for rid in index.page(0, len(index), reverse=True) if matches(rid)]
+    if cursor:
+        page_ids = [rid for rid in index.after(tuple(cursor), len(index), reverse=True) if matches(rid)]
+    else:
+        page_ids = matched
+    if per_page is not None:
+        page_ids = page_ids[:max(per_page, 0)]
+    last_key = index.key_of(page_ids[-1]) if per_page and len(page_ids) == per_page else None
+    
+    items = [reservations[rid] for rid in page_ids if rid in reservations]
     return jsonify({
-        'reservations': my_reservations,
-        'count': len(my_reservations)
+        'reservations': reservation_views(items),
+        'count': len(matched),
+        'next_cursor': encode_cursor(*last_key) if last_key else None
     })
 
 
 @app.route('/api/reservations/<int:reservation_id>', methods=['DELETE'])
+@transactional
 @require_auth
 def cancel_reservation(reservation_id):
     """
@@ -840,31 +4055,252 @@ def cancel_reservation(reservation_id):
     place_type = reservation.get('place_type', 'parking')
     slot = reservation.get('slot')
     
-    # 예약된 슬롯 해제
-    reserved_key = f"{place_type}:{place_id}"
-    if reserved_key in reserved_slots:
-        reserved_slots[reserved_key].discard(slot)
-    
-    # 가용성 업데이트
-    if place_type == 'parking':
-        place_data = parking_spots.get(place_id)
-    elif place_type == 'ev':
-        place_data = ev_stations.get(place_id)
-    else:
-        place_data = None
-    
-    if place_data:
-        place_data['available'] = min(
-            place_data.get('total', 0),
-            place_data.get('available', 0) + 1
-        )
-    
-    # 예약 삭제
-    del reservations[reservation_id]
+    # 예약 구간 해제 + 가용성 업데이트 + 예약 삭제 (장소별 잠금)
+    with place_lock(place_type, place_id):
+        # 동시에 들어온 같은 예약의 취소 요청은 하나만 처리
+        if reservation_id not in reservations:
+            return jsonify({'error': 'Reservation not found'}), 404
+        
+        schedule = get_place_schedule(place_type, place_id)
+        schedule.release(slot, to_timestamp(reservation['start_time']), reservation_id)
+        
+        place_collection = get_place_collection(place_type)
+        place_data = place_collection.get(place_id) if place_collection is not None else None
+        if place_data:
+            refresh_available(place_type, place_data, schedule)
+        publish_slot_changes(place_type, place_id, schedule, [slot])
+        
+        # 예약 삭제
+        del reservations[reservation_id]
+        reservations_by_user.remove(reservation_id)
     
+    dispatch_event('reservation_cancelled', dict(reservation), key=(place_type, place_id))
     return jsonify({'message': 'Reservation cancelled'})
 
 
+# ============================================================================
+# 실시간 슬롯 스트림 (Server-Sent Events)
+# ============================================================================
+# 
+# [구독 / 발행]
+# 상세 페이지를 반복 조회(폴링)하는 대신 장소별로 연결 하나를 열어두고 슬롯 변경분(delta)만 받음.
+# 예약/취소/만료 → publish_slot_changes → dispatch_event('slot_changed') → 등록된 핸들러가 구독자 대기열에 전달.
+# 다른 워커의 변경은 스트림이 쉬는 동안 storage.sync()로 가져오면 리스너(sync_reservation_schedule)를 거쳐 같은 경로로 들어옴.
+# 이벤트 형식
+# - snapshot: 연결 직후(또는 대기열이 넘쳤을 때) 장소별 전체 상태 (점유 비트맵 base64 + available)
+# - slot: 바뀐 슬롯 목록 [{slot, taken}] + available
+
+SSE_POLL_SEC = 1.0  # 이벤트가 없을 때 다른 워커 변경/만료 확인 주기
+SSE_HEARTBEAT_SEC = 15.0  # 연결 유지용 주석 라인 전송 주기 (끊긴 연결 감지)
+SSE_MAX_STREAM_SEC = 300.0  # 연결 최대 유지 시간 - 넘으면 닫고 클라이언트가 재연결 (워커 스레드 회수)
+SSE_MAX_PLACES = 50  # 다중 구독 시 최대 장소 수
+
+
+class Subscription:
+    """
+    스트림 연결 하나의 이벤트 대기열
+    deque + Condition: 발행 쪽은 막히지 않고 추가만, 스트림 쪽은 이벤트가 올 때까지 대기
+    느린 클라이언트 때문에 쌓이지 않도록 max_pending을 넘으면 비우고 overflowed 표시 → snapshot부터 다시 전송
+    """
+    def __init__(self, places: List[Tuple[str, int]], max_pending: int = 256):
+        self.places = places
+        self.max_pending = max_pending
+        self.overflowed = False
+        self._pending: deque = deque()
+        self._cond = threading.Condition()
+
+    def push(self, payload: Dict):
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                self._pending.clear()
+                self.overflowed = True
+            else:
+                self._pending.append(payload)
+            self._cond.notify()
+
+    def drain(self, timeout: float) -> Tuple[List[Dict], bool]:
+        """쌓인 이벤트를 모두 꺼냄 (없으면 timeout초까지 대기)"""
+        with self._cond:
+            if not self._pending and not self.overflowed:
+                self._cond.wait(timeout)
+            events = list(self._pending)
+            self._pending.clear()
+            overflowed, self.overflowed = self.overflowed, False
+        return events, overflowed
+
+
+class SlotEventBroker:
+    """장소 (place_type, place_id) → 구독 집합"""
+    def __init__(self):
+        self._subscribers: Dict[Tuple[str, int], Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, places: List[Tuple[str, int]]) -> Subscription:
+        subscription = Subscription(places)
+        with self._lock:
+            for place in places:
+                self._subscribers.setdefault(place, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for place in subscription.places:
+                subscribers = self._subscribers.get(place)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[place]
+
+    def publish(self, payload: Dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get((payload['place_type'], payload['place_id']), ()))
+        for subscription in subscribers:
+            subscription.push(payload)
+
+
+slot_events = SlotEventBroker()
+
+
+@register_handler('slot_changed')
+def broadcast_slot_change(payload: Dict):
+    """슬롯 변경 이벤트를 해당 장소 구독자에게 전달"""
+    slot_events.publish(payload)
+
+
+def format_sse(event: str, data) -> str:
+    """SSE 메시지 한 개 (event + JSON data)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def place_snapshot(place_type: str, place_id: int) -> Dict:
+    """장소 하나의 현재 슬롯 상태 (읽기 전용)"""
+    place_data = get_place_collection(place_type).get(place_id)
+    if not place_data:
+        return {'place_type': place_type, 'place_id': place_id, 'deleted': True}
+    schedule = get_place_schedule(place_type, place_id)
+    total = place_data.get('total', 0)
+    return {
+        'place_type': place_type,
+        'place_id': place_id,
+        'total': total,
+        'available': place_data.get('available'),
+        'occupancy': encode_bitmap(schedule.occupied, total),
+        'version': schedule.version
+    }
+
+
+def stream_places(places: List[Tuple[str, int]]):
+    """구독 등록 후 snapshot → slot 이벤트를 이어서 보내는 SSE 응답"""
+    subscription = slot_events.subscribe(places)
+
+    def generate():
+        try:
+            yield 'retry: 3000\n\n'
+            yield format_sse('snapshot', [place_snapshot(*place) for place in places])
+            started = last_sent = time.monotonic()
+            while time.monotonic() - started < SSE_MAX_STREAM_SEC:
+                events, overflowed = subscription.drain(SSE_POLL_SEC)
+                if overflowed:
+                    events = []
+                    yield format_sse('snapshot', [place_snapshot(*place) for place in places])
+                for payload in events:
+                    yield format_sse('slot', payload)
+                if events or overflowed:
+                    last_sent = time.monotonic()
+                    continue
+                # 쉬는 동안 다른 워커 변경 반영 (바뀐 슬롯은 이벤트로 다시 들어옴, 예약 시작/종료는 스케줄러가 발행)
+                storage.sync()
+                if time.monotonic() - last_sent >= SSE_HEARTBEAT_SEC:
+                    last_sent = time.monotonic()
+                    yield ': keep-alive\n\n'
+        finally:
+            slot_events.unsubscribe(subscription)
+
+    return app.response_class(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # 리버스 프록시 버퍼링 끄기
+    })
+
+
+@app.route('/api/stream/places/<place_type>/<int:place_id>', methods=['GET'])
+def stream_place(place_type, place_id):
+    """장소 하나의 슬롯 변경 스트림"""
+    place_collection = get_place_collection(place_type)
+    if place_collection is None:
+        return jsonify({'error': 'Invalid place type'}), 400
+    if place_id not in place_collection:
+        return jsonify({'error': 'Place not found'}), 404
+    return stream_places([(place_type, place_id)])
+
+
+@app.route('/api/stream/places', methods=['GET'])
+def stream_multiple_places():
+    """
+    여러 장소의 슬롯 변경 스트림
+    places=parking:1,ev:3 (place_type:place_id를 쉼표로 구분)
+    """
+    places = []
+    for token in request.args.get('places', '').split(','):
+        place_type, _, place_id = token.strip().partition(':')
+        if get_place_collection(place_type) is None or not place_id.isdigit():
+            return jsonify({'error': f'Invalid place: {token}'}), 400
+        if (place_type, int(place_id)) not in places:
+            places.append((place_type, int(place_id)))
+    if len(places) > SSE_MAX_PLACES:
+        return jsonify({'error': f'Too many places (max {SSE_MAX_PLACES})'}), 400
+    return stream_places(places)
+
+
+# ============================================================================
+# 이벤트 핸들러 / 통계
+# ============================================================================
+# 
+# 예약/취소/좋아요/장소 수정 이벤트는 dispatch_event로 발행되고, 아래 핸들러는 이벤트 버스 작업 스레드에서 실행됨.
+# 통계처럼 응답에 바로 필요 없는 작업을 여기로 모아서 요청 지연 시간에 더하지 않음.
+
+activity_stats: Dict[str, int] = {}  # 이벤트 종류별 누적 횟수 (워커 프로세스별)
+activity_stats_lock = threading.Lock()
+
+
+def count_activity(name: str):
+    with activity_stats_lock:
+        activity_stats[name] = activity_stats.get(name, 0) + 1
+
+
+@register_handler('reservation_created')
+def count_reservation_created(reservation: Dict):
+    count_activity(f"reservation_created:{reservation.get('place_type')}")
+
+
+@register_handler('reservation_cancelled')
+def count_reservation_cancelled(reservation: Dict):
+    count_activity(f"reservation_cancelled:{reservation.get('place_type')}")
+
+
+@register_handler('post_liked')
+def count_post_liked(payload: Dict):
+    count_activity('post_liked' if payload['liked'] else 'post_unliked')
+
+
+@register_handler('spot_updated')
+def count_spot_updated(payload: Dict):
+    count_activity(f"spot_updated:{payload['place_type']}")
+
+
+@register_handler('reservation_reminder')
+def count_reservation_reminder(reservation: Dict):
+    count_activity(f"reservation_reminder:{reservation.get('place_type')}")
+
+
+@app.route('/api/events/stats', methods=['GET'])
+@require_internal
+def get_event_stats():
+    """이벤트 버스 상태 (대기열 깊이, 핸들러별 실행 횟수/시간) + 이벤트 종류별 누적 횟수"""
+    with activity_stats_lock:
+        activity = dict(activity_stats)
+    return jsonify({**event_bus.metrics(), 'activity': activity, 'scheduled_tasks': scheduler.pending()})
+
+
 # ============================================================================
 # 커뮤니티 API
 # ============================================================================
@@ -881,43 +4317,82 @@ def get_posts():
     per_page = request.args.get('per_page', 10, type=int)
     sort_by = request.args.get('sort', 'date')  # 'date' or 'likes'
     
-    # 리스트 컴프리헨션으로 게시글 목록 생성
-    # 리스트(list): 순서 있는 가변 컬렉션 → 게시글 목록 저장
-    post_list = list(posts.values())
-    
-    # 좋아요 수 업데이트 (Set operations: 중복 제거)
-    # 집합(set): 중복 없는 값의 모음 → 이미 좋아요한 사용자 id 등 "중복 체크"에 사용.
-    for post in post_list:
-        likes_set = post_likes.get(post['id'], set())
-        post['likes'] = len(likes_set)
-    
-    # 정렬: 좋아요 순 또는 날짜 순
-    # 익명 함수(lambda): 한 줄짜리 작은 함수 → 정렬 기준, 간단 필터 조건에 사용.
-    if sort_by == 'likes':
-        post_list.sort(key=lambda x: (x.get('likes', 0), x.get('created_at', datetime.min)), reverse=True)
+    # 정렬 인덱스에서 해당 페이지 ID만 꺼냄 (좋아요 수는 toggle_like에서 증분 갱신)
+    # 익명 함수(lambda) 대신 미리 정렬된 인덱스 사용 → 요청마다 전체 정렬 X
+    sort_by = 'likes' if sort_by == 'likes' else 'date'
+    ranking = posts_by_likes if sort_by == 'likes' else posts_by_date
+    cursor = decode_cursor(request.args.get('cursor'))
+    if request.args.get('cursor') and (not cursor or cursor[0] != sort_by
+                                       or not all(isinstance(v, (int, float)) for v in cursor[1:])):
+        return jsonify({'error': 'Invalid cursor'}), 400
+    if cursor:
+        # 커서 페이지네이션: 마지막 게시글의 (정렬 키, id) 바로 다음부터 이어서 조회
+        page_ids = ranking.after(tuple(cursor[1:]), per_page, reverse=True)
     else:
-        post_list.sort(key=lambda x: x.get('created_at', datetime.min), reverse=True)
+        start = (page - 1) * per_page
+        page_ids = ranking.page(start, per_page, reverse=True)
+    last_key = ranking.key_of(page_ids[-1]) if page_ids and len(page_ids) == per_page else None
+    next_cursor = encode_cursor(sort_by, *last_key) if last_key else None
     
-    # 현재 사용자 좋아요 상태 추가
-    user_id = request.headers.get('X-User-Id', type=int)
+    # 현재 사용자 좋아요 상태 추가 (응답에만 추가, 저장된 게시글은 수정하지 않음)
+    user_id = current_user_id()
     if user_id:
-        for post in post_list:
-            likes_set = post_likes.get(post['id'], set())
-            post['is_liked'] = user_id in likes_set
-    
-    # 슬라이싱: 페이징, 일부 구간만 보여줄 때 재활용
-    start = (page - 1) * per_page
-    end = start + per_page
-    paginated_posts = post_list[start:end]
+        paginated_posts = [
+            {**posts[pid], 'is_liked': user_id in post_likes.get(pid, ())} for pid in page_ids
+        ]
+    else:
+        paginated_posts = [posts[pid] for pid in page_ids]
     
     return jsonify({
         'posts': paginated_posts,
-        'count': len(post_list),
+        'count': len(ranking),
         'page': page,
-        'per_page': per_page
+        'per_page': per_page,
+        'next_cursor': next_cursor
     })
 
 
+class PostViewCounter:
+    """
+    조회수 증가분을 워커에서 모았다가 flush_sec마다 한 트랜잭션으로 반영 (종료 시에도)
+    조회(GET)마다 저장소에 쓰지 않음 → SQLite에서 읽기 요청이 행/변경 로그를 만들지 않고,
+    게시글 전체를 다시 저장하지 않으므로 다른 워커의 좋아요/수정을 이전 값으로 덮어쓰지 않음
+    """
+    def __init__(self, flush_sec: float = 5.0):
+        self.flush_sec = flush_sec
+        self._pending: Dict[int, int] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, post_id: int) -> int:
+        """조회 1회 기록 → 이 게시글의 아직 반영 안 된 증가분"""
+        with self._lock:
+            pending = self._pending[post_id] = self._pending.get(post_id, 0) + 1
+            return pending
+
+    def due(self) -> bool:
+        return bool(self._pending) and time.monotonic() - self._last_flush >= self.flush_sec
+
+    def flush(self):
+        """모은 증가분을 저장소에 반영 (트랜잭션 안에서 최신 게시글에 더함)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        with storage.transaction():
+            for post_id, views in pending.items():
+                post = posts.get(post_id)
+                if post is None:
+                    continue
+                post['views'] = post.get('views', 0) + views
+                posts[post_id] = post
+
+
+post_view_counter = PostViewCounter()
+atexit.register(post_view_counter.flush)
+
+
 @app.route('/api/posts/<int:post_id>', methods=['GET'])
 def get_post(post_id):
     """
@@ -928,30 +4403,71 @@ def get_post(post_id):
     if not post:
         return jsonify({'error': 'Post not found'}), 404
     
-    # 조회수 증가
-    post['views'] = post.get('views', 0) + 1
+    # 조회수 증가 - 증가분만 모아 두고 주기적으로 반영 (읽기 요청마다 저장 X)
+    pending_views = post_view_counter.add(post_id)
+    if post_view_counter.due():
+        post_view_counter.flush()
+        pending_views = 0
+        post = posts.get(post_id, post)
     
-    # 좋아요 수 업데이트 (Set operations: 중복 제거)
+    # 좋아요 수는 좋아요/취소할 때 증분 갱신된 저장 값 그대로
     likes_set = post_likes.get(post_id, set())
-    post['likes'] = len(likes_set)
-    
-    # 현재 사용자가 좋아요 했는지 확인
-    user_id = request.headers.get('X-User-Id', type=int)
-    post['is_liked'] = user_id in likes_set if user_id else False
+    post_detail = post.copy()
+    post_detail['views'] = post.get('views', 0) + pending_views
     
-    # 댓글 목록 가져오기 (리스트 컴프리헨션)
-    # 리스트 컴프리헨션(list comprehension): 한 줄로 리스트 생성 → 더미데이터, id 목록, 필터링 결과 만드는 데 사용.
-    post_comments = [c for c in comments.values() if c.get('post_id') == post_id]
-    # 익명 함수(lambda): 한 줄짜리 작은 함수 → 정렬 기준, 간단 필터 조건에 사용.
-    post_comments.sort(key=lambda x: x.get('created_at', datetime.min))
+    # 현재 사용자가 좋아요 했는지 확인 (요청마다 다르므로 저장된 게시글이 아닌 응답에만 추가)
+    user_id = current_user_id()
+    post_detail['is_liked'] = user_id in likes_set if user_id else False
     
-    post_detail = post.copy()
+    # 댓글 첫 페이지만 포함 (나머지는 GET /api/posts/<id>/comments?cursor=...)
+    # 게시글별 댓글 인덱스가 이미 작성 순이라 전체 댓글 스캔/정렬 불필요
+    limit = request.args.get('comments_limit', 50, type=int)
+    post_comments, next_cursor = paginate_comments(post_id, None, limit)
     post_detail['comments'] = post_comments
+    post_detail['comment_count'] = len(post_comment_ids.get(post_id, ()))
+    post_detail['comments_next_cursor'] = next_cursor
     
     return jsonify(post_detail)
 
 
+def paginate_comments(post_id: int, after_id: Optional[int], limit: int) -> Tuple[List[Dict], Optional[str]]:
+    """
+    게시글 댓글 커서 페이지네이션 - after_id 다음 댓글부터 limit개
+    작성 순 ID 목록에서 이진 탐색으로 시작 위치를 찾음 → O(log n + limit)
+    """
+    ids = post_comment_ids.get(post_id, [])
+    start = bisect_right(ids, after_id) if after_id is not None else 0
+    # 슬라이싱(slicing): list[a:b] 잘라 쓰기 → 페이징, 일부 구간만 보여줄 때 재활용.
+    page_ids = ids[start:start + max(limit, 0)]
+    next_cursor = encode_cursor(page_ids[-1]) if page_ids and start + len(page_ids) < len(ids) else None
+    return [comments[cid] for cid in page_ids], next_cursor
+
+
+@app.route('/api/posts/<int:post_id>/comments', methods=['GET'])
+def get_post_comments(post_id):
+    """
+    댓글 목록 (커서 페이지네이션)
+    cursor: 이전 응답의 next_cursor, limit: 페이지 크기
+    """
+    if post_id not in posts:
+        return jsonify({'error': 'Post not found'}), 404
+    
+    limit = request.args.get('limit', 20, type=int)
+    cursor = decode_cursor(request.args.get('cursor'))
+    if request.args.get('cursor') and (not cursor or not isinstance(cursor[0], int)):
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    page, next_cursor = paginate_comments(post_id, cursor[0] if cursor else None, limit)
+    return jsonify({
+        'comments': page,
+        'count': len(page),
+        'next_cursor': next_cursor
+    })
+
+
 @app.route('/api/posts', methods=['POST'])
+@rate_limit(10, 60)
+@transactional
 @require_auth
 @validate_required_fields('title', 'content')
 def create_post():
@@ -960,6 +4476,9 @@ def create_post():
     Dictionary 기반 조회(O(1)) - Post 빠른 조회 구조
     """
     data = request.get_json()
+    error = invalid_text_field(data, ('title', 'content'))
+    if error:
+        return jsonify({'error': error}), 400
     user = users.get(request.user_id)
     
     post_id = get_next_id('post')
@@ -978,11 +4497,13 @@ def create_post():
     }
     
     posts[post_id] = new_post
+    index_post(new_post)
     post_likes[post_id] = set()  # 좋아요 Set 초기화
     return jsonify(new_post), 201
 
 
 @app.route('/api/posts/<int:post_id>', methods=['PUT'])
+@transactional
 @require_auth
 def update_post(post_id):
     """
@@ -998,15 +4519,21 @@ def update_post(post_id):
         return jsonify({'error': 'Permission denied'}), 403
     
     data = request.get_json()
+    error = invalid_text_field(data, ('title', 'content'))
+    if error:
+        return jsonify({'error': error}), 400
     # 가변 객체(mutable object): 딕셔너리 내부 상태 변경
     # 가변 객체(mutable object): 리스트, 딕셔너리처럼 내부 상태 변경 가능 → 함수 기본값으로 쓰면 안 되는 타입.
     # dict comprehension — JSON 변환 시 빠르고 간결하게 response 구성 가능.
     post.update({k: v for k, v in data.items() if k not in ['id', 'author_id', 'created_at']})
+    posts[post_id] = post
+    index_post(post)
     
     return jsonify(post)
 
 
 @app.route('/api/posts/<int:post_id>', methods=['DELETE'])
+@transactional
 @require_auth
 def delete_post(post_id):
     """
@@ -1022,13 +4549,13 @@ def delete_post(post_id):
         return jsonify({'error': 'Permission denied'}), 403
     
     del posts[post_id]
+    unindex_post(post)
     
-    # 관련 댓글도 삭제 (리스트 컴프리헨션)
-    # 리스트 컴프리헨션(list comprehension): 한 줄로 리스트 생성 → 더미데이터, id 목록, 필터링 결과 만드는 데 사용.
-    comment_ids_to_delete = [cid for cid, comment in comments.items() if comment.get('post_id') == post_id]
-    # 슬라이스에 할당 / del: 슬라이싱을 이용해 중간 구간 삭제/치환 → 페이징 결과에서 특정 구간 제거, 다수 레코드 한번에 교체에 응용.
+    # 관련 댓글도 삭제 - 게시글별 댓글 인덱스로 해당 댓글만 찾음 (전체 댓글 스캔 X)
+    comment_ids_to_delete = post_comment_ids.pop(post_id, [])
     for cid in comment_ids_to_delete:
-        del comments[cid]
+        if cid in comments:
+            del comments[cid]
     
     return jsonify({'message': 'Post deleted'})
 
@@ -1040,12 +4567,14 @@ def get_my_posts():
     내 게시글 목록
     리스트 컴프리헨션: 필터링 결과 만드는 데 사용
     """
-    # 리스트 컴프리헨션으로 내 게시글 필터링
-    my_posts = [post for post in posts.values() if post.get('author_id') == request.user_id]
+    # 작성자 인덱스로 내 게시글 ID만 꺼내서 조회 (전체 스캔 X)
+    my_posts = [posts[post_id] for post_id in posts_by_author.ids(request.user_id)]
     return jsonify({'posts': my_posts, 'count': len(my_posts)})
 
 
 @app.route('/api/posts/<int:post_id>/comments', methods=['POST'])
+@rate_limit(30, 60)
+@transactional
 @require_auth
 @validate_required_fields('content')
 def create_comment(post_id):
@@ -1073,10 +4602,13 @@ def create_comment(post_id):
     }
     
     comments[comment_id] = new_comment
+    index_comment(new_comment)
     return jsonify(new_comment), 201
 
 
 @app.route('/api/posts/<int:post_id>/like', methods=['POST'])
+@rate_limit(60, 60)
+@transactional
 @require_auth
 def toggle_like(post_id):
     """
@@ -1089,29 +4621,66 @@ def toggle_like(post_id):
     # Set operations: 중복 체크
     # 집합(set): 중복 없는 값의 모음 → 이미 좋아요한 사용자 id 등 "중복 체크"에 사용.
     # set operations(교집합/합집합/차집합) — 필터 기능(예: EV+빈자리+근처거리)에 응용 가능.
-    if post_id not in post_likes:
-        post_likes[post_id] = set()
-    
-    likes_set = post_likes[post_id]
-    # Set 기반 중복 체크 - 이미 좋아요한 사용자인지 확인
-    if request.user_id in likes_set:
-        # 좋아요 취소
-        likes_set.discard(request.user_id)
-        is_liked = False
-    else:
-        # 좋아요 추가
-        likes_set.add(request.user_id)
-        is_liked = True
-    
-    # 좋아요 수 업데이트
-    posts[post_id]['likes'] = len(likes_set)
+    with post_likes_lock:
+        likes_set = post_likes.get(post_id, set())
+        # Set 기반 중복 체크 - 이미 좋아요한 사용자인지 확인
+        if request.user_id in likes_set:
+            # 좋아요 취소
+            likes_set.discard(request.user_id)
+            is_liked = False
+        else:
+            # 좋아요 추가
+            likes_set.add(request.user_id)
+            is_liked = True
+        
+        post_likes[post_id] = likes_set
+        
+        # 좋아요 수 증분 갱신 + 좋아요순 인덱스에서 이 게시글 위치만 이동
+        post = posts[post_id]
+        post['likes'] = len(likes_set)
+        posts[post_id] = post
+        index_post(post)
     
+    dispatch_event('post_liked', {'post_id': post_id, 'user_id': request.user_id,
+                                  'liked': is_liked, 'likes': len(likes_set)}, key=post_id)
     return jsonify({
         'is_liked': is_liked,
         'likes': len(likes_set)
     })
 
 
+@app.route('/api/posts/search', methods=['GET'])
+def search_posts():
+    """
+    게시글 검색 (제목 + 내용)
+    q: 검색어, page/per_page: 페이지 - 역색인 교집합 + BM25 순위 (전체 게시글 스캔 X)
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing query parameter: q'}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), 100)
+    
+    ranked, total = post_search_index.search(query, page * per_page)
+    user_id = current_user_id()
+    results = []
+    for score, pid in ranked[(page - 1) * per_page:]:
+        post = posts.get(pid)
+        if post is None:
+            continue
+        result = {**post, 'score': round(score, 4)}
+        if user_id:
+            result['is_liked'] = user_id in post_likes.get(pid, ())
+        results.append(result)
+    
+    return jsonify({
+        'posts': results,
+        'count': total,
+        'page': page,
+        'per_page': per_page
+    })
+
+
 @app.route('/api/posts/popular', methods=['GET'])
 def get_popular_posts():
     """
@@ -1120,19 +4689,8 @@ def get_popular_posts():
     """
     limit = request.args.get('limit', 5, type=int)
     
-    # 리스트 컴프리헨션으로 게시글 목록 생성
-    post_list = list(posts.values())
-    
-    # 좋아요 수 업데이트 (Set operations: 중복 제거)
-    for post in post_list:
-        likes_set = post_likes.get(post['id'], set())
-        post['likes'] = len(likes_set)
-    
-    # 좋아요 순으로 정렬
-    post_list.sort(key=lambda x: (x.get('likes', 0), x.get('created_at', datetime.min)), reverse=True)
-    
-    # 상위 N개만 반환
-    popular_posts = post_list[:limit]
+    # 좋아요순 인덱스의 상위 N개만 반환 (전체 정렬 X)
+    popular_posts = [posts[pid] for pid in posts_by_likes.page(0, limit, reverse=True)]
     
     return jsonify({
         'posts': popular_posts,
@@ -1144,23 +4702,14 @@ def get_popular_posts():
 # 충전소 등록 API
 # ============================================================================
 
-@app.route('/api/ev-stations', methods=['POST'])
-@require_auth
-@validate_required_fields('name', 'address')
-def create_ev_station():
-    """
-    충전소 등록
-    Dictionary 기반 조회(O(1)) - EVStation 빠른 조회 구조
-    """
-    data = request.get_json()
-    station_id = get_next_id('ev_station')
-    
+def build_ev_station(data: Dict, station_id: int, owner_id: int) -> Dict:
+    """요청 데이터 → 충전소 레코드 (단건 등록/대량 등록 공용, 빠진 값은 기본값)"""
     # 행렬 정보 (rows, cols) 추가
     rows = data.get('rows', 2)
     cols = data.get('cols', 2)
     total = data.get('total', rows * cols)
     
-    new_station = {
+    return {
         'id': station_id,
         'name': data['name'],
         'address': data['address'],
@@ -1177,10 +4726,30 @@ def create_ev_station():
         'latitude': data.get('latitude', 0),
         'longitude': data.get('longitude', 0),
         'description': data.get('description', ''),
-        'owner_id': request.user_id
+        'owner_id': owner_id
     }
+
+
+@app.route('/api/ev-stations', methods=['POST'])
+@rate_limit(30, 60)
+@transactional
+@require_auth
+@validate_required_fields('name', 'address')
+def create_ev_station():
+    """
+    충전소 등록
+    Dictionary 기반 조회(O(1)) - EVStation 빠른 조회 구조
+    """
+    data = request.get_json()
+    # 이름/주소는 자동완성 색인에서 소문자로 바꾸고, 숫자 필드는 정렬 인덱스/응답 JSON에 들어감
+    error = invalid_text_field(data, ('name', 'address')) or invalid_number_field(data, PLACE_NUMBER_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
+    station_id = get_next_id('ev_station')
+    new_station = build_ev_station(data, station_id, request.user_id)
     
     ev_stations[station_id] = new_station
+    index_ev_station(new_station)
     return jsonify(new_station), 201
 
 
@@ -1191,12 +4760,13 @@ def get_my_ev_stations():
     내 충전소 목록
     리스트 컴프리헨션: 필터링 결과 만드는 데 사용
     """
-    # 리스트 컴프리헨션으로 내 충전소 필터링
-    my_stations = [station for station in ev_stations.values() if station.get('owner_id') == request.user_id]
+    # 소유자 인덱스로 내 충전소 ID만 꺼내서 조회 (전체 스캔 X)
+    my_stations = [ev_stations[station_id] for station_id in ev_stations_by_owner.ids(request.user_id)]
     return jsonify({'stations': my_stations, 'count': len(my_stations)})
 
 
 @app.route('/api/ev-stations/<int:station_id>', methods=['PUT'])
+@transactional
 @require_auth
 def update_ev_station(station_id):
     """
@@ -1212,15 +4782,24 @@ def update_ev_station(station_id):
         return jsonify({'error': 'Permission denied'}), 403
     
     data = request.get_json()
+    # 이름/주소는 자동완성 색인에서 소문자로 바꾸고, 숫자 필드는 정렬 인덱스/응답 JSON에 들어감
+    error = invalid_text_field(data, ('name', 'address')) or invalid_number_field(data, PLACE_NUMBER_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
     # 가변 객체(mutable object): 딕셔너리 내부 상태 변경
     # 가변 객체(mutable object): 리스트, 딕셔너리처럼 내부 상태 변경 가능 → 함수 기본값으로 쓰면 안 되는 타입.
     # dict comprehension — JSON 변환 시 빠르고 간결하게 response 구성 가능.
     station.update({k: v for k, v in data.items() if k != 'id'})
+    ev_stations[station_id] = station
+    index_ev_station(station)
     
+    dispatch_event('spot_updated', {'place_type': 'ev', 'place_id': station_id, 'fields': sorted(data)},
+                   key=('ev', station_id))
     return jsonify(station)
 
 
 @app.route('/api/ev-stations/<int:station_id>', methods=['DELETE'])
+@transactional
 @require_auth
 def delete_ev_station(station_id):
     """
@@ -1236,9 +4815,253 @@ def delete_ev_station(station_id):
         return jsonify({'error': 'Permission denied'}), 403
     
     del ev_stations[station_id]
+    unindex_ev_station(station)
     return jsonify({'message': 'EV station deleted'})
 
 
+# ============================================================================
+# 장소 자동완성 API
+# ============================================================================
+
+@app.route('/api/places/autocomplete', methods=['GET'])
+def autocomplete_places():
+    """
+    주차장/충전소 이름·주소 자동완성 (키 입력마다 호출)
+    q: 입력 중인 검색어, type: parking / ev (생략하면 둘 다), limit: 최대 개수, lat/lng: 가까운 장소 우선
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'places': [], 'count': 0})
+    place_type = request.args.get('type')
+    if place_type is not None and place_type not in ('parking', 'ev'):
+        return jsonify({'error': 'Invalid type'}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    lat = request.args.get('lat', type=float)
+    lng = request.args.get('lng', type=float)
+    if lat is not None and lng is not None and not is_valid_location(lat, lng):
+        return jsonify({'error': 'Invalid location'}), 400
+    
+    places = []
+    for score, entry_type, place_id, distance in place_prefix_index.search(query, limit, place_type, lat, lng):
+        place = get_place_collection(entry_type).get(place_id)
+        if place is None:  # 검색 직후 삭제됨
+            continue
+        item = {
+            'type': entry_type,
+            'id': place_id,
+            'name': place.get('name'),
+            'address': place.get('address'),
+            'latitude': place.get('latitude'),
+            'longitude': place.get('longitude'),
+            'available': place.get('available'),
+            'total': place.get('total'),
+        }
+        if distance is not None:
+            item['distance_km'] = round(distance, 3)
+        places.append(item)
+    
+    return jsonify({'places': places, 'count': len(places)})
+
+
+# ============================================================================
+# 대량 등록 / 내보내기 API (NDJSON, CSV)
+# ============================================================================
+# 
+# [스트리밍 + 배치 처리]
+# 요청 본문을 한 줄(한 행)씩 읽어서 BULK_BATCH_SIZE개가 모일 때마다 저장 → 본문 전체를 메모리에 올리지 않음.
+# 배치 하나 = 저장소 트랜잭션 하나 (SQLite 커밋 횟수 = 배치 수), 정렬 인덱스 병합도 배치마다 한 번.
+# 잘못된 행은 건너뛰고 줄 번호와 이유를 errors에 모아서 응답 (나머지 행은 그대로 등록).
+# 내보내기는 ID 순 키셋 페이지(seek)를 EXPORT_CHUNK개씩 꺼내 NDJSON 줄로 바로 흘려보냄.
+
+BULK_BATCH_SIZE = 500  # 트랜잭션/인덱스 갱신 한 번에 묶는 행 수
+BULK_MAX_ERRORS = 100  # 응답에 담는 행 오류 최대 개수 (failed에는 전체 개수)
+EXPORT_CHUNK = 500  # 내보내기 시 한 번에 꺼내는 항목 수
+
+# CSV는 모든 값이 문자열 → 필드별로 숫자/불리언 변환
+BULK_INT_FIELDS = ('rows', 'cols', 'total', 'available', 'price_per_hour', 'price_per_kwh')
+BULK_FLOAT_FIELDS = ('distance', 'latitude', 'longitude')
+PLACE_NUMBER_FIELDS = BULK_INT_FIELDS + BULK_FLOAT_FIELDS  # 단건 등록/수정에서도 유한한 숫자인지 확인
+BULK_BOOL_FIELDS = ('is_ev',)
+BULK_TEXT_FIELDS = ('name', 'address', 'operating_hours', 'image', 'description')
+
+
+def read_bulk_rows():
+    """
+    요청 본문 → (줄 번호, dict 또는 오류 문자열) 제너레이터
+    Content-Type(또는 ?format=)이 text/csv면 CSV(첫 줄 헤더), 그 외에는 NDJSON(한 줄에 JSON 객체 하나)
+    """
+    fmt = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+    stream = body_lines()
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, parse_csv_row(row)
+        return
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_no, 'Invalid JSON'
+            continue
+        yield line_no, row if isinstance(row, dict) else 'Row must be a JSON object'
+
+
+def body_lines():
+    """
+    요청 본문을 한 줄씩 읽어서 UTF-8 문자열로 (본문 전체를 한 번에 읽지 않음)
+    WSGI 서버마다 입력 스트림 타입이 달라서(io 객체가 아닐 수 있음) readline()만 사용
+    """
+    stream = request.stream
+    encoding = 'utf-8-sig'  # 첫 줄의 BOM 제거
+    while True:
+        line = stream.readline()
+        if not line:
+            return
+        yield line.decode(encoding)
+        encoding = 'utf-8'
+
+
+def parse_csv_row(row: Dict[str, str]):
+    """CSV 한 행(전부 문자열) → 타입이 맞춰진 dict (빈 칸은 생략 → 기본값 사용), 변환 실패 시 오류 문자열"""
+    data = {}
+    for field, value in row.items():
+        if field is None or value is None or value == '':
+            continue
+        try:
+            if field in BULK_INT_FIELDS:
+                data[field] = int(value)
+            elif field in BULK_FLOAT_FIELDS:
+                data[field] = float(value)
+            elif field in BULK_BOOL_FIELDS:
+                data[field] = value.strip().lower() in ('1', 'true', 'yes', 'y')
+            else:
+                data[field] = value
+        except ValueError:
+            return f'Invalid {field}'
+    return data
+
+
+def validate_place_row(data: Dict) -> Optional[str]:
+    """대량 등록 행 검증 (+ 정수 필드를 int로 맞춤) - 문제가 있으면 오류 메시지, 없으면 None"""
+    missing = [field for field in ('name', 'address') if not data.get(field)]
+    if missing:
+        return f'Missing required fields: {", ".join(missing)}'
+    error = invalid_text_field(data, BULK_TEXT_FIELDS)
+    if error:
+        return error
+    for field in BULK_INT_FIELDS + BULK_FLOAT_FIELDS:
+        value = data.get(field)
+        if value is None:
+            continue
+        if not is_finite_number(value):
+            return f'Invalid {field}'
+        if field in BULK_INT_FIELDS:
+            if not float(value).is_integer() or value < 0:
+                return f'Invalid {field}'
+            data[field] = int(value)
+    for field in ('rows', 'cols', 'total'):
+        if field in data and data[field] < 1:
+            return f'Invalid {field}'
+    if not -90 <= data.get('latitude', 0) <= 90 or not -180 <= data.get('longitude', 0) <= 180:
+        return 'Invalid coordinates'
+    return None
+
+
+def bulk_import(place_type: str, build, index_many):
+    """
+    대량 등록 공통 처리: 행 검증 → BULK_BATCH_SIZE개씩 저장 + 인덱스 일괄 갱신
+    build(data, id, owner_id) → 레코드, index_many(records) → 인덱스 갱신
+    """
+    collection = get_place_collection(place_type)
+    id_type = 'parking_spot' if place_type == 'parking' else 'ev_station'
+    created_ids: List[int] = []
+    errors: List[Dict] = []
+    failed = 0
+    batch: List[Dict] = []
+
+    def flush():
+        with storage.transaction():
+            records = []
+            for data in batch:
+                record = build(data, get_next_id(id_type), request.user_id)
+                collection[record['id']] = record
+                records.append(record)
+            index_many(records)
+        created_ids.extend(record['id'] for record in records)
+        batch.clear()
+
+    try:
+        for line_no, data in read_bulk_rows():
+            error = data if isinstance(data, str) else validate_place_row(data)
+            if error is not None:
+                failed += 1
+                if len(errors) < BULK_MAX_ERRORS:
+                    errors.append({'line': line_no, 'error': error})
+                continue
+            data.pop('id', None)
+            batch.append(data)
+            if len(batch) >= BULK_BATCH_SIZE:
+                flush()
+    except (UnicodeDecodeError, csv.Error):
+        failed += 1
+        errors.append({'line': None, 'error': 'Unreadable body (expected UTF-8 NDJSON or CSV)'})
+    if batch:
+        flush()
+
+    return jsonify({
+        'created': len(created_ids),
+        'failed': failed,
+        'ids': created_ids,
+        'errors': errors
+    }), 201 if created_ids else 400
+
+
+def export_places(id_list: ParkingSpotList, filename: str):
+    """ID 순으로 EXPORT_CHUNK개씩 꺼내서 NDJSON으로 스트리밍 (전체 목록을 한 번에 만들지 않음)"""
+    def generate():
+        after_id = None
+        while True:
+            chunk = id_list.seek(after_id, EXPORT_CHUNK)
+            if not chunk:
+                return
+            yield ''.join(json.dumps(place, ensure_ascii=False) + '\n' for place in chunk)
+            after_id = chunk[-1]['id']
+
+    return app.response_class(generate(), mimetype='application/x-ndjson', headers={
+        'Content-Disposition': f'attachment; filename={filename}'
+    })
+
+
+@app.route('/api/parking-spots/bulk', methods=['POST'])
+@rate_limit(5, 60)
+@require_auth
+def bulk_create_parking_spots():
+    """주차장 대량 등록 (NDJSON 또는 CSV) - 행별 성공/실패 요약 반환"""
+    return bulk_import('parking', build_parking_spot, index_parking_spots)
+
+
+@app.route('/api/ev-stations/bulk', methods=['POST'])
+@rate_limit(5, 60)
+@require_auth
+def bulk_create_ev_stations():
+    """충전소 대량 등록 (NDJSON 또는 CSV) - 행별 성공/실패 요약 반환"""
+    return bulk_import('ev', build_ev_station, index_ev_stations)
+
+
+@app.route('/api/parking-spots/export', methods=['GET'])
+def export_parking_spots():
+    """주차장 전체 내보내기 (NDJSON 스트리밍)"""
+    return export_places(parking_spot_list, 'parking-spots.ndjson')
+
+
+@app.route('/api/ev-stations/export', methods=['GET'])
+def export_ev_stations():
+    """충전소 전체 내보내기 (NDJSON 스트리밍)"""
+    return export_places(ev_station_list, 'ev-stations.ndjson')
+
+
 # ============================================================================
 # 더미 데이터 초기화 함수 (시연용)
 # ============================================================================
@@ -1252,9 +5075,11 @@ def init_dummy_data():
     users[admin_id] = {
         'id': admin_id,
         'email': 'admin',
-        'password': 'admin',
-        'name': '관리자'
+        'password': hash_password('admin'),
+        'name': '관리자',
+        'session_version': 0
     }
+    index_user(users[admin_id])
     
     # 한밭대학교 좌표 (대략)
     hbnu_lat = 36.3733
@@ -1276,7 +5101,7 @@ def init_dummy_data():
         'name': '한밭대학교 N4 주차장',
         'address': '대전광역시 유성구 대학로 201',
         'distance': 0.5,
-        'available': 10,  # 12칸 중 2칸 예약됨
+        'available': 12,  # 예약 2건은 1시간 뒤 시작 → 지금은 모두 빈자리
         'total': 12,
         'rows': 4,
         'cols': 3,
@@ -1344,13 +5169,17 @@ def init_dummy_data():
             'owner_id': None  # admin 소유 아님
         }
     
+    # 공간 인덱스 등록
+    for spot in parking_spots.values():
+        index_parking_spot(spot)
+    
     # 4. 한밭대학교 국제교류관 전기차 충전소 (4*1 = 4칸)
     ev1_id = get_next_id('ev_station')
     ev_stations[ev1_id] = {
         'id': ev1_id,
         'name': '한밭대학교 국제교류관 전기차 충전소',
         'address': '대전광역시 유성구 대학로 201',
-        'distance': 0.2,
+        'available': 4,  # 예약 1건은 3시간 뒤 시작
         'available': 2,  # 4칸 중 2칸 예약됨
         'total': 4,
         'rows': 4,
@@ -1406,9 +5235,7 @@ def init_dummy_data():
     
     # 6. 예약 데이터 생성 (admin 계정 예약 2~3개만)
     # N4 주차장 예약 2개
-    reserved_key1 = f"parking:{spot1_id}"
-    reserved_slots[reserved_key1] = {0, 5}  # 2개 슬롯 예약
-    for slot in [0, 5]:
+    for slot in [0, 5]:  # 2개 슬롯 예약
         res_id = get_next_id('reservation')
         start_time = datetime.now() + timedelta(hours=1)
         end_time = start_time + timedelta(hours=2)
@@ -1422,10 +5249,9 @@ def init_dummy_data():
             'end_time': end_time.isoformat(),
             'created_at': datetime.now().isoformat()
         }
+        get_place_schedule('parking', spot1_id).book(slot, start_time.timestamp(), end_time.timestamp(), res_id)
     
     # 국제교류관 충전소 예약 1개
-    reserved_key3 = f"ev:{ev1_id}"
-    reserved_slots[reserved_key3] = {1}  # 1개 슬롯 예약
     res_id = get_next_id('reservation')
     start_time = datetime.now() + timedelta(hours=3)
     end_time = start_time + timedelta(hours=1)
@@ -1439,11 +5265,11 @@ def init_dummy_data():
         'end_time': end_time.isoformat(),
         'created_at': datetime.now().isoformat()
     }
+    get_place_schedule('ev', ev1_id).book(1, start_time.timestamp(), end_time.timestamp(), res_id)
     
-    # N4 주차장 available 업데이트 (3칸 -> 2칸 예약)
-    parking_spots[spot1_id]['available'] = 10  # 12칸 중 2칸 예약됨
-    # 국제교류관 충전소 available 업데이트 (2칸 -> 1칸 예약)
-    ev_stations[ev1_id]['available'] = 3  # 4칸 중 1칸 예약됨
+    # 예약은 모두 미래 시각 → 지금은 빈자리 그대로, 시작 시각에 스케줄러가 점유 처리
+    for reservation in list(reservations.values()):
+        schedule_reservation_tasks(reservation, remind=False)
     
     # 7. admin 즐겨찾기 추가
     favorites[admin_id] = {spot1_id, spot2_id, ev1_id}
@@ -1513,16 +5339,25 @@ def init_dummy_data():
             'created_at': now
         }
         
-        # 좋아요 데이터 생성
+        # 좋아요 데이터 생성 (집합을 다 만든 뒤 한 번에 저장 → SQLite 저장소에도 기록됨)
         if likes_count > 0:
-            post_likes[post_id] = set()
+            likes_set = set()
             # admin이 일부 좋아요
             if i % 3 == 0:
-                post_likes[post_id].add(admin_id)
+                likes_set.add(admin_id)
                 likes_count -= 1
             # 가상의 사용자들이 좋아요
             for j in range(likes_count):
-                post_likes[post_id].add(100 + j)  # 가상 사용자 ID
+                likes_set.add(100 + j)  # 가상 사용자 ID
+            post_likes[post_id] = likes_set
+    
+    # 보조 인덱스 등록
+    for station in ev_stations.values():
+        index_ev_station(station)
+    for reservation in reservations.values():
+        reservations_by_user.update(reservation)
+    for post in posts.values():
+        index_post(post)
     
     print("더미 데이터 초기화 완료!")
     print(f"Admin 계정: id={admin_id}, email=admin, password=admin")
@@ -1536,9 +5371,11 @@ def init_dummy_data():
 # 애플리케이션 초기화
 # ============================================================================
 
-# 시연용 더미 데이터 초기화
-    init_dummy_data()
-    
+# 시연용 더미 데이터는 빈 상태로 시작하도록 호출하지 않음 (부하 테스트는 benchmarks/bench_api.py에서 호출 후 확장)
+
+# 저장소에서 불러온 데이터로 공간 인덱스/예약 타임라인 구성
+rebuild_indexes()
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
 
@@ -0,0 +1,42 @@
+"""
+pytest 공통 설정 - BE 디렉토리에서 `python -m pytest -q`
+
+main은 import 시점에 환경 변수로 저장소/속도 제한 등을 결정하므로 import 전에 테스트용 값을 지정한다.
+(인메모리 저장소, 속도 제한 끔, 비밀번호 해시 반복 횟수 축소, 프록시 1단 - X-Forwarded-For 처리 검증용)
+"""
+import os
+import sys
+import uuid
+
+import pytest
+
+os.environ.setdefault('PLINKU_STORAGE', 'memory')
+os.environ.setdefault('PLINKU_RATE_LIMIT', '0')
+os.environ.setdefault('PLINKU_PASSWORD_ITERATIONS', '1000')
+os.environ.setdefault('PLINKU_SECRET_KEY', 'test-secret')
+os.environ.setdefault('PLINKU_TRUST_PROXY', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return main.app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """새 사용자로 가입한 Bearer 토큰 헤더"""
+    response = client.post('/api/signup', json={'email': f'{uuid.uuid4().hex}@test', 'password': 'pw', 'name': 'tester'})
+    assert response.status_code == 201, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+
+@pytest.fixture
+def spot(client, auth_headers):
+    """슬롯 4개짜리 주차장"""
+    response = client.post('/api/parking-spots', headers=auth_headers, json={
+        'name': '테스트 주차장', 'address': '대전', 'rows': 1, 'cols': 4})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()
@@ -0,0 +1,43 @@
+"""인증 (토큰 검증, 가입/로그인 입력 검증)"""
+import time
+import uuid
+
+import pytest
+
+import main
+
+
+def test_valid_token_is_accepted(client, auth_headers):
+    assert client.get('/api/my-parking-spots', headers=auth_headers).status_code == 200
+
+
+@pytest.mark.parametrize('token', ['1.0.9999999999.sïg', 'é', '1.0.9999999999.서명', '.', ''])
+def test_malformed_token_is_rejected(token):
+    assert main.verify_token(token) is None
+
+
+def test_non_ascii_authorization_header_returns_401(client):
+    response = client.get('/api/my-parking-spots', headers={'Authorization': 'Bearer 1.0.9999999999.sïg'})
+    assert response.status_code == 401
+
+
+def test_tampered_and_expired_tokens_are_rejected(client, auth_headers):
+    token = auth_headers['Authorization'].split(' ', 1)[1]
+    user_id, session_version, expires_at, signature = token.split('.')
+    tampered = f'{user_id}.{session_version}.{int(expires_at) + 1}.{signature}'
+    assert main.verify_token(tampered) is None
+
+    payload = f'{user_id}.{session_version}.{int(time.time()) - 1}'
+    assert main.verify_token(f'{payload}.{main.sign_token(payload)}') is None
+
+
+def test_logout_invalidates_token(client, auth_headers):
+    assert client.post('/api/logout', headers=auth_headers).status_code == 200
+    assert client.get('/api/my-parking-spots', headers=auth_headers).status_code == 401
+
+
+@pytest.mark.parametrize('path', ['/api/signup', '/api/login'])
+@pytest.mark.parametrize('body', [{'password': 123}, {'password': ['pw']}, {'email': 1, 'password': 'pw'}])
+def test_non_string_credentials_return_400(client, path, body):
+    body = {'email': f'{uuid.uuid4().hex}@test', **body}
+    assert client.post(path, json=body).status_code == 400
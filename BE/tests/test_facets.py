@@ -0,0 +1,59 @@
+"""주차장 패싯 (개수에 범위 조건 반영, 캐시 무효화, 24시간 운영 분류)"""
+import itertools
+
+import pytest
+
+import main
+
+latitudes = itertools.count(10)
+
+
+@pytest.fixture
+def area(client, auth_headers):
+    """다른 테스트의 주차장과 겹치지 않는 위치에 가격이 다른 주차장 3곳"""
+    lat = float(next(latitudes))
+    base = {'address': '대전', 'rows': 1, 'cols': 2, 'latitude': lat, 'longitude': 10.0}
+    ids = []
+    for price in (500, 1500, 2500):
+        response = client.post('/api/parking-spots', headers=auth_headers,
+                                json={**base, 'name': f'패싯 {price}', 'price_per_hour': price})
+        assert response.status_code == 201, response.get_json()
+        ids.append(response.get_json()['id'])
+    return {'lat': lat, 'lng': 10.0, 'radius_km': 1}, ids
+
+
+def test_counts_apply_price_range(client, area):
+    near, _ = area
+    body = client.get('/api/parking-spots', query_string={**near, 'max_price': 2000}).get_json()
+    assert body['count'] == 2
+    assert body['facets']['price_band'] == {'0-1000': 1, '1001-2000': 1, '2001-3000': 0, '3001-5000': 0, '5001+': 0}
+    assert body['facets']['is_ev'] == {'true': 0, 'false': 2}
+
+
+def test_cached_counts_follow_updates(client, auth_headers, area):
+    near, ids = area
+    query = {**near, 'min_price': 1000}
+    assert client.get('/api/parking-spots', query_string=query).get_json()['facets']['is_ev']['false'] == 2
+
+    response = client.put(f'/api/parking-spots/{ids[0]}', headers=auth_headers, json={'price_per_hour': 1200})
+    assert response.status_code == 200, response.get_json()
+    body = client.get('/api/parking-spots', query_string=query).get_json()
+    assert body['count'] == 3 and body['facets']['is_ev']['false'] == 3
+
+
+@pytest.mark.parametrize('hours, expected', [
+    ('24시간', True), ('24h', True), ('00:00-24:00', True), ('00:00 ~ 23:59', True), ('00:00-00:00', True),
+    ('09:00-24:00', False), ('00:00-12:00', False), ('평일 09:00-18:00', False), ('', False), (None, False),
+])
+def test_all_day_hours_classification(hours, expected):
+    assert main.is_all_day(hours) is expected
+
+
+def test_hours_facet_excludes_limited_hours_ending_at_midnight(client, auth_headers):
+    lat = float(next(latitudes))
+    for hours in ('24시간', '09:00-24:00'):
+        response = client.post('/api/parking-spots', headers=auth_headers, json={
+            'name': hours, 'address': 'a', 'latitude': lat, 'longitude': 10.0, 'operating_hours': hours})
+        assert response.status_code == 201, response.get_json()
+    body = client.get('/api/parking-spots', query_string={'lat': lat, 'lng': 10.0, 'radius_km': 1}).get_json()
+    assert body['facets']['hours'] == {'24h': 1, 'limited': 1}
@@ -0,0 +1,29 @@
+"""운영용 엔드포인트 접근 제한"""
+import pytest
+
+import main
+
+REMOTE = {'REMOTE_ADDR': '203.0.113.7'}
+
+
+@pytest.mark.parametrize('url', ['/api/metrics', '/api/events/stats'])
+def test_internal_endpoints_reject_remote_clients(client, url, monkeypatch):
+    monkeypatch.setattr(main, 'METRICS_TOKEN', None)
+    assert client.get(url).status_code == 200  # 테스트 클라이언트 = loopback
+    assert client.get(url, environ_base=REMOTE).status_code == 403
+
+
+@pytest.mark.parametrize('url', ['/api/metrics', '/api/events/stats'])
+def test_spoofed_loopback_forwarded_for_is_rejected(client, url, monkeypatch):
+    monkeypatch.setattr(main, 'METRICS_TOKEN', None)
+    # 프록시(loopback)를 거친 원격 요청: 클라이언트가 넣은 127.0.0.1 뒤에 프록시가 실제 주소를 붙임
+    headers = {'X-Forwarded-For': '127.0.0.1, 203.0.113.7'}
+    assert client.get(url, headers=headers).status_code == 403
+
+
+@pytest.mark.parametrize('url', ['/api/metrics', '/api/events/stats'])
+def test_internal_endpoints_accept_operator_token(client, url, monkeypatch):
+    monkeypatch.setattr(main, 'METRICS_TOKEN', 'ops-token')
+    assert client.get(url, environ_base=REMOTE, headers={'Authorization': 'Bearer ops-token'}).status_code == 200
+    assert client.get(url, headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    assert client.get(url).status_code == 403
@@ -0,0 +1,50 @@
+"""목록 페이지네이션 경계값 (per_page=0, 커서 끝, 가까운 순 전체 개수)"""
+import pytest
+
+
+@pytest.mark.parametrize('url', [
+    '/api/posts?per_page=0',
+    '/api/posts?per_page=0&cursor=',
+    '/api/parking-spots?per_page=0',
+    '/api/parking-spots?cursor=&per_page=0',
+    '/api/ev-stations?cursor=&per_page=0',
+])
+def test_zero_per_page_returns_empty_page(client, auth_headers, spot, url):
+    client.post('/api/posts', headers=auth_headers, json={'title': 'test', 'content': 'test'})
+    response = client.get(url)
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    items = next(value for key, value in body.items() if key in ('posts', 'spots', 'stations'))
+    assert items == []
+    assert body.get('next_cursor') is None
+
+
+def test_parking_cursor_walks_all_spots(client, auth_headers):
+    created = [client.post('/api/parking-spots', headers=auth_headers,
+                           json={'name': f'cursor {i}', 'address': 'a', 'rows': 1, 'cols': 1}).get_json()['id']
+               for i in range(5)]
+    seen, cursor = [], ''
+    while cursor is not None:
+        body = client.get('/api/parking-spots', query_string={'cursor': cursor, 'per_page': 2}).get_json()
+        seen += [spot['id'] for spot in body['spots']]
+        cursor = body['next_cursor']
+    assert seen == sorted(seen) and set(created) <= set(seen)
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get('/api/parking-spots?cursor=not-a-cursor').status_code == 400
+    assert client.get('/api/posts?cursor=not-a-cursor').status_code == 400
+
+
+def test_nearest_count_is_total_not_page_limit(client, auth_headers):
+    # 다른 테스트의 주차장과 겹치지 않는 위치
+    for i, price in enumerate((500, 1500, 2500)):
+        client.post('/api/parking-spots', headers=auth_headers, json={
+            'name': f'nearest {i}', 'address': 'a', 'latitude': -30.0, 'longitude': 20.0 + i * 0.001,
+            'price_per_hour': price})
+    near = {'lat': -30.0, 'lng': 20.0, 'radius_km': 5, 'sort': 'nearest', 'per_page': 1}
+    pages = [client.get('/api/parking-spots', query_string={**near, 'page': page}).get_json() for page in (1, 2, 3)]
+    assert [body['count'] for body in pages] == [3, 3, 3]
+    assert [body['spots'][0]['name'] for body in pages] == ['nearest 0', 'nearest 1', 'nearest 2']
+    filtered = client.get('/api/parking-spots', query_string={**near, 'max_price': 2000}).get_json()
+    assert filtered['count'] == 2
@@ -0,0 +1,62 @@
+"""주차장/충전소 등록 입력 검증 (단건, 수정, 대량 등록 - 문자열/유한한 숫자)"""
+import json
+
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize('url, collection', [('/api/parking-spots', 'parking_spots'), ('/api/ev-stations', 'ev_stations')])
+@pytest.mark.parametrize('body', [{'name': 5, 'address': 'a'}, {'name': 'n', 'address': ['a']}])
+def test_non_string_name_or_address_is_rejected_before_storing(client, auth_headers, url, collection, body):
+    before = len(getattr(main, collection))
+    assert client.post(url, headers=auth_headers, json=body).status_code == 400
+    assert len(getattr(main, collection)) == before
+
+
+def test_non_string_name_update_is_rejected(client, auth_headers, spot):
+    response = client.put(f"/api/parking-spots/{spot['id']}", headers=auth_headers, json={'name': 5})
+    assert response.status_code == 400
+    assert main.parking_spots[spot['id']]['name'] == spot['name']
+
+
+def test_bulk_row_with_non_string_name_fails(client, auth_headers):
+    rows = [{'name': 5, 'address': 'a'}, {'name': '대량 주차장', 'address': '대전'}]
+    body = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+    response = client.post('/api/parking-spots/bulk', headers=auth_headers, data=body.encode(),
+                           content_type='application/x-ndjson')
+    result = response.get_json()
+    assert result['created'] == 1 and result['errors'] == [{'line': 1, 'error': 'Invalid name'}]
+
+
+@pytest.mark.parametrize('field', ['price_per_hour', 'available', 'distance'])
+@pytest.mark.parametrize('literal', ['NaN', 'Infinity', '-Infinity'])
+def test_non_finite_number_is_rejected(client, auth_headers, field, literal):
+    body = f'{{"name": "n", "address": "a", "{field}": {literal}}}'  # JSON 비표준 리터럴 (파이썬 json은 읽음)
+    before = len(main.parking_spots)
+    response = client.post('/api/parking-spots', headers=auth_headers, data=body, content_type='application/json')
+    assert response.status_code == 400 and response.get_json() == {'error': f'Invalid {field}'}
+    assert len(main.parking_spots) == before
+
+
+def test_non_finite_number_update_is_rejected(client, auth_headers, spot):
+    response = client.put(f"/api/parking-spots/{spot['id']}", headers=auth_headers,
+                          data='{"price_per_hour": NaN}', content_type='application/json')
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('content_type, body', [
+    ('application/x-ndjson', '{"name": "n", "address": "a", "distance": Infinity}\n'),
+    ('text/csv', 'name,address,distance\nn,a,nan\n'),
+])
+def test_bulk_row_with_non_finite_number_fails(client, auth_headers, content_type, body):
+    response = client.post('/api/parking-spots/bulk', headers=auth_headers, data=body.encode(), content_type=content_type)
+    result = response.get_json()
+    assert result['created'] == 0 and result['errors'][0]['error'] == 'Invalid distance'
+
+
+def test_sorted_list_ignores_non_finite_values():
+    spots = main.ParkingSpotList({}, ('price_per_hour',))
+    spots.update({'id': 1, 'price_per_hour': float('nan')})
+    spots.update_many([{'id': 2, 'price_per_hour': float('inf')}, {'id': 3, 'price_per_hour': 1000}])
+    assert spots.select({'price_per_hour': (0, None)}) == [3]
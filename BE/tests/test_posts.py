@@ -0,0 +1,27 @@
+"""게시글 상세 조회 (좋아요 수/조회수 저장)"""
+import pytest
+
+import main
+
+
+@pytest.fixture
+def post_id(client, auth_headers):
+    response = client.post('/api/posts', headers=auth_headers, json={'title': '조회 테스트', 'content': '내용'})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['id']
+
+
+def test_get_post_reads_likes_as_stored(client, post_id):
+    post = main.posts[post_id]
+    post['likes'] = 7  # 다른 워커가 좋아요를 반영했지만 이 워커의 좋아요 집합은 아직 비어 있는 상황
+    main.posts[post_id] = post
+    assert client.get(f'/api/posts/{post_id}').get_json()['likes'] == 7
+    assert main.posts[post_id]['likes'] == 7
+
+
+def test_views_are_buffered_then_flushed(client, post_id):
+    main.post_view_counter.flush()
+    assert [client.get(f'/api/posts/{post_id}').get_json()['views'] for _ in range(2)] == [1, 2]
+    main.post_view_counter.flush()
+    assert main.posts[post_id]['views'] == 2
+    assert client.get(f'/api/posts/{post_id}').get_json()['views'] == 3
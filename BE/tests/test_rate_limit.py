@@ -0,0 +1,13 @@
+"""요청 속도 제한 (클라이언트 IP 기준 버킷)"""
+import main
+
+
+def test_spoofed_forwarded_for_does_not_get_new_bucket(client, monkeypatch):
+    monkeypatch.setattr(main, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(main, 'rate_limiter', main.RateLimiter())
+    statuses = []
+    for i in range(11):  # 로그인: IP당 60초에 10번
+        # 맨 왼쪽은 클라이언트가 넣은 값, 오른쪽은 프록시(loopback)가 붙인 실제 주소
+        headers = {'X-Forwarded-For': f'10.0.0.{i}, 198.51.100.7'}
+        statuses.append(client.post('/api/login', json={'email': 'x@test', 'password': 'pw'}, headers=headers).status_code)
+    assert statuses[:10] == [401] * 10 and statuses[10] == 429
@@ -0,0 +1,67 @@
+"""
+예약 생성과 예약 만료 정리가 같은 잠금 순서를 쓰는지 (SQLite 저장소, 스레드 여러 개)
+
+예약 생성은 저장소 쓰기 트랜잭션 → 장소 잠금 순서로 잡는다. 만료 정리가 장소 잠금을 먼저 잡고
+저장소에 쓰면 두 요청이 서로를 기다리다 busy_timeout 뒤 'database is locked'(500)로 실패한다.
+저장소는 import 시점에 정해지므로 별도 프로세스에서 실행한다.
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+BE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = textwrap.dedent('''
+    import sys, threading, time
+    from datetime import datetime, timedelta
+    sys.path.insert(0, '.')
+    import main
+
+    client = main.app.test_client()
+    token = client.post('/api/signup', json={'email': 'lock@test', 'password': 'pw'}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    spot_id = client.post('/api/parking-spots', headers=headers,
+                          json={'name': 'lock', 'address': 'a', 'rows': 1, 'cols': 8}).get_json()['id']
+    statuses = []
+    deadline = time.time() + 3
+
+    def book(worker):
+        local = main.app.test_client()
+        n = 0
+        while time.time() < deadline:
+            now = datetime.now()
+            # 곧 끝나는 예약 → 조회/스케줄러 쪽에서 계속 만료 정리가 일어남
+            response = local.post('/api/reservations', headers=headers, json={
+                'place_id': spot_id, 'place_type': 'parking', 'slot': worker,
+                'start_time': (now + timedelta(milliseconds=n % 3)).isoformat(),
+                'end_time': (now + timedelta(milliseconds=50)).isoformat()})
+            statuses.append(response.status_code)
+            n += 1
+
+    def watch():
+        local = main.app.test_client()
+        while time.time() < deadline:
+            statuses.append(local.get(f'/api/parking-spots/{spot_id}').status_code)
+            statuses.append(local.get(f'/api/parking-spots/{spot_id}?format=bitmap').status_code)
+
+    threads = [threading.Thread(target=book, args=(i,)) for i in range(4)]
+    threads += [threading.Thread(target=watch) for _ in range(4)]
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+    errors = [status for status in statuses if status >= 500]
+    print(f'requests={len(statuses)} errors={len(errors)} elapsed={elapsed:.1f}s')
+    sys.exit(1 if errors or elapsed > 10 else 0)
+''')
+
+
+def test_booking_and_expiry_do_not_deadlock(tmp_path):
+    env = dict(os.environ, PLINKU_STORAGE='sqlite', PLINKU_DB_PATH=str(tmp_path / 'locks.db'),
+               PLINKU_RATE_LIMIT='0', PLINKU_PASSWORD_ITERATIONS='1000', PLINKU_SECRET_KEY='test-secret')
+    result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=BE_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stdout + result.stderr[-2000:]
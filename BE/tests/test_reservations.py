@@ -0,0 +1,62 @@
+"""예약 시간 구간과 현재 점유 상태 (available / taken / occupancy)"""
+import time
+from datetime import datetime, timedelta
+
+import main
+
+
+def reserve(client, headers, spot_id, slot, start, end):
+    return client.post('/api/reservations', headers=headers, json={
+        'place_id': spot_id, 'place_type': 'parking', 'slot': slot,
+        'start_time': start.isoformat(), 'end_time': end.isoformat()})
+
+
+def test_future_booking_does_not_occupy_slot(client, auth_headers, spot):
+    start = datetime.now() + timedelta(days=365)
+    assert reserve(client, auth_headers, spot['id'], 0, start, start + timedelta(hours=1)).status_code == 201
+
+    assert main.parking_spots[spot['id']]['available'] == spot['total']
+    assert main.get_place_schedule('parking', spot['id']).taken_mask() == 0
+    # 같은 구간을 묻는 경우에만 taken
+    window = {'start_time': start.isoformat(), 'end_time': (start + timedelta(minutes=30)).isoformat()}
+    compact = client.get(f"/api/parking-spots/{spot['id']}", query_string={'format': 'bitmap', **window}).get_json()
+    assert compact['occupancy'] == main.encode_bitmap(1, spot['total'])
+
+
+def test_current_booking_occupies_slot(client, auth_headers, spot):
+    now = datetime.now()
+    assert reserve(client, auth_headers, spot['id'], 1, now - timedelta(minutes=1), now + timedelta(hours=1)).status_code == 201
+
+    assert main.parking_spots[spot['id']]['available'] == spot['total'] - 1
+    assert main.get_place_schedule('parking', spot['id']).taken_slots() == {1}
+
+
+def test_occupancy_follows_booking_start_and_end(client, auth_headers, spot):
+    start = datetime.now() + timedelta(seconds=1)
+    response = reserve(client, auth_headers, spot['id'], 2, start, start + timedelta(seconds=1))
+    assert response.status_code == 201
+    assert main.parking_spots[spot['id']]['available'] == spot['total']
+
+    # 시작/종료 시각에 스케줄러가 점유 상태를 다시 계산
+    deadline = time.time() + 5
+    while main.parking_spots[spot['id']]['available'] == spot['total'] and time.time() < deadline:
+        time.sleep(0.05)
+    assert main.parking_spots[spot['id']]['available'] == spot['total'] - 1
+    while main.parking_spots[spot['id']]['available'] != spot['total'] and time.time() < deadline:
+        time.sleep(0.05)
+    assert main.parking_spots[spot['id']]['available'] == spot['total']
+
+
+def test_schedule_refresh_reports_changed_slots():
+    schedule = main.PlaceSchedule()
+    assert schedule.book(0, 100.0, 200.0, 1, now=50.0)
+    assert schedule.book(1, 10.0, 120.0, 2, now=50.0)
+    assert not schedule.book(0, 150.0, 250.0, 3, now=50.0)  # 겹침
+    assert schedule.occupied == 0b10
+
+    assert schedule.refresh(100.0) == 0b01  # 0번 슬롯 예약 시작
+    assert schedule.occupied == 0b11
+    assert schedule.refresh(150.0) == 0b10  # 1번 슬롯 예약 종료 → 구간도 정리
+    assert 1 not in schedule.timelines
+    assert schedule.refresh(200.0) == 0b01
+    assert schedule.occupied == 0 and not schedule.timelines
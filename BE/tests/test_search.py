@@ -0,0 +1,50 @@
+"""게시글 검색 (토큰화, 역색인)"""
+import uuid
+
+import pytest
+
+import main
+
+
+def test_search_terms_splits_hangul_into_bigrams():
+    assert main.search_terms('대전역 Parking 24시') == ['대전', '전역', 'parking', '24', '시']
+
+
+def test_search_terms_for_index_adds_hangul_unigrams():
+    assert main.search_terms('대전역', unigrams=True) == ['대전', '전역', '대', '전', '역']
+
+
+@pytest.fixture
+def posted(client, auth_headers):
+    """제목/내용에 고유한 영문 단어를 넣은 게시글 (다른 테스트의 글과 구분)"""
+    tag = uuid.uuid4().hex[:12]
+    response = client.post('/api/posts', headers=auth_headers, json={
+        'title': f'대전역 주차 후기 {tag}', 'content': '근처 주차장이 넓어요'})
+    assert response.status_code == 201, response.get_json()
+    return tag, response.get_json()['id']
+
+
+@pytest.mark.parametrize('query', ['역', '대전역', '주차장', '넓'])
+def test_hangul_queries_match_post(client, posted, query):
+    tag, post_id = posted
+    response = client.get('/api/posts/search', query_string={'q': f'{query} {tag}'})
+    assert [post['id'] for post in response.get_json()['posts']] == [post_id]
+
+
+def test_query_with_missing_term_matches_nothing(client, posted):
+    tag, _ = posted
+    assert client.get('/api/posts/search', query_string={'q': f'서울 {tag}'}).get_json()['count'] == 0
+
+
+@pytest.mark.parametrize('body', [{'title': 123, 'content': 'x'}, {'title': 't', 'content': ['x']}])
+def test_non_string_post_text_is_rejected_before_storing(client, auth_headers, body):
+    before = len(main.posts)
+    assert client.post('/api/posts', headers=auth_headers, json=body).status_code == 400
+    assert len(main.posts) == before
+
+
+def test_non_string_post_update_is_rejected(client, auth_headers, posted):
+    _, post_id = posted
+    response = client.put(f'/api/posts/{post_id}', headers=auth_headers, json={'title': 123})
+    assert response.status_code == 400
+    assert isinstance(main.posts[post_id]['title'], str)
@@ -0,0 +1,117 @@
+"""저장소 백엔드 (SQLite 트랜잭션 롤백, 스냅샷 저장소)"""
+import threading
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    return main.SQLiteStorage(str(tmp_path / 'test.db'), pool_size=2)
+
+
+def test_rollback_restores_value_mutated_in_place(sqlite_storage):
+    things = sqlite_storage.collection('things')
+    things[1] = {'id': 1, 'available': 4}
+
+    with pytest.raises(ValueError):
+        with sqlite_storage.transaction():
+            thing = things[1]
+            thing['available'] = 0  # 다시 저장하기 전에 실패
+            raise ValueError
+
+    assert things[1] == {'id': 1, 'available': 4}
+
+
+def test_rollback_discards_written_value(sqlite_storage):
+    things = sqlite_storage.collection('things')
+    things[1] = {'id': 1, 'available': 4}
+
+    with pytest.raises(ValueError):
+        with sqlite_storage.transaction():
+            things[1] = {'id': 1, 'available': 3}
+            things[2] = {'id': 2}
+            raise ValueError
+
+    assert things[1] == {'id': 1, 'available': 4} and 2 not in things
+
+
+@pytest.fixture
+def snapshot_storage(tmp_path):
+    storage = main.SnapshotStorage(str(tmp_path / 'snap'), snapshot_every=10 ** 9, fsync_sec=3600)
+    yield storage
+    storage._lock_file.close()  # 프로세스 잠금 해제
+
+
+def reopen(storage):
+    storage.flush(True)
+    storage._lock_file.close()
+    return main.SnapshotStorage(storage.directory, snapshot_every=10 ** 9, fsync_sec=3600)
+
+
+def test_snapshot_keeps_value_as_of_snapshot_plus_log(snapshot_storage):
+    things = snapshot_storage.collection('things')
+    things[1] = {'id': 1, 'tags': ['a']}
+    assert snapshot_storage.snapshot()
+    thing = things[1]
+    thing['tags'].append('b')  # 스냅샷 뒤 제자리 수정 + 다시 저장 → 새 세대 로그
+    things[1] = thing
+    things[2] = {'id': 2, 'tags': []}
+
+    restored = reopen(snapshot_storage)
+    try:
+        assert dict(restored.collection('things')) == {1: {'id': 1, 'tags': ['a', 'b']}, 2: {'id': 2, 'tags': []}}
+    finally:
+        restored._lock_file.close()
+
+
+def test_fsync_runs_outside_log_lock(snapshot_storage, monkeypatch):
+    snapshot_storage.collection('things')[1] = {'id': 1}
+    lock_free = []
+    real_fsync = main.os.fsync
+
+    def fsync(fd):
+        # 다른 스레드에서 잠금을 잡을 수 있어야 함 (= fsync 동안 쓰기가 막히지 않음)
+        probe = threading.Thread(target=lambda: lock_free.append(snapshot_storage.log_lock.acquire(timeout=1)
+                                                                 and snapshot_storage.log_lock.release() is None))
+        probe.start()
+        probe.join()
+        real_fsync(fd)
+
+    monkeypatch.setattr(main.os, 'fsync', fsync)
+    snapshot_storage.flush(True)
+    assert lock_free == [True]
+
+
+def test_snapshot_in_chunks_round_trips(snapshot_storage):
+    snapshot_storage.SNAPSHOT_CHUNK = 2
+    things = snapshot_storage.collection('things')
+    for i in range(5):
+        things[i] = {'id': i}
+    snapshot_storage.collection('empty')
+    assert snapshot_storage.snapshot()
+
+    restored = reopen(snapshot_storage)
+    try:
+        assert dict(restored.collection('things')) == {i: {'id': i} for i in range(5)}
+    finally:
+        restored._lock_file.close()
+
+
+def test_snapshot_serializes_outside_log_lock(snapshot_storage, monkeypatch):
+    snapshot_storage.collection('things')[1] = {'id': 1}
+    lock_free = []
+    real_dumps = main.pickle.dumps
+
+    def dumps(obj, *args, **kwargs):
+        if isinstance(obj, tuple):  # 스냅샷 조각 (name, {키: 값})
+            probe = threading.Thread(target=lambda: lock_free.append(snapshot_storage.log_lock.acquire(timeout=1)
+                                                                     and snapshot_storage.log_lock.release() is None))
+            probe.start()
+            probe.join()
+        return real_dumps(obj, *args, **kwargs)
+
+    monkeypatch.setattr(main.pickle, 'dumps', dumps)
+    assert snapshot_storage.snapshot()
+    assert lock_free == [True]